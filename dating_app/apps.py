@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DatingAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dating_app'
+
+    def ready(self):
+        # Подключаем сигналы, поддерживающие поисковый индекс, маску увлечений, кэши матчей и профилей, копии фото
+        from . import search, interest_mask, match_cache, profile_cache, photo_processing  # noqa: F401
@@ -0,0 +1,138 @@
+# dating_app/compatibility.py
+
+import hashlib
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from .discovery import sample_unseen_candidates
+
+# Веса составляющих оценки совместимости (каждая составляющая лежит в [0, 1])
+DEFAULT_WEIGHTS = {'age': 0.3, 'city': 0.2, 'interests': 0.4, 'status': 0.1}
+# Разница в возрасте (лет), при которой возрастная составляющая падает вдвое
+AGE_HALF_SCORE_YEARS = 5.0
+# Вклад статуса кандидата: свободные люди интереснее занятых
+STATUS_SCORES = {'searching': 1.0, 'complicated': 0.5, 'taken': 0.0}
+
+# Таблица числа единичных битов для байта — для NumPy < 2.0 без bitwise_count
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _option(name, default):
+    return getattr(settings, 'COMPATIBILITY', {}).get(name, default)
+
+
+def popcount(values):
+    """
+    Число единичных битов в каждом элементе массива uint64.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    return _BYTE_POPCOUNT[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class CandidateArrays:
+    """
+    Признаки пачки кандидатов в виде столбцов NumPy.
+    """
+
+    def __init__(self, rows):
+        ids, birth_dates, cities, masks, statuses = zip(*rows) if rows else ((), (), (), (), ())
+        self.ids = np.array(ids, dtype=np.int64)
+        self.birth_ordinals = np.fromiter((day.toordinal() for day in birth_dates), dtype=np.float64, count=len(self.ids))
+        self.cities = np.array(cities, dtype=object)
+        # Маска хранится в знаковом bigint, но старший бит не используется — приведение безопасно
+        self.masks = np.array(masks, dtype=np.int64).view(np.uint64)
+        statuses = np.array(statuses, dtype=object)
+        self.status_scores = np.zeros(len(self.ids))
+        for value, score in STATUS_SCORES.items():
+            self.status_scores[statuses == value] = score
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls(list(queryset.values_list('pk', 'birth_date', 'city', 'interest_mask', 'status')))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def score_candidates(viewer, candidates, weights=None):
+    """
+    Считает оценку совместимости профиля viewer со всеми кандидатами за один векторный проход.
+    Возвращает массив float64 той же длины, что и candidates.
+    """
+    weights = weights or _option('WEIGHTS', DEFAULT_WEIGHTS)
+
+    age_gap = np.abs(candidates.birth_ordinals - viewer.birth_date.toordinal()) / 365.25
+    age_score = 1.0 / (1.0 + age_gap / AGE_HALF_SCORE_YEARS)
+
+    city_score = (candidates.cities == viewer.city).astype(np.float64)
+
+    # Коэффициент Жаккара по маскам увлечений: |A ∩ B| / |A ∪ B|
+    own_mask = np.uint64(viewer.interest_mask)
+    shared = popcount(candidates.masks & own_mask).astype(np.float64)
+    union = popcount(candidates.masks | own_mask).astype(np.float64)
+    interest_score = np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+
+    return (
+        weights.get('age', 0.0) * age_score
+        + weights.get('city', 0.0) * city_score
+        + weights.get('interests', 0.0) * interest_score
+        + weights.get('status', 0.0) * candidates.status_scores
+    )
+
+
+def rank_by_compatibility(queryset, viewer):
+    """
+    Возвращает pk профилей из queryset по убыванию совместимости с viewer (при равенстве — по pk).
+    Рассматривается не больше COMPATIBILITY['MAX_CANDIDATES'] кандидатов (первые по random_key).
+    """
+    # Детерминированная выборка: при превышении лимита берём одних и тех же кандидатов,
+    # а не произвольное подмножество в порядке, который выбрал план запроса
+    limited = queryset.order_by('random_key', 'pk')[:_option('MAX_CANDIDATES', 100000)]
+    candidates = CandidateArrays.from_queryset(limited)
+    if not len(candidates):
+        return []
+    scores = score_candidates(viewer, candidates)
+    order = np.lexsort((candidates.ids, -scores))
+    return candidates.ids[order].tolist()
+
+
+def ranking_key(viewer_id, params, exclude=()):
+    """
+    Ключ кэша ранжированного списка: пользователь + параметры запроса без параметров пагинации.
+    """
+    pairs = sorted((name, value) for name, values in params.lists() if name not in exclude for value in values)
+    signature = '&'.join(f'{name}={value}' for name, value in pairs)
+    digest = hashlib.md5(signature.encode('utf-8')).hexdigest()
+    return f'compatibility:{viewer_id}:{digest}'
+
+
+def cached_ranking(queryset, viewer, params, refresh=False, exclude=()):
+    """
+    rank_by_compatibility с кэшем на время листания: список id хранится
+    COMPATIBILITY['RANKING_TIMEOUT'] секунд по ключу ranking_key, поэтому следующие
+    страницы берутся из того же списка и позиционный курсор не сдвигается.
+    refresh (первая страница) пересчитывает список заново.
+    """
+    key = ranking_key(viewer.pk, params, exclude)
+    if not refresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return np.frombuffer(cached, dtype=np.int64).tolist()
+    ranked_ids = rank_by_compatibility(queryset, viewer)
+    # Сырые байты int64 заметно компактнее pickle списка из сотни тысяч int
+    cache.set(key, np.array(ranked_ids, dtype=np.int64).tobytes(), _option('RANKING_TIMEOUT', 600))
+    return ranked_ids
+
+
+def pick_compatible_profile(queryset, user, seen, viewer):
+    """
+    Выбирает лучший по совместимости профиль из случайной выборки ещё не оценённых кандидатов.
+    Выборка (COMPATIBILITY['SAMPLE_SIZE']) сохраняет разнообразие выдачи и не требует
+    сканировать всех кандидатов. Возвращает pk профиля или None.
+    """
+    sample = sample_unseen_candidates(queryset, user, seen, limit=_option('SAMPLE_SIZE', 100))
+    if not sample:
+        return None
+    ranked = rank_by_compatibility(queryset.filter(pk__in=[pk for pk, _ in sample]), viewer)
+    return ranked[0]
@@ -0,0 +1,99 @@
+# dating_app/conditional.py
+#
+# Условные GET (ETag / Last-Modified): валидаторы считаются по меткам версий и
+# максимальным временам изменения, до сериализации, поэтому неизменённый ресурс
+# отдаёт 304 Not Modified, не загружая объекты и не вызывая сериализаторы.
+
+import hashlib
+from datetime import date
+from functools import wraps
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .models import Interest
+from .profile_cache import profile_stamp
+
+
+def make_etag(request, parts):
+    """
+    Слабый ETag из частей метки, формата ответа и полного пути с параметрами запроса.
+    Слабый — потому что тело ответа не хэшируется.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = ':'.join(str(part) for part in (getattr(renderer, 'format', ''), request.get_full_path(), *parts))
+    return 'W/"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def conditional_get(stamp_func):
+    """
+    Декоратор действия ViewSet (list/retrieve). stamp_func(view, request, *args, **kwargs)
+    возвращает (части ETag, время изменения или None) либо None, если ресурса нет —
+    тогда действие выполняется как обычно (и, например, отвечает 404).
+    """
+    def decorator(method):
+        @wraps(method)
+        def inner(self, request, *args, **kwargs):
+            stamp = stamp_func(self, request, *args, **kwargs)
+            if stamp is None:
+                return method(self, request, *args, **kwargs)
+            parts, last_modified = stamp
+            etag = make_etag(request, parts)
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers.setdefault('ETag', etag)
+                if last_modified:
+                    response.headers.setdefault('Last-Modified', http_date(last_modified))
+            return response
+        return inner
+    return decorator
+
+
+def _pk(kwargs):
+    try:
+        return int(kwargs['pk'])
+    except (KeyError, ValueError):
+        return None
+
+
+def interest_list_stamp(view, request, *args, **kwargs):
+    # Удаление меняет количество, добавление — максимальный id, переименование — updated_at.
+    # Last-Modified у списка не отдаём: по одному времени удаление не заметить
+    stamp = view.filter_queryset(view.get_queryset()).aggregate(
+        count=Count('id'), last_id=Max('id'), updated=Max('updated_at'),
+    )
+    return (stamp['count'], stamp['last_id'], stamp['updated']), None
+
+
+def interest_detail_stamp(view, request, *args, **kwargs):
+    pk = _pk(kwargs)
+    updated_at = Interest.objects.filter(pk=pk).values_list('updated_at', flat=True).first() if pk else None
+    if updated_at is None:
+        return None
+    return (updated_at,), updated_at
+
+
+def profile_detail_stamp(view, request, *args, **kwargs):
+    # Версия из кэша профилей (без запросов к БД). Возраст зависит от даты, абсолютные URL фото —
+    # от хоста, а собственный профиль отдаётся как 404 — поэтому в метке дата, хост и id пользователя
+    pk = _pk(kwargs)
+    if pk is None:
+        return None
+    return (profile_stamp(pk), date.today(), request.get_host(), request.user.id), None
+
+
+def match_list_stamp(view, request, *args, **kwargs):
+    # Строки матчей не меняются: достаточно количества и максимального id
+    stamp = view.get_queryset().order_by().aggregate(count=Count('id'), last_id=Max('id'))
+    return (request.user.id, stamp['count'], stamp['last_id']), None
+
+
+def match_detail_stamp(view, request, *args, **kwargs):
+    pk = _pk(kwargs)
+    timestamp = view.get_queryset().filter(pk=pk).values_list('timestamp', flat=True).first() if pk else None
+    if timestamp is None:
+        return None
+    return (request.user.id, timestamp), timestamp
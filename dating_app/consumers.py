@@ -1,36 +1,55 @@
 # dating_app/consumers.py
 
+import asyncio
 import json
+import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.contrib.auth import get_user_model
-from .models import Match, Message
+from django.conf import settings
+from django.utils import timezone
+from .models import Message
+from .match_cache import get_match_chat_id
+from .notifications import user_group
+from .metrics import CHANNEL_SEND_LATENCY, WS_CONNECTS, WS_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+
+def _batch_option(name, default):
+    return getattr(settings, 'CHAT_MESSAGE_BATCH', {}).get(name, default)
 
-User = get_user_model()
 
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.user = self.scope["user"]
+        self.room_group_name = None
         if self.user.is_anonymous:
+            WS_CONNECTS.inc(consumer='chat', result='rejected')
             await self.close()
             return
 
         # Получаем ID другого пользователя из URL (chat/<other_user_id>/)
-        self.other_user_id = self.scope['url_route']['kwargs']['other_user_id']
         try:
-            self.other_user = await database_sync_to_async(User.objects.get)(id=self.other_user_id)
-        except User.DoesNotExist:
+            self.other_user_id = int(self.scope['url_route']['kwargs']['other_user_id'])
+        except ValueError:
             await self.close()
             return
 
-        # Проверяем, есть ли матч между пользователями
-        match_exists = await self.check_match_exists(self.user, self.other_user)
-        if not match_exists:
+        # Чат пары определяется один раз на всё соединение; без матча (в т.ч. если пользователя
+        # нет) соединение закрывается. Обычно ответ берётся из кэша, без запросов к БД
+        self.chat_id = await database_sync_to_async(get_match_chat_id)(self.user.id, self.other_user_id)
+        if self.chat_id is None:
+            WS_CONNECTS.inc(consumer='chat', result='rejected')
             await self.close()
             return
 
+        # Сообщения копятся и сохраняются пачками (см. CHAT_MESSAGE_BATCH)
+        self.pending_messages = []
+        self.flush_task = None
+        self.failed_flushes = 0 # Неудачных попыток сохранить текущие сообщения подряд
+
         # Создаем уникальное имя группы для чата между двумя пользователями
-        self.room_group_name = f"chat_{min(self.user.id, self.other_user.id)}_{max(self.user.id, self.other_user.id)}"
+        self.room_group_name = f"chat_{min(self.user.id, self.other_user_id)}_{max(self.user.id, self.other_user_id)}"
 
         # Присоединяемся к группе чата
         await self.channel_layer.group_add(
@@ -39,8 +58,18 @@ class ChatConsumer(AsyncWebsocketConsumer):
         )
 
         await self.accept()
+        WS_CONNECTS.inc(consumer='chat', result='accepted')
 
     async def disconnect(self, close_code):
+        if self.room_group_name is None:
+            return
+        # Сохраняем оставшиеся сообщения до выхода (с теми же повторами, но без отложенной задачи)
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        while not await self.flush_messages(closing=True):
+            await asyncio.sleep(_batch_option('DELAY', 0.5))
+
         # Покидаем группу чата
         await self.channel_layer.group_discard(
             self.room_group_name,
@@ -49,26 +78,34 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     # Получение сообщения от WebSocket
     async def receive(self, text_data):
+        WS_MESSAGES.inc(consumer='chat', direction='in')
         text_data_json = json.loads(text_data)
         message_content = text_data_json['message']
 
-        # Сохраняем сообщение в базе данных
-        message = await self.save_message(self.user, self.other_user, message_content)
+        # Сообщение ставится в очередь на сохранение, а рассылается сразу
+        message = Message(chat_id=self.chat_id, sender_id=self.user.id, content=message_content, timestamp=timezone.now())
+        self.pending_messages.append(message)
+        if len(self.pending_messages) >= _batch_option('SIZE', 20):
+            await self.flush_messages()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.delayed_flush())
 
         # Отправляем сообщение в группу чата
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'chat_message',
-                'message': message.content,
-                'sender_id': message.sender.id,
-                'sender_username': message.sender.username,
-                'timestamp': message.timestamp.isoformat(),
-            }
-        )
+        with CHANNEL_SEND_LATENCY.time(kind='chat'):
+            await self.channel_layer.group_send(
+                self.room_group_name,
+                {
+                    'type': 'chat_message',
+                    'message': message.content,
+                    'sender_id': self.user.id,
+                    'sender_username': self.user.username,
+                    'timestamp': message.timestamp.isoformat(),
+                }
+            )
 
     # Получение сообщения от группы чата
     async def chat_message(self, event):
+        WS_MESSAGES.inc(consumer='chat', direction='out')
         await self.send(text_data=json.dumps({
             'message': event['message'],
             'sender_id': event['sender_id'],
@@ -76,20 +113,70 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'timestamp': event['timestamp'],
         }))
 
-    @database_sync_to_async
-    def check_match_exists(self, user1, user2):
-        return Match.objects.filter(
-            (models.Q(user1=user1) & models.Q(user2=user2)) |
-            (models.Q(user1=user2) & models.Q(user2=user1))
-        ).exists()
+    async def delayed_flush(self):
+        await asyncio.sleep(_batch_option('DELAY', 0.5))
+        self.flush_task = None
+        await self.flush_messages()
+
+    async def flush_messages(self, closing=False):
+        """
+        Сохраняет накопленные сообщения одним bulk_create. При ошибке сообщения возвращаются
+        в очередь и сохраняются повторно (до CHAT_MESSAGE_BATCH['RETRIES'] раз); если и это
+        не удалось, отправитель получает список несохранённых сообщений.
+        Возвращает False, если сообщения оставлены в очереди для повтора.
+        """
+        if not self.pending_messages:
+            return True
+        batch, self.pending_messages = self.pending_messages, []
+        try:
+            await self.save_messages(batch)
+        except Exception:
+            self.failed_flushes += 1
+            if self.failed_flushes <= _batch_option('RETRIES', 3):
+                logger.warning('Не удалось сохранить %d сообщений чата %s, повторим', len(batch), self.chat_id, exc_info=True)
+                self.pending_messages = batch + self.pending_messages
+                if not closing and self.flush_task is None:
+                    self.flush_task = asyncio.ensure_future(self.delayed_flush())
+                return False
+            logger.exception('Не удалось сохранить %d сообщений чата %s', len(batch), self.chat_id)
+            self.failed_flushes = 0
+            if not closing:
+                await self.send(text_data=json.dumps({
+                    'error': 'Сообщения не сохранены.',
+                    'unsaved': [{'message': message.content, 'timestamp': message.timestamp.isoformat()} for message in batch],
+                }))
+            return True
+        self.failed_flushes = 0
+        return True
 
     @database_sync_to_async
-    def save_message(self, sender, receiver, content):
-        # Найдем или создадим чат между пользователями
-        from .models import Chat
-        chat, created = Chat.objects.get_or_create()
-        chat.participants.add(sender, receiver)
-        # Создаем и сохраняем сообщение
-        message = Message(chat=chat, sender=sender, content=content)
-        message.save()
-        return message
\ No newline at end of file
+    def save_messages(self, messages):
+        Message.objects.bulk_create(messages)
+
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    Личный канал уведомлений пользователя (лайки, матчи): клиент подписывается
+    один раз вместо опроса /api/matches/. События публикует notifications.py.
+    """
+
+    async def connect(self):
+        self.user = self.scope["user"]
+        self.group_name = None
+        if self.user.is_anonymous:
+            WS_CONNECTS.inc(consumer='notifications', result='rejected')
+            await self.close()
+            return
+        self.group_name = user_group(self.user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        WS_CONNECTS.inc(consumer='notifications', result='accepted')
+
+    async def disconnect(self, close_code):
+        if self.group_name is not None:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    # Событие из группы пользователя
+    async def notify(self, event):
+        WS_MESSAGES.inc(consumer='notifications', direction='out')
+        await self.send(text_data=json.dumps({key: value for key, value in event.items() if key != 'type'}))
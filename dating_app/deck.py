@@ -0,0 +1,168 @@
+# dating_app/deck.py
+
+import hashlib
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from .discovery import candidate_queryset, sample_unseen_candidates
+from .seen import get_seen_set
+
+# Параметры, от которых зависит состав колоды (те же, что у /api/random-profile/)
+DECK_FILTER_PARAMS = ('gender', 'city', 'status', 'min_age', 'max_age', 'interests_any', 'interests_all', 'min_shared',
+                      'lat', 'lon', 'radius', 'nearest')
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _deck_option(name, default):
+    return getattr(settings, 'DISCOVERY_DECK', {}).get(name, default)
+
+
+def deck_key(user_id, params):
+    """
+    Ключ кэша колоды: пользователь + набор фильтров.
+    """
+    signature = '&'.join(f'{name}={params.get(name) or ""}' for name in DECK_FILTER_PARAMS)
+    digest = hashlib.md5(signature.encode('utf-8')).hexdigest()
+    return f'deck:{user_id}:{digest}'
+
+
+def _filter_params(params):
+    return {name: params.get(name) for name in DECK_FILTER_PARAMS if params.get(name)}
+
+
+def _load_deck(key, seen):
+    """
+    Читает состояние колоды из кэша: очередь пар (pk профиля, user_id) и список
+    недавно выданных user_id. Кандидаты, за которых уже проголосовали, выбрасываются.
+    """
+    deck = cache.get(key) or {'queue': [], 'served': []}
+    deck['queue'] = [entry for entry in deck['queue'] if entry[1] not in seen]
+    return deck
+
+
+def _save_deck(key, deck):
+    # Недавно выданных храним не больше двух полных колод
+    deck['served'] = deck['served'][-2 * _deck_option('SIZE', 100):]
+    cache.set(key, deck, _deck_option('TIMEOUT', 15 * 60))
+
+
+@contextmanager
+def _deck_lock(key):
+    """
+    Блокировка колоды на чтение-изменение-запись: cache.add атомарен и в Redis, и в LocMemCache.
+    У блокировки есть срок жизни DISCOVERY_DECK['LOCK_TIMEOUT'], поэтому упавший процесс
+    не оставит колоду заблокированной навсегда.
+    """
+    lock_key, token = f'{key}:lock', uuid.uuid4().hex
+    timeout = _deck_option('LOCK_TIMEOUT', 5)
+    deadline = time.monotonic() + 2 * timeout
+    while not cache.add(lock_key, token, timeout):
+        if time.monotonic() > deadline:
+            logger.warning('Не дождались блокировки колоды %s', key)
+            break
+        time.sleep(0.005)
+    try:
+        yield
+    finally:
+        if cache.get(lock_key) == token: # Чужую блокировку (после истечения нашей) не снимаем
+            cache.delete(lock_key)
+
+
+def _sample(user, params, deck, seen):
+    """
+    Кандидаты для пополнения колоды по её снимку (запросы к БД — вне блокировки).
+    Возвращает (кандидаты, начат ли новый круг без учёта served).
+    """
+    missing = _deck_option('SIZE', 100) - len(deck['queue'])
+    if missing <= 0:
+        return [], False
+    queryset = candidate_queryset(user, params, exclude_voted=False)
+    exclude = {user_id for _, user_id in deck['queue']} | set(deck['served'])
+    candidates = sample_unseen_candidates(queryset, user, seen, missing, exclude=exclude)
+    if not candidates and not deck['queue'] and deck['served']:
+        # Все доступные кандидаты уже выданы, но не оценены — начинаем новый круг
+        return sample_unseen_candidates(queryset, user, seen, missing), True
+    return candidates, False
+
+
+def _merge(deck, candidates, restart):
+    """
+    Добавляет кандидатов в свежепрочитанную колоду (под блокировкой): пропускаются те,
+    что уже в очереди или выданы, пока шла выборка.
+    """
+    if restart and not deck['queue']:
+        deck['served'] = []
+    exclude = {user_id for _, user_id in deck['queue']} | set(deck['served'])
+    added = [entry for entry in candidates if entry[1] not in exclude]
+    deck['queue'] += added[:max(0, _deck_option('SIZE', 100) - len(deck['queue']))]
+
+
+def fill_deck(user, params):
+    """
+    Дополняет очередь кандидатов пользователя до DISCOVERY_DECK['SIZE'].
+    """
+    key = deck_key(user.id, params)
+    seen = get_seen_set(user.id)
+    candidates, restart = _sample(user, params, _load_deck(key, seen), seen)
+    if not candidates:
+        return
+    with _deck_lock(key):
+        deck = _load_deck(key, seen)
+        _merge(deck, candidates, restart)
+        _save_deck(key, deck)
+
+
+def _refill_in_background(user, params):
+    close_old_connections()
+    try:
+        fill_deck(user, params)
+    finally:
+        close_old_connections()
+
+
+def schedule_refill(user, params):
+    """
+    Запускает пополнение колоды после коммита текущей транзакции:
+    в пуле потоков (DISCOVERY_DECK['ASYNC_REFILL']) или синхронно.
+    """
+    global _executor
+    if not _deck_option('ASYNC_REFILL', True):
+        transaction.on_commit(lambda: fill_deck(user, params))
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_deck_option('WORKERS', 2), thread_name_prefix='deck-refill')
+    transaction.on_commit(lambda: _executor.submit(_refill_in_background, user, params))
+
+
+def take_from_deck(user, params, count):
+    """
+    Забирает из колоды до count кандидатов и возвращает список id профилей.
+    Кандидаты, за которых пользователь уже проголосовал, выбрасываются;
+    если после выдачи в очереди остаётся меньше DISCOVERY_DECK['LOW_WATERMARK'],
+    запускается фоновое пополнение.
+    """
+    params = _filter_params(params)
+    key = deck_key(user.id, params)
+    seen = get_seen_set(user.id)
+    snapshot = _load_deck(key, seen)
+    refilled = len(snapshot['queue']) < count
+    # Колода пуста или почти пуста — пополняем в рамках запроса (выборка — вне блокировки)
+    candidates, restart = _sample(user, params, snapshot, seen) if refilled else ([], False)
+
+    with _deck_lock(key):
+        deck = _load_deck(key, seen)
+        _merge(deck, candidates, restart)
+        taken, deck['queue'] = deck['queue'][:count], deck['queue'][count:]
+        deck['served'] += [user_id for _, user_id in taken]
+        _save_deck(key, deck)
+    if not refilled and len(deck['queue']) < _deck_option('LOW_WATERMARK', 20):
+        schedule_refill(user, params)
+    return [pk for pk, _ in taken]
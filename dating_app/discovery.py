@@ -0,0 +1,187 @@
+# dating_app/discovery.py
+
+import random
+from datetime import date
+from .models import UserProfile, LikeDislike
+from .seen import mark_seen
+from .interest_mask import filter_by_interests
+from .geo import filter_by_location
+
+# Сколько кандидатов забирать за одну выборку и сколько раз повторять до перехода на точный запрос
+RANDOM_BATCH_SIZE = 20
+RANDOM_ATTEMPTS = 3
+
+
+def _years_before(day, years):
+    """
+    Дата за years лет до day; 29 февраля в невисокосном году превращается в 28 февраля.
+    Годы за пределами date.min/date.max обрезаются до этих границ.
+    """
+    year = day.year - years
+    if year < date.min.year:
+        return date.min
+    if year > date.max.year:
+        return date.max
+    try:
+        return day.replace(year=year)
+    except ValueError:
+        return day.replace(year=year, day=28)
+
+
+def birth_date_bounds(min_age=None, max_age=None, today=None):
+    """
+    Точный диапазон дат рождения для возраста от min_age до max_age включительно
+    (возраст считается так же, как в UserProfile.get_age).
+    Возвращает пару (born_after, born_on_or_before): нужные профили удовлетворяют
+    born_after < birth_date <= born_on_or_before; отсутствующая граница — None.
+    """
+    today = today or date.today()
+    born_on_or_before = _years_before(today, min_age) if min_age is not None else None
+    # Возраст не больше max_age <=> человеку ещё не исполнилось max_age + 1
+    born_after = _years_before(today, max_age + 1) if max_age is not None else None
+    return born_after, born_on_or_before
+
+
+def filter_by_age(queryset, min_age=None, max_age=None):
+    """
+    Фильтрует queryset профилей по возрасту. Значения берутся из query-параметров,
+    некорректные значения игнорируются.
+    """
+    try:
+        min_age = int(min_age) if min_age not in (None, '') else None
+    except ValueError:
+        min_age = None # Игнорируем некорректное значение
+    try:
+        max_age = int(max_age) if max_age not in (None, '') else None
+    except ValueError:
+        max_age = None # Игнорируем некорректное значение
+
+    born_after, born_on_or_before = birth_date_bounds(min_age, max_age)
+    if born_on_or_before is not None:
+        queryset = queryset.filter(birth_date__lte=born_on_or_before)
+    if born_after is not None:
+        queryset = queryset.filter(birth_date__gt=born_after)
+    return queryset
+
+
+def candidate_queryset(user, params, exclude_voted=True):
+    """
+    Возвращает queryset профилей-кандидатов для показа пользователю user.
+    Учитывает фильтры из query-параметров (пол, город, статус, возраст, увлечения, расстояние).
+    При exclude_voted=True исключает профили, за которые пользователь уже голосовал
+    (с ?nearest= — всегда, до выбора ближайших).
+    """
+    # Начинаем с queryset всех профилей, кроме текущего пользователя
+    queryset = UserProfile.objects.select_related('user').exclude(user=user)
+
+    gender_filter = params.get('gender', None)
+    city_filter = params.get('city', None)
+    status_filter = params.get('status', None)
+    min_age_filter = params.get('min_age', None)
+    max_age_filter = params.get('max_age', None)
+
+    if gender_filter:
+        queryset = queryset.filter(gender=gender_filter)
+    if city_filter:
+        queryset = queryset.filter(city=city_filter)
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    # Фильтрация по возрасту (точный диапазон дат рождения, как в UserProfileViewSet)
+    queryset = filter_by_age(queryset, min_age_filter, max_age_filter)
+    queryset = filter_by_interests(queryset, params, user)
+
+    # ?nearest=N отбирает N ближайших среди ещё не оценённых: иначе после голосов за них
+    # выдача опустеет, хотя дальше есть подходящие профили
+    if exclude_voted or params.get('nearest'):
+        queryset = exclude_voted_profiles(queryset, user)
+
+    return filter_by_location(queryset, params, user)
+
+
+def exclude_voted_profiles(queryset, user):
+    """
+    Исключает пользователей, которых user уже лайкнул или дизлайкнул (подзапрос в SQL).
+    """
+    voted_users_ids = LikeDislike.objects.filter(voter=user).values_list('target_user_id', flat=True)
+    return queryset.exclude(user_id__in=voted_users_ids)
+
+
+def pick_random_profile(queryset):
+    """
+    Выбирает случайный профиль из queryset, не загружая кандидатов в память.
+    Берём случайную точку в [0, 1) и ищем по индексу random_key первый профиль
+    с ключом не меньше неё; если такого нет — переходим в начало диапазона.
+    Каждый вызов — не более двух запросов вида ORDER BY random_key LIMIT 1.
+    """
+    queryset = queryset.prefetch_related('interests').order_by('random_key')
+    pivot = random.random()
+    profile = queryset.filter(random_key__gte=pivot).first()
+    if profile is None:
+        profile = queryset.filter(random_key__lt=pivot).first()
+    return profile
+
+
+def sample_unseen_candidates(queryset, user, seen, limit, exclude=()):
+    """
+    Возвращает до limit пар (pk, user_id) случайных кандидатов из queryset, пропуская
+    пользователей из множества seen (см. seen.get_seen_set) и из exclude — проверка
+    выполняется в памяти, без подзапроса NOT IN. За попытку из БД читается окно кандидатов
+    подряд по random_key начиная со случайной точки; если почти все кандидаты уже оценены,
+    используется точный запрос с исключением в SQL.
+    """
+    ordered = queryset.order_by('random_key').values_list('pk', 'user_id')
+    window = max(RANDOM_BATCH_SIZE, limit)
+    chosen = []
+    chosen_user_ids = set(exclude)
+    for _ in range(RANDOM_ATTEMPTS):
+        batch = _seek_window(ordered, window)
+        if not batch:
+            return chosen
+
+        unseen = [(pk, user_id) for pk, user_id in batch if user_id not in seen and user_id not in chosen_user_ids]
+        if not unseen:
+            continue
+
+        # Множество могло устареть (голос из другого процесса) — сверяем кандидатов с LikeDislike
+        stale = set(LikeDislike.objects.filter(
+            voter=user, target_user_id__in=[user_id for _, user_id in unseen]
+        ).values_list('target_user_id', flat=True))
+        if stale:
+            mark_seen(user.id, stale)
+        for pk, user_id in unseen:
+            if user_id not in stale:
+                chosen.append((pk, user_id))
+                chosen_user_ids.add(user_id)
+                if len(chosen) >= limit:
+                    return chosen
+
+    if not chosen:
+        remaining = exclude_voted_profiles(queryset, user).exclude(user_id__in=list(exclude))
+        chosen = _seek_window(remaining.order_by('random_key').values_list('pk', 'user_id'), limit)
+    return chosen
+
+
+def _seek_window(ordered, size):
+    """
+    Возвращает до size строк упорядоченного по random_key queryset начиная со случайной точки
+    (с переходом в начало диапазона).
+    """
+    pivot = random.random()
+    window = list(ordered.filter(random_key__gte=pivot)[:size])
+    if len(window) < size:
+        window += ordered.filter(random_key__lt=pivot)[:size - len(window)]
+    return window
+
+
+def pick_random_unseen_profile(queryset, user, seen):
+    """
+    Выбирает один случайный профиль, пропуская уже оценённых пользователей
+    (см. sample_unseen_candidates). Возвращает pk профиля или None — сам профиль
+    вызывающий код загружает один раз (например, через get_cached_profiles).
+    """
+    candidates = sample_unseen_candidates(queryset, user, seen, limit=1)
+    if not candidates:
+        return None
+    pk, _ = candidates[0]
+    return pk
@@ -0,0 +1,134 @@
+# dating_app/endpoint_bench.py
+#
+# Регрессионные замеры эндпоинтов: у каждого эндпоинта объявлен бюджет SQL-запросов на
+# один запрос к API (с пустым кэшем). Используется командой bench_endpoints (уровни данных,
+# файл результатов для сравнения между коммитами) и tests/test_query_budgets.py.
+
+import statistics
+import time
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .models import LikeDislike, LikedUsers, DislikedUsers, LikeHistory, Match, ViewHistoryRollup, UserProfile
+
+
+class QueryCounter:
+    """
+    Считает запросы через execute_wrapper (без накладных расходов CaptureQueriesContext).
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Endpoint:
+    """
+    Эндпоинт под замером: path(context, i) возвращает URL i-го запроса, data — тело POST.
+    """
+
+    def __init__(self, name, path, budget, method='get', data=None):
+        self.name = name
+        self.path = path
+        self.budget = budget
+        self.method = method
+        self.data = data
+
+    def request(self, client, context, i):
+        return getattr(client, self.method)(self.path(context, i), self.data, format='json' if self.data else None)
+
+
+def _url(name, query=''):
+    return lambda context, i: reverse(f'dating_app:{name}') + query
+
+
+# Бюджеты — число запросов с холодным кэшем; превышение считается регрессией
+ENDPOINTS = [
+    Endpoint('profiles', _url('userprofile-list', '?gender=F'), budget=3),
+    Endpoint('random_profile', _url('get_random_profile', '?gender=F'), budget=9),
+    Endpoint('like_dislike', lambda context, i: reverse('dating_app:like_dislike', args=[context['targets'][i]]),
+             budget=10, method='post', data={'vote': LikeDislike.LIKE}), # Включая блокировку пары (votes._lock_pairs)
+    Endpoint('matches', _url('match-list'), budget=2),
+    Endpoint('view_history', _url('viewhistory-list'), budget=1),
+    Endpoint('liked_users', _url('likedusers-list'), budget=1),
+    Endpoint('disliked_users', _url('dislikedusers-list'), budget=1),
+    Endpoint('like_history', _url('likehistory-list'), budget=1),
+]
+
+
+def api_client(user):
+    # SERVER_NAME из ALLOWED_HOSTS: команда работает вне тестового окружения
+    client = APIClient(SERVER_NAME='localhost')
+    client.force_authenticate(user=user)
+    return client
+
+
+def seed_viewer_activity(viewer, user_ids, count):
+    """
+    История пользователя viewer для замеров списков: по count лайков (из них половина —
+    взаимные, с матчем), дизлайков и просмотров среди user_ids. Остальные id возвращаются
+    как свежие цели для голосования.
+    """
+    liked, disliked, rest = user_ids[:count], user_ids[count:2 * count], user_ids[2 * count:]
+    now = timezone.now()
+    LikeDislike.objects.bulk_create(
+        [LikeDislike(voter=viewer, target_user_id=user_id, vote=LikeDislike.LIKE) for user_id in liked]
+        + [LikeDislike(voter=viewer, target_user_id=user_id, vote=LikeDislike.DISLIKE) for user_id in disliked]
+        + [LikeDislike(voter_id=user_id, target_user=viewer, vote=LikeDislike.LIKE) for user_id in liked[::2]]
+    )
+    LikedUsers.objects.bulk_create([LikedUsers(user=viewer, liked_user_id=user_id) for user_id in liked])
+    DislikedUsers.objects.bulk_create([DislikedUsers(user=viewer, disliked_user_id=user_id) for user_id in disliked])
+    LikeHistory.objects.bulk_create([LikeHistory(user=viewer, target_user_id=user_id) for user_id in liked])
+    Match.objects.bulk_create([
+        Match(user1_id=user1_id, user2_id=user2_id)
+        for user1_id, user2_id in (Match.pair(viewer.id, user_id) for user_id in liked[::2])
+    ])
+    profile_ids = UserProfile.objects.filter(user_id__in=liked + disliked).values_list('id', flat=True)
+    ViewHistoryRollup.objects.bulk_create([
+        ViewHistoryRollup(viewer=viewer, viewed_profile_id=profile_id, view_count=1, first_seen=now, last_seen=now)
+        for profile_id in profile_ids
+    ])
+    return rest
+
+
+def _percentile(ordered, upper):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * upper / 100))]
+
+
+def measure_endpoint(client, endpoint, context, repeat):
+    """
+    Выполняет запрос repeat раз, первый — с пустым кэшем. Возвращает словарь для файла
+    результатов: бюджет, наибольшее и наименьшее число запросов, p50/p95 времени (мс), худший код ответа.
+    """
+    cache.clear()
+    counter = QueryCounter()
+    timings, queries, statuses = [], [], []
+    with connection.execute_wrapper(counter):
+        for i in range(repeat):
+            counter.count = 0
+            started = time.perf_counter()
+            response = endpoint.request(client, context, i)
+            timings.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count)
+            statuses.append(response.status_code)
+    ordered = sorted(timings)
+    return {
+        'budget': endpoint.budget,
+        'queries': max(queries),
+        'warm_queries': min(queries),
+        'p50_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(_percentile(ordered, 95), 3),
+        'status': max(statuses), # Худший код ответа
+    }
+
+
+def over_budget(results):
+    """
+    Имена эндпоинтов, превысивших бюджет запросов или ответивших ошибкой.
+    """
+    return [name for name, result in results.items() if result['queries'] > result['budget'] or result['status'] >= 400]
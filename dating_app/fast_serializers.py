@@ -0,0 +1,100 @@
+# dating_app/fast_serializers.py
+#
+# Быстрый путь только для чтения: списки профилей собираются в словари прямо из
+# .values() и одного запроса увлечений, минуя поля DRF. Формат ответа тот же,
+# что у UserProfileSerializer (см. tests/test_fast_serializers.py).
+
+from datetime import date
+from .models import UserProfile
+from .photos import photo_variant_urls
+from .serializers import InterestSerializer, UserSerializer
+
+_PROFILE_FIELDS = [
+    'id', 'first_name', 'last_name', 'patronymic', 'gender', 'birth_date', 'city', 'status',
+    'photo_gallery', 'main_photo', 'photo_variants', 'likes_count', 'privacy_setting', 'latitude', 'longitude',
+]
+_USER_FIELDS = UserSerializer.Meta.fields
+
+
+def _interest_fields():
+    return list(InterestSerializer().fields)
+
+
+def profile_values(queryset):
+    """
+    Строки профилей для serialize_profile_rows (словари .values() вместо моделей).
+    Аннотации queryset (distance_km, search_rank и т.п.) сохраняются — по ним работает пагинация.
+    """
+    return queryset.prefetch_related(None).values(
+        *_PROFILE_FIELDS, *[f'user__{name}' for name in _USER_FIELDS], *queryset.query.annotation_select,
+    )
+
+
+def _interests_by_profile(profile_ids):
+    """
+    Увлечения всех профилей страницы одним запросом: {id профиля: [словарь увлечения]}.
+    """
+    fields = _interest_fields()
+    through = UserProfile.interests.through
+    rows = (
+        through.objects.filter(userprofile_id__in=profile_ids)
+        .order_by('userprofile_id', 'interest_id')
+        .values_list('userprofile_id', *[f'interest__{name}' for name in fields])
+    )
+    interests = {}
+    for profile_id, *values in rows:
+        interests.setdefault(profile_id, []).append(dict(zip(fields, values)))
+    return interests
+
+
+def age_on(birth_date, today):
+    """
+    Полных лет на дату today (как UserProfile.get_age).
+    """
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+
+
+def _photo_url(field, name, request):
+    # Как ImageField в DRF: None без файла, абсолютный URL при наличии request
+    if not name:
+        return None
+    url = field.storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def serialize_profile_rows(rows, request=None):
+    """
+    Превращает строки profile_values в список словарей в формате UserProfileSerializer.
+    request нужен для абсолютных URL фото — как в контексте сериализатора.
+    """
+    today = date.today()
+    photo_gallery, main_photo = UserProfile._meta.get_field('photo_gallery'), UserProfile._meta.get_field('main_photo')
+    interests = _interests_by_profile([row['id'] for row in rows])
+    data = []
+    for row in rows:
+        birth_date = row['birth_date']
+        distance = row.get('distance_km')
+        # Ключи в порядке UserProfileSerializer.Meta.fields
+        data.append({
+            'id': row['id'],
+            'user': {name: row[f'user__{name}'] for name in _USER_FIELDS},
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'patronymic': row['patronymic'],
+            'age': age_on(birth_date, today),
+            'full_name': ' '.join(part for part in (row['first_name'], row['patronymic'], row['last_name']) if part),
+            'gender': row['gender'],
+            'birth_date': birth_date.isoformat(),
+            'city': row['city'],
+            'interests': interests.get(row['id'], []),
+            'status': row['status'],
+            'photo_gallery': _photo_url(photo_gallery, row['photo_gallery'], request),
+            'main_photo': _photo_url(main_photo, row['main_photo'], request),
+            'photo_variants': photo_variant_urls(row['photo_variants'], request),
+            'likes_count': row['likes_count'],
+            'privacy_setting': row['privacy_setting'],
+            'latitude': row['latitude'],
+            'longitude': row['longitude'],
+            'distance_km': round(distance, 2) if distance is not None else None,
+        })
+    return data
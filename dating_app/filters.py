@@ -0,0 +1,17 @@
+# dating_app/filters.py
+
+from rest_framework import filters
+from .search import search_profiles
+
+
+class ProfileSearchFilter(filters.SearchFilter):
+    """
+    Поиск профилей по ?search= через индексированный полнотекстовый и триграммный поиск
+    вместо цепочки icontains по JOIN с увлечениями.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_profiles(queryset, query)
@@ -0,0 +1,150 @@
+# dating_app/geo.py
+
+import math
+from django.conf import settings
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+# Размер ячейки сетки в градусах (~11 км по широте). Меняется только вместе с пересчётом geo_cell
+GRID_CELL_DEGREES = 0.1
+GRID_ROWS = int(round(180 / GRID_CELL_DEGREES))
+GRID_COLUMNS = int(round(360 / GRID_CELL_DEGREES))
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def _option(name, default):
+    return getattr(settings, 'GEO_SEARCH', {}).get(name, default)
+
+
+def _grid_position(latitude, longitude):
+    row = min(int((latitude + 90) / GRID_CELL_DEGREES), GRID_ROWS - 1)
+    column = int(((longitude + 180) % 360) / GRID_CELL_DEGREES) % GRID_COLUMNS
+    return row, column
+
+
+def grid_cell(latitude, longitude):
+    """
+    Номер ячейки сетки для точки; None, если координаты не заданы.
+    Ячейки одной строки сетки идут подряд, поэтому полоса по долготе — это диапазон номеров.
+    """
+    if latitude is None or longitude is None:
+        return None
+    row, column = _grid_position(latitude, longitude)
+    return row * GRID_COLUMNS + column
+
+
+def cell_ranges(latitude, longitude, radius_km):
+    """
+    Диапазоны номеров ячеек (включительно), покрывающие круг радиуса radius_km вокруг точки.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0)
+    # Долготный размах считаем по самой дальней от экватора широте круга
+    widest = max(abs(min_lat), abs(max_lat))
+    cos_lat = math.cos(math.radians(widest))
+    lon_delta = 360.0 if cos_lat < 1e-6 else radius_km / (KM_PER_DEGREE * cos_lat)
+
+    min_row, first_column = _grid_position(min_lat, longitude - lon_delta)
+    max_row, last_column = _grid_position(max_lat, longitude + lon_delta)
+    if lon_delta * 2 >= 360:
+        column_spans = [(0, GRID_COLUMNS - 1)]
+    elif first_column <= last_column:
+        column_spans = [(first_column, last_column)]
+    else:
+        # Круг пересекает линию перемены дат
+        column_spans = [(first_column, GRID_COLUMNS - 1), (0, last_column)]
+
+    return [
+        (row * GRID_COLUMNS + start, row * GRID_COLUMNS + stop)
+        for row in range(min_row, max_row + 1)
+        for start, stop in column_spans
+    ]
+
+
+def distance_expression(latitude, longitude):
+    """
+    Расстояние (км) от точки до профиля по формуле гаверсинусов, вычисляется в SQL.
+    """
+    lat = Radians(F('latitude'))
+    own_lat = math.radians(latitude)
+    half_chord = (
+        Power(Sin((lat - Value(own_lat)) / 2), 2)
+        + Value(math.cos(own_lat)) * Cos(lat) * Power(Sin((Radians(F('longitude')) - Value(math.radians(longitude))) / 2), 2)
+    )
+    # Least защищает asin от погрешности округления чуть выше 1
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(Least(half_chord, Value(1.0), output_field=FloatField())))
+
+
+def filter_within_radius(queryset, latitude, longitude, radius_km):
+    """
+    Профили не дальше radius_km от точки, с аннотацией distance_km.
+    Сначала кандидаты отбираются по индексу geo_cell, затем проверяется точное расстояние.
+    """
+    cells = Q()
+    for start, stop in cell_ranges(latitude, longitude, radius_km):
+        cells |= Q(geo_cell__range=(start, stop))
+    return (
+        queryset
+        .filter(cells)
+        .annotate(distance_km=distance_expression(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+    )
+
+
+def filter_nearest(queryset, latitude, longitude, count):
+    """
+    count ближайших к точке профилей, с аннотацией distance_km.
+    Радиус поиска удваивается, пока в нём не окажется достаточно кандидатов.
+    """
+    radius = _option('NEAREST_START_KM', 5)
+    max_radius = _option('MAX_RADIUS_KM', 500)
+    while True:
+        nearby = filter_within_radius(queryset, latitude, longitude, radius)
+        if radius >= max_radius or nearby[count - 1:count].exists():
+            break
+        radius = min(radius * 2, max_radius)
+    nearest_ids = list(nearby.order_by('distance_km', 'pk').values_list('pk', flat=True)[:count])
+    return queryset.filter(pk__in=nearest_ids).annotate(distance_km=distance_expression(latitude, longitude))
+
+
+def _parse_float(value):
+    try:
+        number = float(value) if value not in (None, '') else None
+    except ValueError:
+        return None # Игнорируем некорректное значение
+    # nan и inf тоже некорректны: nan проходит сравнения и min/max и ломает расчёт ячеек
+    return number if number is None or math.isfinite(number) else None
+
+
+def filter_by_location(queryset, params, user=None):
+    """
+    Фильтр по расстоянию из query-параметров: ?radius=км и/или ?nearest=N.
+    Точка берётся из ?lat=&lon=, иначе из координат профиля user.
+    Некорректные значения и отсутствие точки отключают фильтр.
+    """
+    radius = _parse_float(params.get('radius'))
+    nearest = params.get('nearest')
+    nearest = int(nearest) if nearest and str(nearest).isdigit() and int(nearest) > 0 else None
+    if radius is None and nearest is None:
+        return queryset
+
+    latitude, longitude = _parse_float(params.get('lat')), _parse_float(params.get('lon'))
+    if latitude is None or longitude is None:
+        if user is None or not user.is_authenticated:
+            return queryset
+        latitude, longitude = (
+            queryset.model.objects.filter(user=user).values_list('latitude', 'longitude').first() or (None, None)
+        )
+        if latitude is None or longitude is None:
+            return queryset
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return queryset
+
+    max_radius = _option('MAX_RADIUS_KM', 500)
+    if radius is not None:
+        queryset = filter_within_radius(queryset, latitude, longitude, min(max(radius, 0.0), max_radius))
+    if nearest is not None:
+        queryset = filter_nearest(queryset, latitude, longitude, min(nearest, _option('MAX_NEAREST', 500)))
+    return queryset.order_by('distance_km', 'pk')
+
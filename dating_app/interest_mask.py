@@ -0,0 +1,112 @@
+# dating_app/interest_mask.py
+
+import operator
+from functools import reduce
+from django.contrib.postgres.aggregates import BitOr
+from django.db.models import BigIntegerField, Exists, F, Func, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+from .models import UserProfile, Interest
+from .interest_sync import connect_interest_refresh
+
+
+class BitCount(Func):
+    """
+    Количество единичных битов в bigint. bit_count() появился только в PostgreSQL 14,
+    поэтому считаем через текстовое представление bit(64).
+    """
+    template = "length(replace((%(expressions)s)::bit(64)::text, '0', ''))"
+    output_field = IntegerField()
+
+
+def refresh_interest_mask(queryset):
+    """
+    Пересчитывает interest_mask для профилей из queryset одним UPDATE.
+    Работает и с историческими моделями из миграций.
+    """
+    through = queryset.model.interests.through
+    # Литерал приводим к bigint явно: иначе сдвиг выполняется в int4 и старшие биты теряются
+    interest_bit = Cast(Value(1), BigIntegerField()).bitleftshift(F('interest__bit'))
+    mask = Subquery(
+        through.objects
+        .filter(userprofile_id=OuterRef('pk'), interest__bit__isnull=False)
+        .order_by()
+        .values('userprofile_id')
+        .annotate(mask=BitOr(interest_bit))
+        .values('mask')
+    )
+    return queryset.order_by().update(interest_mask=Coalesce(mask, Value(0), output_field=BigIntegerField()))
+
+
+def parse_interest_ids(value):
+    """
+    Разбирает список id увлечений из query-параметра ("1,2,3"), некорректные значения игнорируются.
+    """
+    ids = set()
+    for part in (value or '').split(','):
+        part = part.strip()
+        if part.isdigit():
+            ids.add(int(part))
+    return ids
+
+
+def interest_mask_for(interest_ids):
+    """
+    Возвращает (маска, id увлечений без бита) для набора id увлечений.
+    Несуществующие id в результат не попадают.
+    """
+    mask = 0
+    unmasked = []
+    for interest_id, bit in Interest.objects.filter(id__in=interest_ids).values_list('id', 'bit'):
+        if bit is None:
+            unmasked.append(interest_id)
+        else:
+            mask |= 1 << bit
+    return mask, unmasked
+
+
+def _has_interest(interest_id):
+    return Exists(
+        UserProfile.interests.through.objects.filter(userprofile_id=OuterRef('pk'), interest_id=interest_id)
+    )
+
+
+def filter_by_interests(queryset, params, user=None):
+    """
+    Фильтрует профили по увлечениям без JOIN по M2M:
+    interests_any — хотя бы одно из увлечений, interests_all — все увлечения,
+    min_shared — не меньше N общих увлечений с профилем user.
+    """
+    any_ids = parse_interest_ids(params.get('interests_any'))
+    if any_ids:
+        mask, unmasked = interest_mask_for(any_ids)
+        conditions = [_has_interest(interest_id) for interest_id in unmasked]
+        if mask:
+            queryset = queryset.alias(interests_any_match=F('interest_mask').bitand(mask))
+            conditions.append(~Q(interests_any_match=0))
+        if not conditions:
+            return queryset.none() # Ни одного существующего увлечения
+        queryset = queryset.filter(reduce(operator.or_, conditions))
+
+    all_ids = parse_interest_ids(params.get('interests_all'))
+    if all_ids:
+        mask, unmasked = interest_mask_for(all_ids)
+        if bin(mask).count('1') + len(unmasked) < len(all_ids):
+            return queryset.none() # Среди требуемых есть несуществующее увлечение
+        if mask:
+            queryset = queryset.alias(interests_all_match=F('interest_mask').bitand(mask)).filter(interests_all_match=mask)
+        for interest_id in unmasked:
+            queryset = queryset.filter(_has_interest(interest_id))
+
+    min_shared = params.get('min_shared')
+    if min_shared and str(min_shared).isdigit() and int(min_shared) > 0 and user is not None and user.is_authenticated:
+        own_mask = UserProfile.objects.filter(user=user).values_list('interest_mask', flat=True).first() or 0
+        queryset = queryset.alias(
+            shared_interests=BitCount(F('interest_mask').bitand(own_mask))
+        ).filter(shared_interests__gte=int(min_shared))
+
+    return queryset
+
+
+# --- Синхронизация маски с M2M ---
+# Бит удалённого увлечения освобождается и может достаться новому — снимаем его с профилей
+connect_interest_refresh('mask', refresh_interest_mask, on_delete=lambda interest: interest.bit is not None)
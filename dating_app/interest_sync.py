@@ -0,0 +1,47 @@
+# dating_app/interest_sync.py
+#
+# Пересчёт данных профиля, зависящих от его увлечений (поисковый документ в search.py,
+# маска в interest_mask.py): при изменении M2M UserProfile.interests и при удалении
+# увлечения обновляются затронутые профили.
+
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+from .models import UserProfile, Interest
+
+
+def connect_interest_refresh(name, refresh, on_delete=None):
+    """
+    Подключает сигналы, вызывающие refresh(queryset профилей) для профилей, у которых изменился
+    набор увлечений. name — уникальное имя (dispatch_uid и атрибут с запомненными профилями);
+    on_delete(interest) решает, пересчитывать ли профили удалённого увлечения (по умолчанию — да).
+    """
+    attribute = f'_{name}_profile_ids'
+
+    def remember_profiles(interest):
+        setattr(interest, attribute, list(interest.userprofile_set.values_list('pk', flat=True)))
+
+    def profile_interests_changed(sender, instance, action, reverse, pk_set, **kwargs):
+        if action == 'pre_clear' and reverse:
+            # Для очистки со стороны увлечения pk_set не передаётся — запоминаем профили заранее
+            remember_profiles(instance)
+        elif action in ('post_add', 'post_remove', 'post_clear'):
+            if not reverse:
+                profile_ids = [instance.pk]
+            elif action == 'post_clear':
+                profile_ids = getattr(instance, attribute, [])
+            else:
+                profile_ids = pk_set or []
+            if profile_ids:
+                refresh(UserProfile.objects.filter(pk__in=profile_ids))
+
+    def interest_deleting(sender, instance, **kwargs):
+        remember_profiles(instance)
+
+    def interest_deleted(sender, instance, **kwargs):
+        if on_delete is None or on_delete(instance):
+            refresh(UserProfile.objects.filter(pk__in=getattr(instance, attribute, [])))
+
+    # Обработчики — замыкания, поэтому держим на них сильные ссылки (weak=False)
+    m2m_changed.connect(profile_interests_changed, sender=UserProfile.interests.through, weak=False,
+                        dispatch_uid=f'{name}_interests_changed')
+    pre_delete.connect(interest_deleting, sender=Interest, weak=False, dispatch_uid=f'{name}_interest_deleting')
+    post_delete.connect(interest_deleted, sender=Interest, weak=False, dispatch_uid=f'{name}_interest_deleted')
@@ -0,0 +1,72 @@
+# dating_app/management/commands/_bench_utils.py
+#
+# Вспомогательные функции для команд-бенчмарков (bench_*).
+# Модуль начинается с "_", поэтому Django не считает его командой.
+
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from dating_app.geo import grid_cell
+from dating_app.models import UserProfile
+
+User = get_user_model()
+
+CITIES = ["Москва", "Санкт-Петербург", "Новосибирск", "Екатеринбург", "Казань", "Нижний Новгород", "Челябинск", "Самара", "Омск", "Ростов-на-Дону"]
+STATUSES = ["searching", "taken", "complicated"]
+GENDERS = ["M", "F"]
+
+
+def seed_profiles(start, stop, batch_size=5000, prefix='bench', location=None):
+    """
+    Создаёт синтетических пользователей с профилями с номерами [start, stop)
+    пачками через bulk_create. Пароли не задаются (неиспользуемый хэш).
+    location — необязательная функция без аргументов, возвращающая (широта, долгота).
+    """
+    today = date.today()
+    for batch_start in range(start, stop, batch_size):
+        batch_stop = min(batch_start + batch_size, stop)
+        users = [
+            User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com", password='!')
+            for i in range(batch_start, batch_stop)
+        ]
+        users = User.objects.bulk_create(users, batch_size=batch_size)
+        profiles = [
+            UserProfile(
+                user=user,
+                first_name=f"Имя{user.username}",
+                last_name=f"Фамилия{user.username}",
+                gender=random.choice(GENDERS),
+                birth_date=today - timedelta(days=random.randint(365 * 18, 365 * 60)),
+                city=random.choice(CITIES),
+                status=random.choice(STATUSES),
+            )
+            for user in users
+        ]
+        if location is not None:
+            for profile in profiles:
+                profile.latitude, profile.longitude = location()
+                profile.geo_cell = grid_cell(profile.latitude, profile.longitude) # bulk_create не вызывает save()
+        UserProfile.objects.bulk_create(profiles, batch_size=batch_size)
+
+
+def measure(func, repeat):
+    """
+    Вызывает func repeat раз и возвращает список длительностей в миллисекундах.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def summarize(timings, upper=95):
+    """
+    Возвращает строку с медианой и верхним перцентилем (по умолчанию p95) по списку длительностей (мс).
+    """
+    ordered = sorted(timings)
+    tail = ordered[min(len(ordered) - 1, int(len(ordered) * upper / 100))]
+    return f"p50={statistics.median(ordered):.2f}ms p{upper}={tail:.2f}ms"
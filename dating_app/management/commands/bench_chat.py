@@ -0,0 +1,191 @@
+# dating_app/management/commands/bench_chat.py
+
+import asyncio
+import json
+import time
+import tracemalloc
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from channels.routing import URLRouter
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from django.contrib.auth import get_user_model
+from dating_app.models import Chat, Match, Message
+from dating_app.routing import websocket_urlpatterns
+from ._bench_utils import seed_profiles, summarize
+
+try:
+    from channels.testing import WebsocketCommunicator
+except ImportError: # channels.testing требует daphne
+    WebsocketCommunicator = None
+
+User = get_user_model()
+
+PREFIX = 'benchchat'
+IN_MEMORY_LAYER = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+class _Communicator(ApplicationCommunicator):
+    """
+    Минимальная замена WebsocketCommunicator, если channels.testing недоступен.
+    """
+
+    def __init__(self, application, path):
+        scope = {'type': 'websocket', 'path': path, 'headers': [], 'query_string': b'', 'subprotocols': []}
+        super().__init__(application, scope)
+
+    async def connect(self, timeout=1):
+        await self.send_input({'type': 'websocket.connect'})
+        response = await self.receive_output(timeout)
+        return response['type'] == 'websocket.accept', None
+
+    async def send_to(self, text_data):
+        await self.send_input({'type': 'websocket.receive', 'text': text_data})
+
+    async def receive_from(self, timeout=1):
+        return (await self.receive_output(timeout))['text']
+
+    async def disconnect(self, code=1000, timeout=1):
+        await self.send_input({'type': 'websocket.disconnect', 'code': code})
+        await self.wait(timeout)
+
+
+def _communicator(user, other_user_id):
+    application = URLRouter(websocket_urlpatterns)
+
+    # Пользователь подставляется в scope так же, как это делает AuthMiddlewareStack
+    async def authenticated(scope, receive, send):
+        return await application(dict(scope, user=user), receive, send)
+
+    communicator_class = WebsocketCommunicator or _Communicator
+    return communicator_class(authenticated, f'/ws/chat/{other_user_id}/')
+
+
+class _QueryCounter:
+    """
+    Считает запросы через execute_wrapper (CaptureQueriesContext хранит не больше 9000).
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+async def _gather_limited(coroutines, limit):
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(coroutine) for coroutine in coroutines))
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк ChatConsumer: задержка доставки, запросы к БД на сообщение и память на соединение (создаёт и удаляет данные)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pairs', type=int, default=1000, help='Количество пар с матчем (по два сокета на пару)')
+        parser.add_argument('--messages', type=int, default=20, help='Сообщений от каждой пары')
+        parser.add_argument('--concurrency', type=int, default=500, help='Сколько подключений открывать одновременно')
+        parser.add_argument('--layer', choices=['memory', 'default'], default='memory',
+                            help='memory — InMemoryChannelLayer, default — CHANNEL_LAYERS из настроек')
+        parser.add_argument('--timeout', type=float, default=30, help='Ожидание одного события, сек')
+
+    def handle(self, *args, **options):
+        self.cleanup()
+        pairs = options['pairs']
+        seed_profiles(0, pairs * 2, prefix=PREFIX)
+        user_ids = sorted(User.objects.filter(username__startswith=PREFIX).values_list('id', flat=True))
+        users = User.objects.in_bulk(user_ids)
+        pair_users = [(users[user_ids[i]], users[user_ids[i + 1]]) for i in range(0, len(user_ids), 2)]
+        Match.objects.bulk_create([Match(user1=user1, user2=user2) for user1, user2 in pair_users])
+
+        try:
+            if options['layer'] == 'memory':
+                with override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER):
+                    report = self.run(pair_users, options)
+            else:
+                report = self.run(pair_users, options)
+        finally:
+            self.cleanup()
+
+        for line in report:
+            self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершён.'))
+
+    def cleanup(self):
+        Chat.objects.filter(participants__username__startswith=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+    def run(self, pair_users, options):
+        timeout = options['timeout']
+        messages = options['messages']
+        latencies = []
+        connect_timings = []
+        communicators = []
+
+        async def open_socket(user, other_user):
+            communicator = _communicator(user, other_user.id)
+            started = time.perf_counter()
+            connected, _ = await communicator.connect(timeout=timeout)
+            connect_timings.append((time.perf_counter() - started) * 1000)
+            if not connected:
+                raise RuntimeError(f'Соединение {user.username} -> {other_user.username} отклонено')
+            communicators.append(communicator)
+            return communicator
+
+        async def connect_all():
+            coroutines = []
+            for user1, user2 in pair_users:
+                coroutines.append(open_socket(user1, user2))
+                coroutines.append(open_socket(user2, user1))
+            sockets = await _gather_limited(coroutines, options['concurrency'])
+            return [(sockets[i], sockets[i + 1]) for i in range(0, len(sockets), 2)]
+
+        async def talk(sender, receiver):
+            for number in range(messages):
+                await sender.send_to(text_data=json.dumps({'message': f'{number} {time.perf_counter()}'}))
+                event = json.loads(await receiver.receive_from(timeout=timeout))
+                latencies.append((time.perf_counter() - float(event['message'].split()[1])) * 1000)
+                await sender.receive_from(timeout=timeout) # Отправитель тоже в группе чата
+
+        async def disconnect_all():
+            await _gather_limited([communicator.disconnect(timeout=timeout) for communicator in communicators],
+                                  options['concurrency'])
+
+        async def scenario():
+            # Подключение: холодное (матч и чат ищутся в БД), память считаем по tracemalloc
+            tracemalloc.start()
+            memory_before = tracemalloc.get_traced_memory()[0]
+            pairs = await connect_all()
+            memory = (tracemalloc.get_traced_memory()[0] - memory_before) / len(communicators)
+            tracemalloc.stop()
+            connect_queries = queries.count
+
+            started = time.perf_counter()
+            await asyncio.gather(*(talk(sender, receiver) for sender, receiver in pairs))
+            elapsed = time.perf_counter() - started
+            await disconnect_all() # Остаток пачек сохраняется при отключении
+            return len(pairs), memory, connect_queries, elapsed
+
+        # Сокеты живут в цикле событий одного async_to_sync; потребители обращаются к БД
+        # из этого потока (thread_sensitive), поэтому execute_wrapper видит все запросы
+        queries = _QueryCounter()
+        with connection.execute_wrapper(queries):
+            pair_count, memory_per_socket, connect_queries, elapsed = async_to_sync(scenario)()
+        traffic_queries = queries.count - connect_queries
+
+        total = pair_count * messages
+        saved = Message.objects.filter(sender__username__startswith=PREFIX).count()
+        return [
+            f"layer={options['layer']} sockets={len(communicators)} messages={total} saved={saved}",
+            f"connect: {summarize(connect_timings, upper=99)} queries/connect={connect_queries / len(communicators):.2f}",
+            f"memory/connection: {memory_per_socket / 1024:.1f} KiB",
+            f"delivery: {summarize(latencies, upper=99)} throughput={total / elapsed:.0f} msg/s",
+            f"queries/message={traffic_queries / max(total, 1):.3f}",
+        ]
@@ -0,0 +1,66 @@
+# dating_app/management/commands/bench_compatibility.py
+
+import random
+from datetime import date, timedelta
+import numpy as np
+from django.core.management.base import BaseCommand
+from dating_app.compatibility import CandidateArrays, score_candidates, STATUS_SCORES, DEFAULT_WEIGHTS, AGE_HALF_SCORE_YEARS
+from dating_app.models import UserProfile
+from ._bench_utils import CITIES, STATUSES, measure, summarize
+
+
+def _python_score(viewer, rows):
+    """
+    Та же оценка построчным циклом на Python — для сравнения.
+    """
+    scores = []
+    own_ordinal = viewer.birth_date.toordinal()
+    for _, birth_date, city, mask, status in rows:
+        age_gap = abs(birth_date.toordinal() - own_ordinal) / 365.25
+        union = bin(mask | viewer.interest_mask).count('1')
+        jaccard = bin(mask & viewer.interest_mask).count('1') / union if union else 0.0
+        scores.append(
+            DEFAULT_WEIGHTS['age'] / (1.0 + age_gap / AGE_HALF_SCORE_YEARS)
+            + DEFAULT_WEIGHTS['city'] * (city == viewer.city)
+            + DEFAULT_WEIGHTS['interests'] * jaccard
+            + DEFAULT_WEIGHTS['status'] * STATUS_SCORES.get(status, 0.0)
+        )
+    return scores
+
+
+class Command(BaseCommand):
+    help = 'Микробенчмарк векторной оценки совместимости (синтетические данные, БД не используется)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--interests', type=int, default=40, help='Сколько разных увлечений в маске')
+
+    def handle(self, *args, **options):
+        today = date.today()
+        count = options['candidates']
+
+        def random_mask():
+            return sum(1 << bit for bit in random.sample(range(options['interests']), random.randint(0, 6)))
+
+        rows = [
+            (i, today - timedelta(days=random.randint(365 * 18, 365 * 60)), random.choice(CITIES),
+             random_mask(), random.choice(STATUSES))
+            for i in range(count)
+        ]
+        viewer = UserProfile(birth_date=date(1995, 6, 1), city=CITIES[0], interest_mask=random_mask())
+
+        build = measure(lambda: CandidateArrays(rows), 5)
+        candidates = CandidateArrays(rows)
+        score = measure(lambda: score_candidates(viewer, candidates, DEFAULT_WEIGHTS), options['repeat'])
+        rank = measure(
+            lambda: np.lexsort((candidates.ids, -score_candidates(viewer, candidates, DEFAULT_WEIGHTS))),
+            options['repeat'],
+        )
+        python = measure(lambda: _python_score(viewer, rows), 3)
+
+        self.stdout.write(f'candidates={count}')
+        self.stdout.write(f'build arrays: {summarize(build)}')
+        self.stdout.write(f'numpy score:  {summarize(score)}')
+        self.stdout.write(f'numpy rank:   {summarize(rank)}')
+        self.stdout.write(f'python loop:  {summarize(python)}')
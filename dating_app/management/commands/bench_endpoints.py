@@ -0,0 +1,104 @@
+# dating_app/management/commands/bench_endpoints.py
+
+import json
+import subprocess
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from dating_app.endpoint_bench import ENDPOINTS, api_client, measure_endpoint, over_budget, seed_viewer_activity
+from dating_app.models import UserProfile
+from ._bench_utils import seed_profiles
+
+User = get_user_model()
+
+
+def _tier_size(tier):
+    # 1k -> 1000, 100k -> 100000, 1m -> 1000000
+    multipliers = {'k': 1000, 'm': 1000000}
+    tier = tier.strip().lower()
+    if tier[-1:] in multipliers:
+        return int(tier[:-1]) * multipliers[tier[-1]]
+    return int(tier)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Регрессионный замер эндпоинтов на уровнях данных (1k/100k профилей): время и число SQL-запросов, '
+            'результаты пишутся в JSON; превышение бюджета запросов — ошибка (данные откатываются)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tiers', default='1k,100k', help='Уровни данных через запятую (1k, 100k, 1m или число)')
+        parser.add_argument('--repeat', type=int, default=20, help='Запросов к каждому эндпоинту')
+        parser.add_argument('--history', type=int, default=200, help='Записей истории пользователя каждого вида')
+        parser.add_argument('--output', default='perf_results.json', help='Файл результатов')
+        parser.add_argument('--baseline', default=None, help='Файл результатов прошлого запуска для сравнения')
+
+    def handle(self, *args, **options):
+        tiers = sorted(options['tiers'].split(','), key=_tier_size)
+        repeat = options['repeat']
+        results = {}
+
+        with transaction.atomic():
+            seeded = 0
+            for tier in tiers:
+                size = _tier_size(tier)
+                seed_profiles(seeded, size)
+                seeded = size
+                with connection.cursor() as cursor:
+                    # Обновляем статистику планировщика после массовой вставки
+                    for model in (User, UserProfile):
+                        cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+                # Отдельный пользователь на уровень: история и голоса прошлых уровней не копятся
+                viewer = User.objects.get(username=f'bench{size - 1}')
+                others = list(User.objects.filter(username__startswith='bench').exclude(pk=viewer.pk)
+                              .order_by('?').values_list('id', flat=True)[:2 * options['history'] + repeat])
+                context = {'targets': seed_viewer_activity(viewer, others, options['history'])}
+                client = api_client(viewer)
+
+                results[tier] = {}
+                for endpoint in ENDPOINTS:
+                    result = measure_endpoint(client, endpoint, context, repeat)
+                    results[tier][endpoint.name] = result
+                    self.stdout.write(
+                        f"{tier:>5} {endpoint.name:<15} запросов {result['queries']:>2}/{result['budget']:<2} "
+                        f"p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms HTTP {result['status']}"
+                    )
+
+            # Синтетические данные не сохраняем
+            transaction.set_rollback(True)
+
+        report = {'commit': _git_commit(), 'created': timezone.now().isoformat(), 'repeat': repeat, 'tiers': results}
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(f"Результаты записаны в {options['output']}")
+
+        if options['baseline']:
+            self._compare(options['baseline'], results)
+
+        failed = [f'{tier}/{name}' for tier, tier_results in results.items() for name in over_budget(tier_results)]
+        if failed:
+            raise CommandError(f"Превышен бюджет запросов или ошибка ответа: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершён.'))
+
+    def _compare(self, path, results):
+        with open(path, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        self.stdout.write(f"Сравнение с {path} (коммит {baseline.get('commit')}):")
+        for tier, tier_results in results.items():
+            for name, result in tier_results.items():
+                before = baseline.get('tiers', {}).get(tier, {}).get(name)
+                if before is None:
+                    continue
+                change = (result['p50_ms'] / before['p50_ms'] - 1) * 100 if before['p50_ms'] else 0
+                self.stdout.write(
+                    f"{tier:>5} {name:<15} запросов {before['queries']} -> {result['queries']}, "
+                    f"p50 {before['p50_ms']:.2f} -> {result['p50_ms']:.2f}ms ({change:+.0f}%)"
+                )
@@ -0,0 +1,76 @@
+# dating_app/management/commands/bench_geo.py
+
+import random
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.contrib.auth import get_user_model
+from dating_app.geo import distance_expression, filter_nearest, filter_within_radius
+from dating_app.models import UserProfile
+from ._bench_utils import seed_profiles, measure, summarize
+
+User = get_user_model()
+
+# Центры скоплений точек (города) — пользователи живут не равномерно по карте
+CENTERS = [(55.7558, 37.6173), (59.9343, 30.3351), (55.0084, 82.9357), (56.8389, 60.6057), (55.7961, 49.1064)]
+
+
+def _random_point():
+    if random.random() < 0.2:
+        # Часть точек рассеяна по всей территории
+        return random.uniform(42.0, 70.0), random.uniform(20.0, 140.0)
+    latitude, longitude = random.choice(CENTERS)
+    return random.gauss(latitude, 0.4), random.gauss(longitude, 0.6)
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк поиска по радиусу на синтетических координатах (данные откатываются)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=1000000)
+        parser.add_argument('--queries', type=int, default=50, help='Количество запросов на каждый замер')
+        parser.add_argument('--radii', default='5,25,100', help='Радиусы в км через запятую')
+        parser.add_argument('--no-scan', action='store_true', help='Не замерять полный перебор без сетки')
+
+    def handle(self, *args, **options):
+        radii = [float(radius) for radius in options['radii'].split(',')]
+        queries = options['queries']
+
+        with transaction.atomic():
+            seed_profiles(0, options['points'], prefix='benchgeo', location=_random_point)
+            with connection.cursor() as cursor:
+                # Обновляем статистику планировщика после массовой вставки
+                for model in (User, UserProfile):
+                    cursor.execute(f'ANALYZE {model._meta.db_table}')
+            queryset = UserProfile.objects.all()
+
+            for radius in radii:
+                points = [_random_point() for _ in range(queries)]
+                found = []
+
+                def grid_query():
+                    point = points[len(found) % len(points)]
+                    found.append(len(list(filter_within_radius(queryset, *point, radius).values_list('pk', flat=True))))
+
+                timings = measure(grid_query, queries)
+                self.stdout.write(
+                    f"radius={radius:g}km grid: {summarize(timings)} (в среднем {sum(found) // len(found)} профилей)"
+                )
+                if not options['no_scan']:
+                    def scan_query():
+                        point = random.choice(points)
+                        list(
+                            queryset.annotate(distance_km=distance_expression(*point))
+                            .filter(distance_km__lte=radius).values_list('pk', flat=True)
+                        )
+
+                    timings = measure(scan_query, max(1, queries // 10))
+                    self.stdout.write(f"radius={radius:g}km scan: {summarize(timings)}")
+
+            points = [_random_point() for _ in range(queries)]
+            timings = measure(lambda: list(filter_nearest(queryset, *random.choice(points), 20)), queries)
+            self.stdout.write(f"nearest=20: {summarize(timings)}")
+
+            # Синтетические данные не сохраняем
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершён.'))
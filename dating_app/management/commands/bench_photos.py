@@ -0,0 +1,70 @@
+# dating_app/management/commands/bench_photos.py
+
+import io
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from django.core.management.base import BaseCommand
+from dating_app.photos import render_variants
+from ._bench_utils import summarize
+
+
+def _synthetic_photo(width, height, seed):
+    """
+    JPEG, похожий на снимок с телефона: плавные пятна цвета плюс зерно, качество 92.
+    """
+    rng = random.Random(seed)
+    small = (width // 32, height // 32)
+    texture = Image.frombytes('RGB', small, rng.randbytes(small[0] * small[1] * 3)).resize((width, height), Image.Resampling.BICUBIC)
+    grain = Image.effect_noise((width, height), 12).convert('RGB')
+    output = io.BytesIO()
+    Image.blend(texture, grain, 0.15).save(output, 'JPEG', quality=92)
+    return output.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'Пропускная способность обработки фото (копии thumb/card/full в WebP и JPEG): на одно ядро и в пуле потоков'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--photos', type=int, default=20, help='Сколько фото обработать в каждом режиме')
+        parser.add_argument('--size', default='4032x3024', help='Разрешение исходных фото')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Потоков в пуле')
+
+    def handle(self, *args, **options):
+        width, height = (int(part) for part in options['size'].split('x'))
+        count, workers = options['photos'], options['workers']
+        photos = [_synthetic_photo(width, height, seed) for seed in range(min(count, 5))]
+        sources = [photos[i % len(photos)] for i in range(count)]
+        original_mb = sum(len(photo) for photo in photos) / len(photos) / 1024 / 1024
+        self.stdout.write(f"Исходные фото {width}x{height}, в среднем {original_mb:.1f} МБ, ядер: {os.cpu_count()}")
+
+        def process(source):
+            return render_variants(io.BytesIO(source))
+
+        # Одно ядро: последовательно, время процессора на фото
+        timings, cpu_started, started = [], time.process_time(), time.perf_counter()
+        for source in sources:
+            photo_started = time.perf_counter()
+            variants = process(source)
+            timings.append((time.perf_counter() - photo_started) * 1000)
+        elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+        self.stdout.write(
+            f"1 поток: {count / elapsed:.2f} фото/с, {summarize(timings)} на фото, CPU {cpu / count * 1000:.0f}ms на фото"
+        )
+
+        # Пул потоков, как в photo_processing (Pillow отпускает GIL)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            started = time.perf_counter()
+            list(executor.map(process, sources))
+            elapsed = time.perf_counter() - started
+        cores = min(workers, os.cpu_count() or 1)
+        self.stdout.write(
+            f"{workers} потоков: {count / elapsed:.2f} фото/с, {count / elapsed / cores:.2f} фото/с на ядро"
+        )
+
+        for name, variant in variants.items():
+            formats = ', '.join(f"{image_format} {len(data) / 1024:.0f} КБ" for image_format, data in variant['data'].items())
+            self.stdout.write(f"  {name:<5} {variant['width']}x{variant['height']}: {formats}")
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершён.'))
@@ -0,0 +1,50 @@
+# dating_app/management/commands/bench_random_profile.py
+
+import random
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.contrib.auth import get_user_model
+from dating_app.models import UserProfile
+from dating_app.discovery import candidate_queryset, pick_random_profile
+from ._bench_utils import seed_profiles, measure, summarize
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк выбора случайного профиля на наборах разного размера (данные откатываются)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000,1000000',
+                            help='Размеры пула профилей через запятую')
+        parser.add_argument('--draws', type=int, default=200, help='Количество выборок на каждый размер')
+        parser.add_argument('--legacy', action='store_true',
+                            help='Дополнительно замерить старый способ list(queryset) + random.choice')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        draws = options['draws']
+
+        with transaction.atomic():
+            seeded = 0
+            for size in sizes:
+                seed_profiles(seeded, size)
+                seeded = size
+                with connection.cursor() as cursor:
+                    # Обновляем статистику планировщика после массовой вставки
+                    for model in (User, UserProfile):
+                        cursor.execute(f'ANALYZE {model._meta.db_table}')
+                viewer = User.objects.get(username='bench0')
+                params = {'gender': 'F', 'min_age': '20', 'max_age': '40'}
+
+                timings = measure(lambda: pick_random_profile(candidate_queryset(viewer, params)), draws)
+                self.stdout.write(f"{size:>9} профилей  random_key: {summarize(timings)}")
+
+                if options['legacy']:
+                    timings = measure(lambda: random.choice(list(candidate_queryset(viewer, params))), max(1, draws // 20))
+                    self.stdout.write(f"{size:>9} профилей  list+choice: {summarize(timings)}")
+
+            # Синтетические данные не сохраняем
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершён.'))
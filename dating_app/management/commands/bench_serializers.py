@@ -0,0 +1,67 @@
+# dating_app/management/commands/bench_serializers.py
+
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from dating_app.fast_serializers import profile_values, serialize_profile_rows
+from dating_app.models import Interest, UserProfile
+from dating_app.renderers import ORJSONRenderer
+from dating_app.serializers import UserProfileSerializer
+from ._bench_utils import seed_profiles, summarize
+
+
+def _cpu_ms(func):
+    started = time.process_time()
+    func()
+    return (time.process_time() - started) * 1000
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает процессорное время UserProfileSerializer и быстрого пути на 1000 профилей (данные откатываются)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', type=int, default=1000)
+        parser.add_argument('--interests', type=int, default=5, help='Увлечений на профиль')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        count = options['profiles']
+        with transaction.atomic():
+            seed_profiles(0, count, prefix='benchser')
+            interests = [Interest.objects.create(name=f'benchser-{i}') for i in range(20)]
+            profiles = list(UserProfile.objects.filter(user__username__startswith='benchser'))
+            through = UserProfile.interests.through
+            through.objects.bulk_create([
+                through(userprofile_id=profile.pk, interest_id=interest.pk)
+                for profile in profiles for interest in random.sample(interests, options['interests'])
+            ])
+            queryset = UserProfile.objects.filter(user__username__startswith='benchser').order_by('id')
+
+            def drf_fetch():
+                return list(queryset.select_related('user').prefetch_related('interests'))
+
+            def fast_fetch():
+                return list(profile_values(queryset))
+
+            # У быстрого пути «сериализация» включает и запрос увлечений — он заменяет prefetch_related
+            for name, fetch, serialize, renderer in [
+                ('drf', drf_fetch, lambda data: UserProfileSerializer(data, many=True).data, JSONRenderer()),
+                ('fast', fast_fetch, serialize_profile_rows, ORJSONRenderer()),
+            ]:
+                full, serialize_only = [], []
+                for _ in range(options['repeat']):
+                    full.append(_cpu_ms(lambda: renderer.render(serialize(fetch()))))
+                    loaded = fetch()
+                    serialize_only.append(_cpu_ms(lambda: renderer.render(serialize(loaded))))
+                scale = 1000 / count
+                self.stdout.write(
+                    f"{name}: запрос+сериализация+JSON {summarize([t * scale for t in full])}, "
+                    f"сериализация+JSON {summarize([t * scale for t in serialize_only])} (CPU на 1000 профилей)"
+                )
+
+            # Синтетические данные не сохраняем
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершён.'))
@@ -0,0 +1,93 @@
+# dating_app/management/commands/bench_votes.py
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import connection, IntegrityError
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from dating_app.models import UserProfile, LikeDislike, Match
+from dating_app.seen import mark_seen
+from dating_app.votes import apply_votes
+from ._bench_utils import seed_profiles
+
+User = get_user_model()
+
+PREFIX = 'benchvote'
+
+
+def _legacy_vote(voter, target_user, vote_value):
+    """
+    Прежняя логика like_dislike (чтение, затем запись) — для сравнения.
+    """
+    existing_vote = LikeDislike.objects.filter(voter=voter, target_user=target_user).first()
+    if existing_vote:
+        if existing_vote.vote == vote_value:
+            return
+        existing_vote.vote = vote_value
+        existing_vote.save()
+    else:
+        LikeDislike.objects.create(voter=voter, target_user=target_user, vote=vote_value)
+        mark_seen(voter.id, [target_user.id])
+    mutual_like = LikeDislike.objects.filter(voter=target_user, target_user=voter, vote=LikeDislike.LIKE).exists()
+    if vote_value == LikeDislike.LIKE and mutual_like:
+        Match.objects.get_or_create(
+            user1=min(voter, target_user, key=lambda u: u.id),
+            user2=max(voter, target_user, key=lambda u: u.id)
+        )
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк пропускной способности голосования при параллельных запросах (создаёт и удаляет данные)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['atomic', 'legacy'], default='atomic')
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--votes', type=int, default=5000, help='Общее количество голосов')
+        parser.add_argument('--users', type=int, default=50,
+                            help='Размер пула пользователей (меньше — больше конфликтов)')
+
+    def handle(self, *args, **options):
+        User.objects.filter(username__startswith=PREFIX).delete()
+        seed_profiles(0, options['users'], prefix=PREFIX)
+        users = list(User.objects.filter(username__startswith=PREFIX))
+        errors = []
+
+        def vote_worker(count):
+            try:
+                for _ in range(count):
+                    voter, target = random.sample(users, 2)
+                    vote_value = random.choice([LikeDislike.LIKE, LikeDislike.DISLIKE])
+                    try:
+                        if options['mode'] == 'atomic':
+                            apply_votes(voter, [(target.id, vote_value)])
+                        else:
+                            _legacy_vote(voter, target, vote_value)
+                    except IntegrityError as exc:
+                        errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = options['threads']
+        per_thread = options['votes'] // threads
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(vote_worker, [per_thread] * threads))
+        elapsed = time.perf_counter() - started
+
+        total = per_thread * threads
+        # Сколько счётчиков likes_count разошлись с фактическим числом лайков
+        actual = dict(
+            LikeDislike.objects.filter(target_user__in=users, vote=LikeDislike.LIKE)
+            .values('target_user').annotate(total=Count('id')).values_list('target_user', 'total')
+        )
+        drift = sum(
+            1 for user_id, likes_count in UserProfile.objects.filter(user__in=users).values_list('user_id', 'likes_count')
+            if likes_count != actual.get(user_id, 0)
+        )
+        self.stdout.write(
+            f"mode={options['mode']} threads={threads} votes={total} "
+            f"throughput={total / elapsed:.0f} votes/s errors={len(errors)} likes_count_drift={drift}"
+        )
+        User.objects.filter(username__startswith=PREFIX).delete()
@@ -0,0 +1,67 @@
+# dating_app/management/commands/compact_view_history.py
+
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from dating_app.models import ViewHistory, ViewHistoryRollup
+
+# Строки переносятся атомарно: DELETE ... RETURNING сразу сворачивается в сводку,
+# поэтому просмотр не может ни потеряться, ни учесться дважды
+COMPACT_SQL = """
+WITH moved AS (
+    DELETE FROM {raw} WHERE id >= %s AND id < %s AND timestamp < %s
+    RETURNING viewer_id, viewed_profile_id, timestamp
+)
+INSERT INTO {rollup} (viewer_id, viewed_profile_id, view_count, first_seen, last_seen)
+SELECT viewer_id, viewed_profile_id, COUNT(*), MIN(timestamp), MAX(timestamp)
+FROM moved
+GROUP BY viewer_id, viewed_profile_id
+ON CONFLICT (viewer_id, viewed_profile_id) DO UPDATE SET
+    view_count = {rollup}.view_count + EXCLUDED.view_count,
+    first_seen = LEAST({rollup}.first_seen, EXCLUDED.first_seen),
+    last_seen = GREATEST({rollup}.last_seen, EXCLUDED.last_seen)
+"""
+
+
+class Command(BaseCommand):
+    help = 'Сворачивает сырые записи ViewHistory в ViewHistoryRollup и удаляет просмотры старше срока хранения'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000,
+                            help='Сколько сырых записей переносить одной транзакцией (по диапазону id)')
+        parser.add_argument('--settle-seconds', type=int, default=60,
+                            help='Не трогать записи моложе этого возраста (ещё могут дописываться)')
+        parser.add_argument('--retention-days', type=int, default=None,
+                            help='Срок хранения сводки; по умолчанию VIEW_HISTORY_RETENTION_DAYS, 0 — без ограничения')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        now = timezone.now()
+        settled_before = now - timedelta(seconds=options['settle_seconds'])
+        sql = COMPACT_SQL.format(raw=ViewHistory._meta.db_table, rollup=ViewHistoryRollup._meta.db_table)
+
+        bounds = ViewHistory.objects.aggregate(first=Min('id'), last=Max('id'))
+        moved = 0
+        if bounds['first'] is not None:
+            for start in range(bounds['first'], bounds['last'] + 1, chunk_size):
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(sql, [start, start + chunk_size, settled_before])
+                    moved += cursor.rowcount
+        self.stdout.write(f'Обновлено пар в сводке: {moved}')
+
+        retention_days = options['retention_days']
+        if retention_days is None:
+            retention_days = getattr(settings, 'VIEW_HISTORY_RETENTION_DAYS', 0)
+        purged = 0
+        if retention_days:
+            expired = ViewHistoryRollup.objects.filter(last_seen__lt=now - timedelta(days=retention_days))
+            # Удаляем порциями, чтобы не держать длинную транзакцию
+            while True:
+                ids = list(expired.values_list('id', flat=True)[:chunk_size])
+                if not ids:
+                    break
+                purged += ViewHistoryRollup.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'Удалено устаревших записей: {purged}'))
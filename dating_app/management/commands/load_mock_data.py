@@ -1,57 +1,307 @@
 # dating_app/management/commands/load_mock_data.py
+#
+# Генератор синтетических данных для нагрузочного тестирования: пользователи с профилями,
+# голоса, матчи, просмотры и переписка. Всё пишется пачками через bulk_create и
+# INSERT ... SELECT, пароль хэшируется один раз, чанки можно раздать процессам (--workers).
+# Производные поля, которые обычно ведут сигналы (поиск, маска увлечений, счётчики лайков,
+# индекс оценённых), пересчитываются теми же функциями и командами, что и в эксплуатации.
 
-from django.core.management.base import BaseCommand
-from django.contrib.auth import get_user_model
-from dating_app.models import UserProfile, Interest
+import multiprocessing
 import random
+import time
 from datetime import date, timedelta
+from itertools import accumulate
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from dating_app.geo import grid_cell
+from dating_app.interest_mask import refresh_interest_mask
+from dating_app.models import (
+    UserProfile, Interest, LikeDislike, ViewHistory, LikedUsers, DislikedUsers, LikeHistory, Match, Chat, Message
+)
+from dating_app.search import refresh_search_index
 
 User = get_user_model()
 
+INTERESTS = ["Игры", "Книги", "Фильмы", "Музыка", "Спорт", "Путешествия", "Кулинария", "Искусство"]
+# Город: (широта, долгота, относительная доля пользователей)
+CITIES = {
+    "Москва": (55.7558, 37.6173, 13.0),
+    "Санкт-Петербург": (59.9343, 30.3351, 5.6),
+    "Новосибирск": (55.0084, 82.9357, 1.6),
+    "Екатеринбург": (56.8389, 60.6057, 1.5),
+    "Казань": (55.7961, 49.1064, 1.3),
+    "Нижний Новгород": (56.2965, 43.9361, 1.2),
+    "Челябинск": (55.1644, 61.4368, 1.2),
+    "Самара": (53.1959, 50.1002, 1.2),
+    "Омск": (54.9885, 73.3242, 1.1),
+    "Ростов-на-Дону": (47.2357, 39.7015, 1.1),
+}
+FIRST_NAMES = {
+    'M': ["Александр", "Дмитрий", "Максим", "Сергей", "Андрей", "Алексей", "Иван", "Михаил", "Никита", "Егор"],
+    'F': ["Анна", "Мария", "Елена", "Дарья", "Анастасия", "Екатерина", "Ольга", "Наталья", "Полина", "Виктория"],
+}
+LAST_NAMES = ["Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов", "Новиков", "Фёдоров"]
+STATUSES = ["searching", "taken", "complicated"]
+GENDERS = ["M", "F"]
+PHRASES = ["Привет!", "Как дела?", "Чем занимаешься?", "Отлично, спасибо", "Давай встретимся", "Где ты живёшь?",
+           "Люблю путешествовать", "А ты?", "Хорошего дня!", "Какие планы на выходные?"]
+LIKE_SHARE = 0.6 # Доля лайков среди голосов
+
+# Параметры генерации для рабочих процессов: задаются до создания пула и наследуются при fork
+_job = {}
+
+
+def _rng(phase, chunk_index):
+    # Отдельный генератор на чанк: результат не зависит от числа процессов
+    return random.Random(f"{_job['seed']}:{phase}:{chunk_index}")
+
+
+def _create_users(task):
+    """
+    Пользователи с номерами [start, stop) с профилями и увлечениями.
+    Возвращает [(id пользователя, id профиля)].
+    """
+    chunk_index, start, stop = task
+    rng = _rng('users', chunk_index)
+    today = date.today()
+    city_names, city_weights = list(CITIES), [weight for _, _, weight in CITIES.values()]
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(username=f"user{i:04d}", email=f"user{i:04d}@example.com", password=_job['password'])
+            for i in range(start, stop)
+        ])
+        profiles = []
+        for user in users:
+            gender = rng.choice(GENDERS)
+            city = rng.choices(city_names, weights=city_weights)[0]
+            latitude, longitude, _ = CITIES[city]
+            latitude, longitude = latitude + rng.uniform(-0.15, 0.15), longitude + rng.uniform(-0.15, 0.15)
+            last_name = rng.choice(LAST_NAMES)
+            profiles.append(UserProfile(
+                user=user,
+                first_name=rng.choice(FIRST_NAMES[gender]),
+                last_name=last_name + ('а' if gender == 'F' else ''),
+                gender=gender,
+                birth_date=today - timedelta(days=rng.randint(365 * 18, 365 * 60)), # Возраст от 18 до 60
+                city=city,
+                status=rng.choice(STATUSES),
+                privacy_setting='public', # Публичные — для тестирования
+                random_key=rng.random(),
+                latitude=latitude,
+                longitude=longitude,
+                geo_cell=grid_cell(latitude, longitude), # bulk_create не вызывает save()
+            ))
+        profiles = UserProfile.objects.bulk_create(profiles)
+
+        through = UserProfile.interests.through
+        through.objects.bulk_create([
+            through(userprofile_id=profile.pk, interest_id=interest_id)
+            for profile in profiles
+            for interest_id in rng.sample(_job['interest_ids'], k=rng.randint(1, 3)) # От 1 до 3 увлечений
+        ])
+        # Сигналы при bulk_create не срабатывают — денормализованные поля считаем сами
+        chunk = UserProfile.objects.filter(id__gte=profiles[0].pk, id__lte=profiles[-1].pk)
+        refresh_search_index(chunk)
+        refresh_interest_mask(chunk)
+    return [(profile.user_id, profile.pk) for profile in profiles]
+
+
+def _create_activity(task):
+    """
+    Голоса и просмотры пользователей _job['people'][lo:hi]. Цели выбираются с учётом
+    популярности, часть лайков получает ответный лайк (--reciprocity).
+    Возвращает (голосов, просмотров).
+    """
+    chunk_index, lo, hi = task
+    rng = _rng('activity', chunk_index)
+    people, cum_weights = _job['people'], _job['cum_weights']
+    now, period = timezone.now(), timedelta(days=_job['days'])
+    votes, views = {}, []
+    for user_id, _ in people[lo:hi]:
+        for target_id, _ in rng.choices(people, cum_weights=cum_weights, k=rng.randint(0, 2 * _job['votes'])):
+            if target_id == user_id or (user_id, target_id) in votes:
+                continue
+            vote = LikeDislike.LIKE if rng.random() < LIKE_SHARE else LikeDislike.DISLIKE
+            votes[user_id, target_id] = vote
+            if vote == LikeDislike.LIKE and rng.random() < _job['reciprocity']:
+                votes.setdefault((target_id, user_id), LikeDislike.LIKE)
+        for _, profile_id in rng.choices(people, cum_weights=cum_weights, k=rng.randint(0, 2 * _job['views'])):
+            views.append(ViewHistory(viewer_id=user_id, viewed_profile_id=profile_id, timestamp=now - period * rng.random()))
+
+    with transaction.atomic():
+        # Ответный голос мог уже появиться в другом чанке — такие дубли пропускаются
+        LikeDislike.objects.bulk_create(
+            [LikeDislike(voter_id=voter_id, target_user_id=target_id, vote=vote) for (voter_id, target_id), vote in votes.items()],
+            ignore_conflicts=True,
+        )
+        ViewHistory.objects.bulk_create(views)
+    return len(votes), len(views)
+
+
+def _create_chats(task):
+    """
+    Чаты и переписка для матчей с id в [start, stop). Возвращает (чатов, сообщений).
+    """
+    chunk_index, start, stop = task
+    rng = _rng('chats', chunk_index)
+    now = timezone.now()
+    matches = list(Match.objects.filter(id__gte=start, id__lt=stop).values_list('user1_id', 'user2_id', 'timestamp'))
+    if not matches:
+        return 0, 0
+    with transaction.atomic():
+        chats = Chat.objects.bulk_create([Chat() for _ in matches])
+        through = Chat.participants.through
+        through.objects.bulk_create([
+            through(chat_id=chat.pk, user_id=user_id)
+            for chat, (user1_id, user2_id, _) in zip(chats, matches) for user_id in (user1_id, user2_id)
+        ])
+        messages = []
+        for chat, (user1_id, user2_id, matched_at) in zip(chats, matches):
+            # Сообщения идут после матча, по порядку
+            moments = sorted(matched_at + (now - matched_at) * rng.random() for _ in range(rng.randint(0, 2 * _job['messages'])))
+            messages.extend(
+                Message(chat_id=chat.pk, sender_id=rng.choice((user1_id, user2_id)), content=rng.choice(PHRASES), timestamp=moment)
+                for moment in moments
+            )
+        Message.objects.bulk_create(messages)
+    return len(chats), len(messages)
+
+
+# Производные таблицы строятся из новых голосов одним INSERT ... SELECT на диапазон id
+SPREAD_VOTES_SQL = "UPDATE {votes} SET timestamp = %s - random() * %s WHERE id >= %s AND id < %s"
+DERIVE_SQL = [
+    """INSERT INTO {liked} (user_id, liked_user_id, timestamp)
+       SELECT voter_id, target_user_id, timestamp FROM {votes}
+       WHERE vote = 1 AND id >= %s AND id < %s ON CONFLICT DO NOTHING""",
+    """INSERT INTO {disliked} (user_id, disliked_user_id, timestamp)
+       SELECT voter_id, target_user_id, timestamp FROM {votes}
+       WHERE vote = -1 AND id >= %s AND id < %s ON CONFLICT DO NOTHING""",
+    """INSERT INTO {history} (user_id, target_user_id, timestamp)
+       SELECT voter_id, target_user_id, timestamp FROM {votes}
+       WHERE vote = 1 AND id >= %s AND id < %s""",
+    # Матч — взаимный лайк; пара хранится в каноническом порядке (user1 < user2)
+    """INSERT INTO {match} (user1_id, user2_id, timestamp)
+       SELECT a.voter_id, a.target_user_id, GREATEST(a.timestamp, b.timestamp)
+       FROM {votes} a JOIN {votes} b ON b.voter_id = a.target_user_id AND b.target_user_id = a.voter_id
+       WHERE a.vote = 1 AND b.vote = 1 AND a.voter_id < a.target_user_id AND a.id >= %s AND a.id < %s
+       ON CONFLICT DO NOTHING""",
+]
+
+
 class Command(BaseCommand):
-    help = 'Загружает моковые данные в базу данных'
+    help = 'Загружает моковые данные в базу данных (масштабируемо: пачками, при необходимости в несколько процессов)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Сколько пользователей создать')
+        parser.add_argument('--start', type=int, default=0, help='Номер первого пользователя (user0000, ...)')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Пользователей (матчей) на одну транзакцию')
+        parser.add_argument('--workers', type=int, default=1, help='Сколько процессов использовать')
+        parser.add_argument('--votes', type=int, default=20, help='Голосов на пользователя в среднем')
+        parser.add_argument('--reciprocity', type=float, default=0.1, help='Вероятность ответного лайка (матчи)')
+        parser.add_argument('--views', type=int, default=30, help='Просмотров на пользователя в среднем')
+        parser.add_argument('--messages', type=int, default=10, help='Сообщений на матч в среднем')
+        parser.add_argument('--days', type=int, default=30, help='За сколько дней распределить голоса и просмотры')
+        parser.add_argument('--password', default='defaultpass123', help='Пароль всех пользователей')
+        parser.add_argument('--seed', type=int, default=None)
 
     def handle(self, *args, **options):
+        started = time.perf_counter()
+        chunk_size = options['chunk_size']
+        self.workers = options['workers']
+
         # Создаем увлечения
-        interests_list = ["Игры", "Книги", "Фильмы", "Музыка", "Спорт", "Путешествия", "Кулинария", "Искусство"]
-        interests = []
-        for name in interests_list:
+        interest_ids = []
+        for name in INTERESTS:
             interest, created = Interest.objects.get_or_create(name=name)
-            interests.append(interest)
+            interest_ids.append(interest.pk)
             if created:
                 self.stdout.write(self.style.SUCCESS(f'Создано увлечение: {name}'))
 
-        # Города
-        cities = ["Москва", "Санкт-Петербург", "Новосибирск", "Екатеринбург", "Казань", "Нижний Новгород", "Челябинск", "Самара", "Омск", "Ростов-на-Дону"]
+        _job.update(
+            seed=options['seed'] if options['seed'] is not None else random.randrange(2 ** 32),
+            password=make_password(options['password']), # Один хэш PBKDF2 на всех
+            interest_ids=interest_ids,
+            votes=options['votes'], reciprocity=options['reciprocity'], views=options['views'],
+            messages=options['messages'], days=options['days'],
+        )
 
-        # Статусы
-        statuses = ["searching", "taken", "complicated"]
+        # 1. Пользователи и профили
+        start, stop = options['start'], options['start'] + options['users']
+        tasks = [(index, lo, min(lo + chunk_size, stop)) for index, lo in enumerate(range(start, stop, chunk_size))]
+        people = []
+        for pairs in self._run('Пользователи', _create_users, tasks):
+            people.extend(pairs)
+        if not people:
+            return
+        people.sort()
 
-        # Пол
-        genders = ["M", "F"]
+        # 2. Голоса и просмотры; популярность профилей распределена по Парето
+        rng = random.Random(_job['seed'])
+        _job.update(people=people, cum_weights=list(accumulate(rng.paretovariate(1.5) for _ in people)))
+        first_vote = LikeDislike.objects.aggregate(last=Max('id'))['last'] or 0
+        first_match = Match.objects.aggregate(last=Max('id'))['last'] or 0
+        tasks = [(index, lo, lo + chunk_size) for index, lo in enumerate(range(0, len(people), chunk_size))]
+        totals = [sum(column) for column in zip(*self._run('Голоса и просмотры', _create_activity, tasks))]
+        self.stdout.write(f'Голосов: {totals[0]}, просмотров: {totals[1]}')
 
-        # Генерируем пользователей
-        for i in range(1000): # Создаем 1000 пользователей
-            username = f"user{i:04d}" # user0000, user0001, ...
-            email = f"{username}@example.com"
-            password = "defaultpass123" # Установите стандартный пароль
+        # 3. Время голосов, списки понравившихся/непонравившихся, история лайков и матчи
+        self._derive_from_votes(first_vote, chunk_size * 10, timedelta(days=options['days']))
 
-            user = User.objects.create_user(username=username, email=email, password=password)
-            profile = UserProfile.objects.create(
-                user=user,
-                first_name=f"Имя{i}",
-                last_name=f"Фамилия{i}",
-                gender=random.choice(genders),
-                birth_date=date.today() - timedelta(days=random.randint(365 * 18, 365 * 60)), # Возраст от 18 до 60
-                city=random.choice(cities),
-                status=random.choice(statuses),
-                privacy_setting='public' # Сделаем их публичными для тестирования
-            )
+        # 4. Чаты и сообщения новых матчей
+        last_match = Match.objects.aggregate(last=Max('id'))['last'] or 0
+        tasks = [(index, lo, lo + chunk_size) for index, lo in enumerate(range(first_match + 1, last_match + 1, chunk_size))]
+        totals = [sum(column) for column in zip(*self._run('Чаты', _create_chats, tasks))] or [0, 0]
+        self.stdout.write(f'Матчей: {last_match - first_match}, чатов: {totals[0]}, сообщений: {totals[1]}')
+
+        # 5. То, что в эксплуатации ведут сигналы и фоновые команды
+        call_command('recount_likes', stdout=self.stdout)
+        call_command('rebuild_seen_index', stdout=self.stdout)
+        call_command('compact_view_history', settle_seconds=0, retention_days=0, stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Загрузка моковых данных завершена: {len(people)} пользователей за {time.perf_counter() - started:.1f} с'
+        ))
 
-            # Добавим случайные увлечения
-            selected_interests = random.sample(interests, k=random.randint(1, 3)) # От 1 до 3 увлечений
-            profile.interests.set(selected_interests)
+    def _run(self, title, func, tasks):
+        """
+        Выполняет func для каждого чанка — в этом процессе или в пуле из --workers процессов —
+        и возвращает результаты, печатая прогресс.
+        """
+        if self.workers > 1 and len(tasks) > 1:
+            # Дочерние процессы открывают свои соединения с БД
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(self.workers) as pool:
+                results = self._progress(title, pool.imap_unordered(func, tasks), len(tasks))
+        else:
+            results = self._progress(title, map(func, tasks), len(tasks))
+        return results
 
-            self.stdout.write(self.style.SUCCESS(f'Создан пользователь: {username}'))
+    def _progress(self, title, results, total):
+        collected = []
+        for done, result in enumerate(results, 1):
+            collected.append(result)
+            self.stdout.write(f'{title}: {done}/{total}')
+        return collected
 
-        self.stdout.write(self.style.SUCCESS('Загрузка моковых данных завершена!'))
\ No newline at end of file
+    def _derive_from_votes(self, first_vote, chunk_size, period):
+        tables = {
+            'votes': LikeDislike._meta.db_table, 'liked': LikedUsers._meta.db_table, 'disliked': DislikedUsers._meta.db_table,
+            'history': LikeHistory._meta.db_table, 'match': Match._meta.db_table,
+        }
+        last_vote = LikeDislike.objects.aggregate(last=Max('id'))['last'] or 0
+        now = timezone.now()
+        ranges = range(first_vote + 1, last_vote + 1, chunk_size)
+        # bulk_create ставит всем голосам текущее время (auto_now_add) — распределяем по периоду.
+        # Отдельным проходом: время матча берётся из обоих голосов пары
+        for lo in ranges:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(SPREAD_VOTES_SQL.format(**tables), [now, period, lo, lo + chunk_size])
+        for lo in ranges:
+            with transaction.atomic(), connection.cursor() as cursor:
+                for sql in DERIVE_SQL:
+                    cursor.execute(sql.format(**tables), [lo, lo + chunk_size])
@@ -0,0 +1,22 @@
+# dating_app/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+from dating_app.models import UserProfile
+from dating_app.search import refresh_search_index
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает поисковые поля профилей (search_vector и search_document)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000,
+                            help='Сколько профилей обновлять одним UPDATE (по диапазону id)')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = UserProfile.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        updated = 0
+        for start in range(0, last_id + 1, chunk_size):
+            updated += refresh_search_index(UserProfile.objects.filter(id__gte=start, id__lt=start + chunk_size))
+
+        self.stdout.write(self.style.SUCCESS(f'Обновлено профилей: {updated}'))
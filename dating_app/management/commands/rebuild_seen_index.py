@@ -0,0 +1,42 @@
+# dating_app/management/commands/rebuild_seen_index.py
+
+from itertools import groupby
+from operator import itemgetter
+from django.core.management.base import BaseCommand
+from dating_app.models import LikeDislike, SeenIndex
+from dating_app.seen import SeenSet, forget_seen_sets, save_seen_set
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает индексы оценённых пользователей (SeenIndex) по таблице LikeDislike'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Пересобрать только для указанного id пользователя (можно несколько раз)')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Размер чанка при чтении LikeDislike')
+
+    def handle(self, *args, **options):
+        votes = LikeDislike.objects.order_by('voter_id', 'target_user_id').values_list('voter_id', 'target_user_id')
+        if options['user_ids']:
+            votes = votes.filter(voter_id__in=options['user_ids'])
+            # Пользователи без голосов получат пустое множество (save_seen_set перезаписывает и кэш)
+            for user_id in options['user_ids']:
+                save_seen_set(user_id, SeenSet())
+            replaced = set()
+        else:
+            replaced = set(SeenIndex.objects.values_list('user_id', flat=True).iterator(chunk_size=options['chunk_size']))
+            SeenIndex.objects.all().delete()
+
+        rebuilt = 0
+        # Голоса читаются потоком, отсортированными по голосующему, — в памяти одно множество за раз
+        for voter_id, rows in groupby(votes.iterator(chunk_size=options['chunk_size']), key=itemgetter(0)):
+            save_seen_set(voter_id, SeenSet(target_user_id for _, target_user_id in rows))
+            replaced.discard(voter_id) # Кэш уже перезаписан save_seen_set
+            rebuilt += 1
+
+        # У остальных пользователей с удалённым индексом в кэше осталось множество до пересборки
+        replaced = list(replaced)
+        for start in range(0, len(replaced), options['chunk_size']):
+            forget_seen_sets(replaced[start:start + options['chunk_size']])
+
+        self.stdout.write(self.style.SUCCESS(f'Пересобрано индексов: {rebuilt}'))
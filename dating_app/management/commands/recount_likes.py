@@ -0,0 +1,38 @@
+# dating_app/management/commands/recount_likes.py
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Now
+from dating_app.models import UserProfile, LikeDislike
+from dating_app.profile_cache import bump_generation
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает UserProfile.likes_count по таблице LikeDislike'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000,
+                            help='Сколько профилей обновлять одним UPDATE (по диапазону id)')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        likes = (
+            LikeDislike.objects
+            .filter(target_user=OuterRef('user'), vote=LikeDislike.LIKE)
+            .order_by()
+            .values('target_user')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        actual = Coalesce(Subquery(likes), Value(0))
+
+        last_id = UserProfile.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        fixed = 0
+        # Обновляем диапазонами id: каждый UPDATE короткий и не держит блокировки на всей таблице
+        for start in range(0, last_id + 1, chunk_size):
+            chunk = UserProfile.objects.filter(id__gte=start, id__lt=start + chunk_size)
+            fixed += chunk.annotate(actual_likes=actual).exclude(likes_count=actual).update(likes_count=actual, updated_at=Now())
+
+        if fixed:
+            bump_generation() # Кэш профилей хранит likes_count
+        self.stdout.write(self.style.SUCCESS(f'Исправлено счётчиков: {fixed}'))
@@ -0,0 +1,97 @@
+# dating_app/match_cache.py
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save, pre_delete
+from .models import Match, Chat
+
+
+def _timeout():
+    return getattr(settings, 'MATCH_CACHE_TIMEOUT', 24 * 60 * 60)
+
+
+def _negative_timeout():
+    # «Матча нет» может быть записано уже после коммита нового матча (чтение до коммита,
+    # запись после прогрева remember_matches), поэтому отрицательный ответ живёт недолго
+    return getattr(settings, 'MATCH_CACHE_NEGATIVE_TIMEOUT', 60)
+
+
+def _keys(user_id, other_user_id):
+    user1_id, user2_id = Match.pair(user_id, other_user_id)
+    return f'match:{user1_id}:{user2_id}', f'match-chat:{user1_id}:{user2_id}'
+
+
+def resolve_chat(user_id, other_user_id):
+    """
+    Возвращает id чата пары пользователей (создаёт чат при первом обращении)
+    или None, если матча между ними нет. Строка матча блокируется, чтобы два
+    одновременных подключения пары не создали два чата. Учитываются только чаты
+    ровно из двух участников: общий чат прежней схемы с третьими лицами не подходит.
+    """
+    user1_id, user2_id = Match.pair(user_id, other_user_id)
+    with transaction.atomic():
+        if not Match.objects.select_for_update().filter(user1_id=user1_id, user2_id=user2_id).exists():
+            return None
+        chat = (
+            Chat.objects.annotate(size=Count('participants', distinct=True)).filter(size=2)
+            .filter(participants=user1_id).filter(participants=user2_id).order_by('id').first()
+        )
+        if chat is None:
+            chat = Chat.objects.create()
+            chat.participants.add(user1_id, user2_id)
+        return chat.id
+
+
+def get_match_chat_id(user_id, other_user_id):
+    """
+    id чата пары, если между пользователями есть матч, иначе None.
+    В обычном случае ответ берётся из кэша одним обращением, без запросов к БД.
+    """
+    match_key, chat_key = _keys(user_id, other_user_id)
+    cached = cache.get_many([match_key, chat_key])
+    if cached.get(match_key) is False:
+        return None
+    if cached.get(match_key) and chat_key in cached:
+        return cached[chat_key]
+    chat_id = resolve_chat(user_id, other_user_id)
+    if chat_id is None:
+        cache.set(match_key, False, _negative_timeout())
+    else:
+        cache.set_many({match_key: True, chat_key: chat_id}, _timeout())
+    return chat_id
+
+
+def remember_matches(pairs):
+    """
+    Отмечает пары (user1_id, user2_id) как совпавшие — после коммита текущей транзакции.
+    """
+    keys = [_keys(user1_id, user2_id)[0] for user1_id, user2_id in pairs]
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, True), _timeout()))
+
+
+def forget_match(user1_id, user2_id):
+    transaction.on_commit(lambda: cache.delete_many(_keys(user1_id, user2_id)))
+
+
+def match_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        remember_matches([(instance.user1_id, instance.user2_id)])
+
+
+def match_deleted(sender, instance, **kwargs):
+    forget_match(instance.user1_id, instance.user2_id)
+
+
+def chat_deleting(sender, instance, **kwargs):
+    participant_ids = list(instance.participants.values_list('id', flat=True))
+    if len(participant_ids) == 2:
+        chat_key = _keys(*participant_ids)[1]
+        transaction.on_commit(lambda: cache.delete(chat_key))
+
+
+post_save.connect(match_saved, sender=Match)
+post_delete.connect(match_deleted, sender=Match)
+pre_delete.connect(chat_deleting, sender=Chat)
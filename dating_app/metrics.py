@@ -0,0 +1,289 @@
+# dating_app/metrics.py
+#
+# Метрики процесса (счётчики и гистограммы) для горячих путей и их экспорт в текстовом
+# формате Prometheus (/metrics). Запись — словарь под одной блокировкой, без ввода-вывода.
+# Несколько рабочих процессов: при заданном METRICS['DIR'] каждый процесс периодически
+# сохраняет снимок в свой файл, а /metrics суммирует снимки всех процессов.
+
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _metrics_option(name, default):
+    return getattr(settings, 'METRICS', {}).get(name, default)
+
+
+class Registry:
+    """
+    Метрики процесса. snapshot() — JSON-совместимый снимок, который можно сложить
+    со снимками других процессов (merge_snapshots).
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: {
+                    'type': metric.type, 'help': metric.help, 'labelnames': list(metric.labelnames),
+                    'buckets': list(getattr(metric, 'buckets', [])),
+                    'values': [[list(key), value if metric.type == 'counter' else list(value)] for key, value in metric.values.items()],
+                }
+                for name, metric in self.metrics.items()
+            }
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    def __init__(self, name, help, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.registry = registry
+        registry.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """
+    Монотонный счётчик; скорость (голосов/с и т.п.) считает сборщик метрик через rate().
+    """
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    """
+    Гистограмма с фиксированными корзинами: в значении хранятся счётчики корзин
+    (не накопительные), затем сумма и количество наблюдений.
+    """
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value) # Последняя ячейка — «+Inf»
+        with self.registry.lock:
+            row = self.values.get(key)
+            if row is None:
+                row = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            row[index] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+# --- Метрики горячих путей ---
+HTTP_LATENCY = Histogram('dating_http_request_duration_seconds', 'Время обработки HTTP-запроса', ['view', 'method', 'status'])
+VOTES = Counter('dating_votes_total', 'Учтённые голоса (новые и изменённые)', ['vote'])
+MATCHES = Counter('dating_matches_created_total', 'Созданные матчи')
+RANDOM_DRAWS = Counter('dating_random_profile_draws_total', 'Выборки случайного профиля', ['result'])
+WS_CONNECTS = Counter('dating_ws_connects_total', 'Подключения WebSocket', ['consumer', 'result'])
+WS_MESSAGES = Counter('dating_ws_messages_total', 'Сообщения WebSocket', ['consumer', 'direction'])
+CHANNEL_SEND_LATENCY = Histogram('dating_channel_layer_send_seconds', 'Время отправки в channel layer', ['kind'])
+
+
+def merge_snapshots(snapshots):
+    """
+    Складывает снимки процессов: счётчики суммируются, гистограммы — поэлементно.
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, dict(metric, values={}))
+            for key, value in metric['values']:
+                key = tuple(key)
+                if metric['type'] == 'counter':
+                    target['values'][key] = target['values'].get(key, 0) + value
+                else:
+                    current = target['values'].get(key)
+                    target['values'][key] = value if current is None else [a + b for a, b in zip(current, value)]
+    return merged
+
+
+def _labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def render_text(merged):
+    """
+    Текстовый формат экспозиции Prometheus (version 0.0.4).
+    """
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        labelnames = metric['labelnames']
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for key, value in sorted(metric['values'].items()):
+            if metric['type'] == 'counter':
+                lines.append(f'{name}{_labels(labelnames, key)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(list(metric['buckets']) + ['+Inf'], value):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labelnames, key, [('le', str(bound))])} {cumulative}")
+            lines.append(f'{name}_sum{_labels(labelnames, key)} {value[-2]}')
+            lines.append(f'{name}_count{_labels(labelnames, key)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+class SnapshotWriter:
+    """
+    Периодически сохраняет снимок REGISTRY в METRICS['DIR'] (файл на процесс).
+    Файлы завершившихся процессов не удаляются: их счётчики остаются в сумме,
+    как и положено монотонным счётчикам. Каталог очищают при развёртывании.
+    """
+
+    def __init__(self, directory, interval):
+        self.directory = directory
+        self.interval = interval
+        self.path = os.path.join(directory, f'metrics-{os.getpid()}-{uuid.uuid4().hex[:8]}.json')
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def write(self):
+        snapshot = REGISTRY.snapshot()
+        temporary = f'{self.path}.tmp'
+        with self._lock: # Пишут и фоновый поток, и /metrics
+            try:
+                with open(temporary, 'w', encoding='utf-8') as output:
+                    json.dump(snapshot, output, ensure_ascii=False)
+                os.replace(temporary, self.path) # Атомарно: читатель не увидит половину файла
+            except OSError:
+                logger.warning('Не удалось сохранить метрики в %s', self.path, exc_info=True)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='metrics-writer', daemon=True)
+            self._thread.start()
+        atexit.register(self.write)
+
+    def stop(self):
+        self._stopped.set()
+        atexit.unregister(self.write)
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join() # Дожидаемся записи, которая могла идти в этот момент
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """
+    Писатель снимков процесса или None, если метрики не агрегируются между процессами.
+    После fork создаётся новый писатель — со своим файлом.
+    """
+    global _writer
+    directory = _metrics_option('DIR', None)
+    if not directory:
+        return None
+    with _writer_lock:
+        if _writer is None or not _writer.path.startswith(os.path.join(directory, f'metrics-{os.getpid()}-')):
+            if _writer is not None:
+                _writer.stop() # Иначе при выходе дочерний процесс перезапишет файл родителя
+            _writer = SnapshotWriter(directory, _metrics_option('FLUSH_INTERVAL', 5))
+            _writer.start()
+        return _writer
+
+
+def stop_writer():
+    """
+    Останавливает писатель снимков процесса (например, перед удалением METRICS['DIR'] в тестах).
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.stop()
+            _writer = None
+
+
+def collect():
+    """
+    Сводные метрики: этот процесс плюс снимки остальных процессов из METRICS['DIR'].
+    """
+    writer = get_writer()
+    if writer is None:
+        return merge_snapshots([REGISTRY.snapshot()])
+    writer.write() # Свой снимок — самый свежий
+    snapshots = []
+    for filename in sorted(os.listdir(writer.directory)):
+        if not (filename.startswith('metrics-') and filename.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(writer.directory, filename), encoding='utf-8') as snapshot_file:
+                snapshots.append(json.load(snapshot_file))
+        except (OSError, ValueError):
+            logger.warning('Пропущен файл метрик %s', filename, exc_info=True)
+    return merge_snapshots(snapshots)
+
+
+class MetricsMiddleware:
+    """
+    Время обработки каждого HTTP-запроса по имени маршрута, методу и коду ответа.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        get_writer() # Запускает сохранение снимков процесса, если задан METRICS['DIR']
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        HTTP_LATENCY.observe(
+            time.perf_counter() - started,
+            view=match.view_name if match else '<unmatched>', method=request.method, status=response.status_code,
+        )
+        return response
@@ -0,0 +1,192 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:01
+
+import dating_app.models
+from django.conf import settings
+import django.contrib.auth.models
+import django.contrib.auth.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('username', models.CharField(error_messages={'unique': 'A user with that username already exists.'}, help_text='Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.', max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator()], verbose_name='username')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('is_active', models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+            ],
+            options={
+                'verbose_name': 'user',
+                'verbose_name_plural': 'users',
+                'abstract': False,
+            },
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Chat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('participants', models.ManyToManyField(related_name='chats', to=settings.AUTH_USER_MODEL, verbose_name='Участники чата')),
+            ],
+            options={
+                'verbose_name': 'Чат',
+                'verbose_name_plural': 'Чаты',
+            },
+        ),
+        migrations.CreateModel(
+            name='Interest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Название увлечения')),
+            ],
+            options={
+                'verbose_name': 'Увлечение',
+                'verbose_name_plural': 'Увлечения',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=100, verbose_name='Имя')),
+                ('last_name', models.CharField(max_length=100, verbose_name='Фамилия')),
+                ('patronymic', models.CharField(blank=True, max_length=100, null=True, verbose_name='Отчество')),
+                ('gender', models.CharField(choices=[('M', 'Мужской'), ('F', 'Женский'), ('O', 'Другое')], max_length=1, verbose_name='Пол')),
+                ('birth_date', models.DateField(verbose_name='Дата рождения')),
+                ('city', models.CharField(max_length=100, verbose_name='Город')),
+                ('status', models.CharField(choices=[('searching', 'В поиске'), ('taken', 'Занят(а)'), ('complicated', 'Всё сложно')], default='searching', max_length=20, verbose_name='Статус')),
+                ('photo_gallery', models.ImageField(blank=True, null=True, upload_to=dating_app.models.user_profile_photo_path, verbose_name='Фото профиля')),
+                ('main_photo', models.ImageField(blank=True, null=True, upload_to=dating_app.models.user_profile_photo_path, verbose_name='Заглавное фото')),
+                ('likes_count', models.PositiveIntegerField(default=0, verbose_name='Количество лайков')),
+                ('privacy_setting', models.CharField(choices=[('public', 'Публичный'), ('private', 'Приватный'), ('friends', 'Только для друзей')], default='public', max_length=20, verbose_name='Настройка приватности')),
+                ('interests', models.ManyToManyField(blank=True, to='dating_app.interest', verbose_name='Увлечения')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Профиль пользователя',
+                'verbose_name_plural': 'Профили пользователей',
+                'ordering': ['user__username'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ViewHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='Дата и время просмотра')),
+                ('viewed_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='dating_app.userprofile', verbose_name='Просмотренный профиль')),
+                ('viewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profiles_viewed', to=settings.AUTH_USER_MODEL, verbose_name='Просматривающий')),
+            ],
+            options={
+                'verbose_name': 'Просмотр профиля',
+                'verbose_name_plural': 'Просмотры профилей',
+            },
+        ),
+        migrations.CreateModel(
+            name='Message',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.TextField(verbose_name='Содержание сообщения')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='Дата отправки')),
+                ('chat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='dating_app.chat', verbose_name='Чат')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Отправитель')),
+            ],
+            options={
+                'verbose_name': 'Сообщение',
+                'verbose_name_plural': 'Сообщения',
+                'ordering': ['timestamp'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LikeHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='Дата лайка')),
+                ('target_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='likes_received_history', to=settings.AUTH_USER_MODEL, verbose_name='Цель лайка')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='likes_given_history', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'История лайка',
+                'verbose_name_plural': 'Истории лайков',
+            },
+        ),
+        migrations.CreateModel(
+            name='Match',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='Дата матча')),
+                ('user1', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches_initiated', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь 1')),
+                ('user2', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches_received', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь 2')),
+            ],
+            options={
+                'verbose_name': 'Матч',
+                'verbose_name_plural': 'Матчи',
+                'unique_together': {('user1', 'user2')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LikedUsers',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='Дата добавления')),
+                ('liked_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='liked_by_users', to=settings.AUTH_USER_MODEL, verbose_name='Понравившийся пользователь')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='liked_users_list', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Понравившийся пользователь',
+                'verbose_name_plural': 'Понравившиеся пользователи',
+                'unique_together': {('user', 'liked_user')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LikeDislike',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vote', models.SmallIntegerField(choices=[(1, 'Лайк'), (-1, 'Дизлайк')], verbose_name='Голос (лайк/дизлайк)')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='Дата и время')),
+                ('target_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes_received', to=settings.AUTH_USER_MODEL, verbose_name='Цель голосования')),
+                ('voter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes_given', to=settings.AUTH_USER_MODEL, verbose_name='Голосующий')),
+            ],
+            options={
+                'verbose_name': 'Голос (лайк/дизлайк)',
+                'verbose_name_plural': 'Голоса (лайки/дизлайки)',
+                'unique_together': {('voter', 'target_user')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DislikedUsers',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='Дата добавления')),
+                ('disliked_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='disliked_by_users', to=settings.AUTH_USER_MODEL, verbose_name='Непонравившийся пользователь')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='disliked_users_list', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Непонравившийся пользователь',
+                'verbose_name_plural': 'Непонравившиеся пользователи',
+                'unique_together': {('user', 'disliked_user')},
+            },
+        ),
+    ]
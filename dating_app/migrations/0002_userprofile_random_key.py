@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:01
+
+import dating_app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dating_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='random_key',
+            field=models.FloatField(db_index=True, default=dating_app.models.generate_random_key, editable=False, verbose_name='Случайный ключ'),
+        ),
+        # AddField вычисляет default один раз на все строки — существующим профилям раздаём разные ключи
+        migrations.RunSQL('UPDATE dating_app_userprofile SET random_key = random()', migrations.RunSQL.noop),
+    ]
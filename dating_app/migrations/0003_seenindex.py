@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dating_app', '0002_userprofile_random_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeenIndex',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seen_index', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('data', models.BinaryField(verbose_name='Данные множества')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Индекс оценённых пользователей',
+                'verbose_name_plural': 'Индексы оценённых пользователей',
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы строятся CONCURRENTLY, чтобы не блокировать запись в большую таблицу профилей
+    atomic = False
+
+    dependencies = [
+        ('dating_app', '0003_seenindex'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=models.Index(fields=['gender', 'random_key'], name='profile_gender_random_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=models.Index(fields=['city', 'random_key'], name='profile_city_random_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=models.Index(fields=['gender', 'city', 'random_key'], name='profile_gender_city_random_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('status', 'searching')), fields=['gender', 'random_key'], name='profile_searching_random_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=models.Index(fields=['gender', 'city', 'status', 'birth_date'], name='profile_filters_birth_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=models.Index(fields=['gender', 'birth_date'], name='profile_gender_birth_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=models.Index(fields=['-likes_count', '-id'], name='profile_likes_count_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:13
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+# Заполнение тем же выражением, что и search.refresh_search_index, но без кода приложения:
+# миграция не должна меняться вместе с ним
+FILL_SEARCH_INDEX_SQL = """
+    UPDATE dating_app_userprofile AS profile
+    SET search_vector = setweight(to_tsvector(%(config)s::regconfig,
+                                              COALESCE(profile.first_name, '') || ' ' || COALESCE(profile.last_name, '')
+                                              || ' ' || COALESCE(profile.patronymic, '')), 'A')
+                        || setweight(to_tsvector(%(config)s::regconfig, COALESCE(profile.city, '')), 'B')
+                        || setweight(to_tsvector(%(config)s::regconfig, COALESCE(names.names, '')), 'C'),
+        search_document = CONCAT(profile.first_name, ' ', profile.last_name, ' ', COALESCE(profile.patronymic, ''),
+                                 ' ', profile.city, ' ', COALESCE(names.names, ''))
+    FROM (
+        SELECT chunk.id, STRING_AGG(interest.name, ' ') AS names
+        FROM dating_app_userprofile AS chunk
+        LEFT JOIN dating_app_userprofile_interests AS link ON link.userprofile_id = chunk.id
+        LEFT JOIN dating_app_interest AS interest ON interest.id = link.interest_id
+        WHERE chunk.id >= %(start)s AND chunk.id < %(end)s
+        GROUP BY chunk.id
+    ) AS names
+    WHERE profile.id = names.id
+"""
+
+
+def fill_search_index(apps, schema_editor):
+    config = getattr(settings, 'PROFILE_SEARCH_CONFIG', 'russian')
+    UserProfile = apps.get_model('dating_app', 'UserProfile')
+    last_id = UserProfile.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    for start in range(0, last_id + 1, 10000):
+        schema_editor.execute(FILL_SEARCH_INDEX_SQL, {'config': config, 'start': start, 'end': start + 10000})
+
+
+class Migration(migrations.Migration):
+    # Индексы строятся CONCURRENTLY, чтобы не блокировать запись в большую таблицу профилей
+    atomic = False
+
+    dependencies = [
+        ('dating_app', '0004_discovery_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='userprofile',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Поисковый документ'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        # Индексы строим по уже заполненным столбцам: так дешевле, чем обновлять их при заполнении
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='profile_search_vector_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='profile_search_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
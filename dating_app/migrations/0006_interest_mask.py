@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:16
+
+from django.db import migrations, models
+
+
+# Копия models.INTEREST_MASK_BITS на момент миграции: код приложения сюда не импортируем
+INTEREST_MASK_BITS = 63
+
+ASSIGN_BITS_SQL = """
+    UPDATE dating_app_interest AS interest
+    SET bit = ranked.position - 1
+    FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY id) AS position FROM dating_app_interest) AS ranked
+    WHERE interest.id = ranked.id AND ranked.position <= %(bits)s
+"""
+
+FILL_INTEREST_MASK_SQL = """
+    UPDATE dating_app_userprofile AS profile
+    SET interest_mask = COALESCE((
+        SELECT BIT_OR(1::bigint << interest.bit)
+        FROM dating_app_userprofile_interests AS link
+        JOIN dating_app_interest AS interest ON interest.id = link.interest_id
+        WHERE link.userprofile_id = profile.id AND interest.bit IS NOT NULL
+    ), 0)
+    WHERE profile.id >= %(start)s AND profile.id < %(end)s
+"""
+
+
+def fill_interest_mask(apps, schema_editor):
+    # Биты получают существующие увлечения в порядке id
+    schema_editor.execute(ASSIGN_BITS_SQL, {'bits': INTEREST_MASK_BITS})
+    UserProfile = apps.get_model('dating_app', 'UserProfile')
+    last_id = UserProfile.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    for start in range(0, last_id + 1, 10000):
+        schema_editor.execute(FILL_INTEREST_MASK_SQL, {'start': start, 'end': start + 10000})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dating_app', '0005_profile_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interest',
+            name='bit',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, unique=True, verbose_name='Бит в маске увлечений'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='interest_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Маска увлечений'),
+        ),
+        migrations.RunPython(fill_interest_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:32
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dating_app', '0007_profile_location'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='viewhistory',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Дата и время просмотра'),
+        ),
+    ]
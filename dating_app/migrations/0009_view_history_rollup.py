@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dating_app', '0008_view_history_timestamp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewHistoryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_count', models.PositiveIntegerField(default=0, verbose_name='Количество просмотров')),
+                ('first_seen', models.DateTimeField(verbose_name='Первый просмотр')),
+                ('last_seen', models.DateTimeField(verbose_name='Последний просмотр')),
+                ('viewed_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='dating_app.userprofile', verbose_name='Просмотренный профиль')),
+                ('viewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profile_view_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Просматривающий')),
+            ],
+            options={
+                'verbose_name': 'Сводка просмотров профиля',
+                'verbose_name_plural': 'Сводки просмотров профилей',
+                'indexes': [models.Index(fields=['viewer', '-last_seen', '-id'], name='view_rollup_viewer_last_idx'), models.Index(fields=['last_seen'], name='view_rollup_last_seen_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='viewhistoryrollup',
+            constraint=models.UniqueConstraint(fields=('viewer', 'viewed_profile'), name='view_rollup_unique_pair'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:34
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dating_app', '0009_view_history_rollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='message',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Дата отправки'),
+        ),
+    ]
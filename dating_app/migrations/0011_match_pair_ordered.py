@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dating_app', '0010_message_timestamp'),
+    ]
+
+    operations = [
+        # Приводим старые строки к каноническому порядку: зеркальный дубль удаляем, остальные переворачиваем
+        migrations.RunSQL(
+            [
+                "DELETE FROM dating_app_match WHERE user1_id = user2_id",
+                "DELETE FROM dating_app_match m WHERE m.user1_id > m.user2_id AND EXISTS ("
+                "SELECT 1 FROM dating_app_match c WHERE c.user1_id = m.user2_id AND c.user2_id = m.user1_id)",
+                "UPDATE dating_app_match SET user1_id = user2_id, user2_id = user1_id WHERE user1_id > user2_id",
+            ],
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.CheckConstraint(check=models.Q(('user1__lt', models.F('user2'))), name='match_users_ordered'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:39
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы на больших таблицах истории строятся без блокировки записи
+    atomic = False
+
+    dependencies = [
+        ('dating_app', '0011_match_pair_ordered'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='dislikedusers',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='disliked_users_user_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='likedusers',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='liked_users_user_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='likehistory',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='like_history_user_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='match',
+            index=models.Index(fields=['user1', '-timestamp', '-id'], name='match_user1_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='match',
+            index=models.Index(fields=['user2', '-timestamp', '-id'], name='match_user2_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['chat', '-timestamp', '-id'], name='message_chat_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userprofile',
+            index=models.Index(fields=['birth_date', 'id'], name='profile_birth_date_idx'),
+        ),
+    ]
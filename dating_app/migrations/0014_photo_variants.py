@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:26
+
+import dating_app.models
+import dating_app.photos
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dating_app', '0013_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='photo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Копии фото'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='main_photo',
+            field=models.ImageField(blank=True, null=True, upload_to=dating_app.models.user_profile_photo_path, validators=[dating_app.photos.validate_photo], verbose_name='Заглавное фото'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='photo_gallery',
+            field=models.ImageField(blank=True, null=True, upload_to=dating_app.models.user_profile_photo_path, validators=[dating_app.photos.validate_photo], verbose_name='Фото профиля'),
+        ),
+    ]
@@ -1,10 +1,17 @@
 # dating_app/models.py
 
 from django.db import models
+from django.utils import timezone
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 import os
+import random
+from .geo import grid_cell
+from .photos import validate_photo
 
 class User(AbstractUser):
     """
@@ -19,11 +26,25 @@ class User(AbstractUser):
         return self.username
 
 
+# Сколько увлечений помещается в UserProfile.interest_mask (знаковый bigint, старший бит не используем)
+INTEREST_MASK_BITS = 63
+
+
 class Interest(models.Model):
     """
     Модель для увлечений.
     """
     name = models.CharField(max_length=100, unique=True, verbose_name="Название увлечения")
+    # Номер бита в UserProfile.interest_mask; None, если свободных битов не осталось
+    bit = models.PositiveSmallIntegerField(unique=True, null=True, blank=True, editable=False, verbose_name="Бит в маске увлечений")
+    # Метка изменения для условных GET (см. conditional.py)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.bit is None:
+            used = set(Interest.objects.filter(bit__isnull=False).values_list('bit', flat=True))
+            self.bit = next((bit for bit in range(INTEREST_MASK_BITS) if bit not in used), None)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
@@ -40,6 +61,12 @@ def user_profile_photo_path(instance, filename):
     # Файлы будут загружаться в MEDIA_ROOT/profile_photos/user_<id>/<filename>
     return os.path.join('profile_photos', f'user_{instance.user.id}', filename)
 
+def generate_random_key():
+    """
+    Генерирует случайный ключ профиля в [0, 1).
+    """
+    return random.random()
+
 class UserProfile(models.Model):
     """
     Модель профиля пользователя.
@@ -71,10 +98,37 @@ class UserProfile(models.Model):
     city = models.CharField(max_length=100, verbose_name="Город")
     interests = models.ManyToManyField(Interest, blank=True, verbose_name="Увлечения")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='searching', verbose_name="Статус")
-    photo_gallery = models.ImageField(upload_to=user_profile_photo_path, blank=True, null=True, verbose_name="Фото профиля")
-    main_photo = models.ImageField(upload_to=user_profile_photo_path, blank=True, null=True, verbose_name="Заглавное фото")
+    photo_gallery = models.ImageField(upload_to=user_profile_photo_path, blank=True, null=True, validators=[validate_photo], verbose_name="Фото профиля")
+    main_photo = models.ImageField(upload_to=user_profile_photo_path, blank=True, null=True, validators=[validate_photo], verbose_name="Заглавное фото")
+    # Уменьшенные копии фото (пути в хранилище), заполняются вне запроса, см. photo_processing.py
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Копии фото")
     likes_count = models.PositiveIntegerField(default=0, verbose_name="Количество лайков")
     privacy_setting = models.CharField(max_length=20, choices=PRIVACY_CHOICES, default='public', verbose_name="Настройка приватности")
+    # Случайный ключ в [0, 1) для выбора случайного профиля по индексу (см. discovery.pick_random_profile)
+    random_key = models.FloatField(default=generate_random_key, db_index=True, editable=False, verbose_name="Случайный ключ")
+    # Денормализованные поля для поиска (обновляются сигналами, см. search.py)
+    search_vector = SearchVectorField(null=True, editable=False, verbose_name="Поисковый вектор")
+    search_document = models.TextField(blank=True, default='', editable=False, verbose_name="Поисковый документ")
+    # Битовая маска увлечений (бит Interest.bit), обновляется сигналами, см. interest_mask.py
+    interest_mask = models.BigIntegerField(default=0, editable=False, verbose_name="Маска увлечений")
+    # Необязательные координаты для поиска поблизости и ячейка сетки для них (см. geo.py)
+    latitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)], verbose_name="Широта"
+    )
+    longitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)], verbose_name="Долгота"
+    )
+    geo_cell = models.BigIntegerField(null=True, blank=True, db_index=True, editable=False, verbose_name="Ячейка сетки")
+    # Метка изменения; массовые update() счётчика лайков выставляют её сами (см. votes.py, recount_likes)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
+
+    def save(self, *args, **kwargs):
+        # Ячейка сетки всегда соответствует координатам (bulk_create/update задают её сами через grid_cell)
+        self.geo_cell = grid_cell(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geo_cell'}
+        super().save(*args, **kwargs)
 
     def get_age(self):
         """
@@ -101,6 +155,25 @@ class UserProfile(models.Model):
         verbose_name = "Профиль пользователя"
         verbose_name_plural = "Профили пользователей"
         ordering = ['user__username']
+        # Индексы под реальные комбинации фильтров поиска (см. discovery.py и UserProfileViewSet)
+        indexes = [
+            # Случайный выбор: равенство по полу/городу + поиск по random_key
+            models.Index(fields=['gender', 'random_key'], name='profile_gender_random_idx'),
+            models.Index(fields=['city', 'random_key'], name='profile_city_random_idx'),
+            models.Index(fields=['gender', 'city', 'random_key'], name='profile_gender_city_random_idx'),
+            # Частичный индекс для самого частого случая — профили "в поиске"
+            models.Index(fields=['gender', 'random_key'], condition=models.Q(status='searching'), name='profile_searching_random_idx'),
+            # Список профилей: пол/город/статус + диапазон дат рождения
+            models.Index(fields=['gender', 'city', 'status', 'birth_date'], name='profile_filters_birth_idx'),
+            models.Index(fields=['gender', 'birth_date'], name='profile_gender_birth_idx'),
+            # Сортировка по популярности
+            models.Index(fields=['-likes_count', '-id'], name='profile_likes_count_idx'),
+            # Сортировка по дате рождения с id — для курсорной пагинации (см. pagination.py)
+            models.Index(fields=['birth_date', 'id'], name='profile_birth_date_idx'),
+            # Полнотекстовый и триграммный поиск (search.py)
+            GinIndex(fields=['search_vector'], name='profile_search_vector_idx'),
+            GinIndex(fields=['search_document'], opclasses=['gin_trgm_ops'], name='profile_search_trgm_idx'),
+        ]
 
 
 def delete_profile_photo(sender, instance, **kwargs):
@@ -140,6 +213,20 @@ class LikeDislike(models.Model):
         verbose_name = "Голос (лайк/дизлайк)"
         verbose_name_plural = "Голоса (лайки/дизлайки)"
 
+# --- Индекс просмотренных (оценённых) пользователей ---
+class SeenIndex(models.Model):
+    """
+    Сериализованное множество id пользователей, за которых пользователь уже голосовал
+    (см. seen.SeenSet). Используется для исключения оценённых профилей при поиске.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='seen_index', verbose_name="Пользователь")
+    data = models.BinaryField(verbose_name="Данные множества")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
+
+    class Meta:
+        verbose_name = "Индекс оценённых пользователей"
+        verbose_name_plural = "Индексы оценённых пользователей"
+
 # --- Модель истории просмотров (K3.1) ---
 class ViewHistory(models.Model):
     """
@@ -147,7 +234,8 @@ class ViewHistory(models.Model):
     """
     viewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='profiles_viewed', verbose_name="Просматривающий")
     viewed_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, verbose_name="Просмотренный профиль")
-    timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Дата и время просмотра")
+    # Не auto_now_add: просмотры пишутся пачками с задержкой (view_buffer.py), время берётся на момент просмотра
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Дата и время просмотра")
 
     class Meta:
         verbose_name = "Просмотр профиля"
@@ -155,6 +243,30 @@ class ViewHistory(models.Model):
         # Уникальность не требуется, пользователь может смотреть один профиль несколько раз
         # unique_together = ('viewer', 'viewed_profile') # <-- Можно добавить, если нужна уникальность
 
+class ViewHistoryRollup(models.Model):
+    """
+    Свёрнутая история просмотров: одна строка на пару (просматривающий, профиль).
+    Заполняется командой compact_view_history из сырых записей ViewHistory.
+    """
+    viewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='profile_view_rollups', verbose_name="Просматривающий")
+    viewed_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, verbose_name="Просмотренный профиль")
+    view_count = models.PositiveIntegerField(default=0, verbose_name="Количество просмотров")
+    first_seen = models.DateTimeField(verbose_name="Первый просмотр")
+    last_seen = models.DateTimeField(verbose_name="Последний просмотр")
+
+    class Meta:
+        verbose_name = "Сводка просмотров профиля"
+        verbose_name_plural = "Сводки просмотров профилей"
+        constraints = [
+            models.UniqueConstraint(fields=['viewer', 'viewed_profile'], name='view_rollup_unique_pair'),
+        ]
+        indexes = [
+            # Лента истории пользователя: последние просмотры первыми
+            models.Index(fields=['viewer', '-last_seen', '-id'], name='view_rollup_viewer_last_idx'),
+            # Очистка по сроку хранения
+            models.Index(fields=['last_seen'], name='view_rollup_last_seen_idx'),
+        ]
+
 # --- Модель понравившихся пользователей (K3.2) ---
 class LikedUsers(models.Model):
     """
@@ -168,6 +280,10 @@ class LikedUsers(models.Model):
         unique_together = ('user', 'liked_user') # Пользователь не может дважды добавить в понравившиеся
         verbose_name = "Понравившийся пользователь"
         verbose_name_plural = "Понравившиеся пользователи"
+        indexes = [
+            # Курсорная пагинация списка (см. pagination.py)
+            models.Index(fields=['user', '-timestamp', '-id'], name='liked_users_user_ts_idx'),
+        ]
 
 # --- Модель непонравившихся пользователей (K3.3) ---
 class DislikedUsers(models.Model):
@@ -182,6 +298,10 @@ class DislikedUsers(models.Model):
         unique_together = ('user', 'disliked_user') # Пользователь не может дважды добавить в непонравившиеся
         verbose_name = "Непонравившийся пользователь"
         verbose_name_plural = "Непонравившиеся пользователи"
+        indexes = [
+            # Курсорная пагинация списка (см. pagination.py)
+            models.Index(fields=['user', '-timestamp', '-id'], name='disliked_users_user_ts_idx'),
+        ]
 
 # --- Модель истории лайков (K3.4) ---
 class LikeHistory(models.Model):
@@ -195,6 +315,10 @@ class LikeHistory(models.Model):
     class Meta:
         verbose_name = "История лайка"
         verbose_name_plural = "Истории лайков"
+        indexes = [
+            # Курсорная пагинация истории (см. pagination.py)
+            models.Index(fields=['user', '-timestamp', '-id'], name='like_history_user_ts_idx'),
+        ]
 
 # --- Модель взаимного лайка (матча) и приглашения (K3.5) ---
 class Match(models.Model):
@@ -205,10 +329,27 @@ class Match(models.Model):
     user2 = models.ForeignKey(User, on_delete=models.CASCADE, related_name='matches_received', verbose_name="Пользователь 2")
     timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Дата матча")
 
+    @staticmethod
+    def pair(user_id1, user_id2):
+        """
+        Канонический ключ пары: (меньший id, больший id) — именно так хранятся user1 и user2.
+        """
+        return min(user_id1, user_id2), max(user_id1, user_id2)
+
     class Meta:
         unique_together = ('user1', 'user2') # Один матч между двумя пользователями
         verbose_name = "Матч"
         verbose_name_plural = "Матчи"
+        constraints = [
+            # Пара хранится в каноническом порядке, поэтому уникальный индекс (user1, user2)
+            # исключает и зеркальные дубли, а поиск матча — одно равенство без OR
+            models.CheckConstraint(check=models.Q(user1__lt=models.F('user2')), name='match_users_ordered'),
+        ]
+        indexes = [
+            # Курсорная пагинация матчей пользователя — по индексу на каждую сторону пары
+            models.Index(fields=['user1', '-timestamp', '-id'], name='match_user1_ts_idx'),
+            models.Index(fields=['user2', '-timestamp', '-id'], name='match_user2_ts_idx'),
+        ]
 
 # --- Модель чата (для доп. задания) ---
 class Chat(models.Model):
@@ -234,7 +375,8 @@ class Message(models.Model):
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE, related_name='messages', verbose_name="Чат")
     sender = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Отправитель")
     content = models.TextField(verbose_name="Содержание сообщения")
-    timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Дата отправки")
+    # Не auto_now_add: ChatConsumer сохраняет сообщения пачками, время берётся на момент отправки
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Дата отправки")
 
     def __str__(self):
         return f"Сообщение от {self.sender.username} в {self.chat.id} в {self.timestamp}"
@@ -242,4 +384,8 @@ class Message(models.Model):
     class Meta:
         verbose_name = "Сообщение"
         verbose_name_plural = "Сообщения"
-        ordering = ['timestamp']
\ No newline at end of file
+        ordering = ['timestamp']
+        indexes = [
+            # История чата листается курсором от новых к старым (см. pagination.py)
+            models.Index(fields=['chat', '-timestamp', '-id'], name='message_chat_ts_idx'),
+        ]
\ No newline at end of file
@@ -0,0 +1,52 @@
+# dating_app/notifications.py
+
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from .metrics import CHANNEL_SEND_LATENCY
+
+logger = logging.getLogger(__name__)
+
+EVENT_LIKE = 'like' # Пользователя лайкнули
+EVENT_MATCH = 'match' # Взаимный лайк
+
+
+def user_group(user_id):
+    """
+    Группа channel layer, на которую подписан NotificationConsumer пользователя.
+    """
+    return f'notifications_{user_id}'
+
+
+def send_events(events):
+    """
+    Отправляет события [(user_id, {'event': ..., ...})] в группы получателей.
+    Недоступный channel layer не должен ломать запрос — ошибка только логируется.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not events:
+        return
+    try:
+        for user_id, event in events:
+            with CHANNEL_SEND_LATENCY.time(kind='notification'):
+                async_to_sync(channel_layer.group_send)(user_group(user_id), {'type': 'notify', **event})
+    except Exception:
+        logger.warning('Не удалось отправить уведомления (%d событий)', len(events), exc_info=True)
+
+
+def publish_vote_events(voter, liked_user_ids, matched_user_ids):
+    """
+    После коммита уведомляет о голосах voter: получатели новых лайков получают like,
+    обе стороны нового матча — match (вместо like).
+    """
+    matched_user_ids = set(matched_user_ids)
+    events = [
+        (user_id, {'event': EVENT_LIKE, 'user_id': voter.id})
+        for user_id in liked_user_ids if user_id not in matched_user_ids
+    ]
+    for user_id in matched_user_ids:
+        events.append((user_id, {'event': EVENT_MATCH, 'user_id': voter.id}))
+        events.append((voter.id, {'event': EVENT_MATCH, 'user_id': user_id}))
+    if events:
+        transaction.on_commit(lambda: send_events(events))
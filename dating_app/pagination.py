@@ -0,0 +1,178 @@
+# dating_app/pagination.py
+
+import json
+from datetime import datetime
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """
+    Даты-время — с микросекундами: DjangoJSONEncoder обрезает их до миллисекунд, и строки
+    с отметками внутри той же миллисекунды (пакетные сохранения) пропускались бы условием «после».
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def ordering_fields(queryset):
+    """
+    Поля сортировки queryset в виде [(имя, по убыванию)]; в конце всегда pk
+    (в том же направлении, что и первое поле, чтобы хватало одного индекса).
+    """
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    fields = {}
+    for item in ordering:
+        if isinstance(item, OrderBy) and isinstance(item.expression, F):
+            name, descending = item.expression.name, item.descending
+        elif isinstance(item, str) and item != '?':
+            name, descending = item.lstrip('-'), item.startswith('-')
+        else:
+            raise ValueError(f'Сортировка {item!r} не поддерживается курсорной пагинацией')
+        fields.setdefault('pk' if name == 'id' else name, descending)
+    if 'pk' not in fields:
+        fields['pk'] = next(iter(fields.values()), False)
+    return list(fields.items())
+
+
+def _field_value(obj, name):
+    if isinstance(obj, dict): # Строка .values()
+        return obj['id' if name == 'pk' else name]
+    for attr in name.split('__'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _after(fields, values):
+    """
+    Условие «строго после позиции values» для сортировки fields:
+    (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y).
+    """
+    condition = Q()
+    equal = {}
+    for (name, descending), value in zip(fields, values):
+        condition |= Q(**equal, **{f'{name}__{"lt" if descending else "gt"}': value})
+        equal[name] = value
+    return condition
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация: курсор хранит значения полей сортировки последней
+    строки страницы, следующая страница выбирается условием WHERE (ключ, id) > курсор
+    по индексу. Страница N стоит столько же, сколько первая, COUNT(*) не выполняется.
+    Работает только вперёд (бесконечная прокрутка); ответ — {'next', 'results'}.
+    Поля сортировки должны быть NOT NULL; к ним всегда добавляется id для однозначности.
+    Обычный список (например, ранжированные id) листается по позиции.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, values):
+        data = json.dumps(values, cls=_CursorEncoder, separators=(',', ':'))
+        return urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        if isinstance(queryset, list):
+            start = cursor[0] if cursor else 0
+            if not isinstance(start, int) or start < 0:
+                raise NotFound(self.invalid_cursor_message)
+            page = queryset[start:start + page_size]
+            self.next_cursor = [start + page_size] if start + page_size < len(queryset) else None
+            return page
+
+        fields = ordering_fields(queryset)
+        queryset = queryset.order_by(*[f'-{name}' if descending else name for name, descending in fields])
+        if cursor is not None:
+            if len(cursor) != len(fields):
+                raise NotFound(self.invalid_cursor_message)
+            # Отдельная граница по первому полю даёт планировщику диапазон для индекса
+            name, descending = fields[0]
+            try:
+                queryset = queryset.filter(**{f'{name}__{"lte" if descending else "gte"}': cursor[0]})
+                queryset = queryset.filter(_after(fields, cursor))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        page = list(queryset[:page_size + 1]) # Лишняя строка показывает, есть ли следующая страница
+        self.next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = [_field_value(page[-1], name) for name, _ in fields]
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(remove_query_param(url, 'offset'), self.cursor_query_param, self.encode_cursor(self.next_cursor))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор следующей страницы (из поля next)',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Размер страницы',
+                'schema': {'type': 'integer'},
+            },
+        ]
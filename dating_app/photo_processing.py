@@ -0,0 +1,156 @@
+# dating_app/photo_processing.py
+#
+# Обработка фото профиля вне запроса: после сохранения профиля с новым фото копии
+# (см. photos.render_variants) строятся в пуле потоков и записываются в хранилище,
+# а пути к ним — в UserProfile.photo_variants. Pillow отпускает GIL при декодировании,
+# масштабировании и кодировании, поэтому потоки пула занимают несколько ядер.
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_delete, post_save
+from .models import UserProfile
+from .photos import IMAGE_ERRORS, PHOTO_FIELDS, photo_option, render_variants
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def variant_name(source, size, image_format):
+    """
+    Путь копии рядом с оригиналом: profile_photos/user_1/variants/<имя>-<хэш пути>-<размер>.<формат>.
+    """
+    directory, filename = os.path.split(source)
+    digest = hashlib.md5(source.encode('utf-8')).hexdigest()[:8]
+    extension = 'jpg' if image_format == 'jpeg' else image_format
+    return os.path.join(directory, 'variants', f'{os.path.splitext(filename)[0]}-{digest}-{size}.{extension}')
+
+
+def pending_fields(profile):
+    """
+    Поля, копии которых не построены, построены для прежнего файла или остались от удалённого фото.
+    """
+    variants = profile.photo_variants or {}
+    return [
+        field for field in PHOTO_FIELDS
+        if (getattr(profile, field).name or None) != (variants.get(field) or {}).get('source')
+    ]
+
+
+def _build(field_file):
+    """
+    Строит и сохраняет копии одного фото; запись для photo_variants.
+    Нечитаемый файл даёт запись без копий — повторно его не обрабатываем.
+    """
+    source, storage = field_file.name, field_file.storage
+    try:
+        with storage.open(source, 'rb') as original:
+            rendered = render_variants(original)
+    except IMAGE_ERRORS:
+        logger.warning('Не удалось обработать фото %s', source, exc_info=True)
+        return {'source': source, 'sizes': {}}
+    sizes = {}
+    for size, variant in rendered.items():
+        files = {
+            image_format: storage.save(variant_name(source, size, image_format), ContentFile(data))
+            for image_format, data in variant['data'].items()
+        }
+        sizes[size] = {'width': variant['width'], 'height': variant['height'], 'files': files}
+    return {'source': source, 'sizes': sizes}
+
+
+def delete_variant_files(entry):
+    """
+    Удаляет файлы копий записи photo_variants (если они ещё есть).
+    """
+    if not entry:
+        return
+    storage = UserProfile._meta.get_field('main_photo').storage
+    for variant in entry['sizes'].values():
+        for name in variant['files'].values():
+            storage.delete(name)
+
+
+def process_profile_photos(profile_id):
+    """
+    Строит недостающие копии фото профиля и сохраняет их в photo_variants; возвращает число
+    обработанных полей. Файлы пишутся вне транзакции, а профиль обновляется под блокировкой
+    строки и только для полей, фото в которых за это время не заменили (копии для
+    заменённого фото удаляются — новое фото обработает следующий запуск).
+    """
+    fields = ('id', *PHOTO_FIELDS, 'photo_variants', 'latitude', 'longitude') # Координаты читает UserProfile.save
+    profile = UserProfile.objects.only(*fields).filter(pk=profile_id).first()
+    if profile is None:
+        return 0
+    built = {}
+    for field in pending_fields(profile):
+        field_file = getattr(profile, field)
+        built[field] = (field_file.name or None, _build(field_file) if field_file else None)
+    if not built:
+        return 0
+
+    unused = []
+    with transaction.atomic():
+        current = UserProfile.objects.select_for_update().only(*fields).filter(pk=profile_id).first()
+        variants = dict(current.photo_variants or {}) if current is not None else {}
+        applied = 0
+        for field, (source, entry) in built.items():
+            if current is None or (getattr(current, field).name or None) != source:
+                unused.append(entry)
+                continue
+            unused.append(variants.pop(field, None)) # Копии прежнего фото
+            if entry is not None:
+                variants[field] = entry
+            applied += 1
+        if applied:
+            current.photo_variants = variants
+            # post_save сбрасывает запись профиля в кэше (profile_cache.py)
+            current.save(update_fields=['photo_variants', 'updated_at'])
+    for entry in unused:
+        delete_variant_files(entry)
+    return applied
+
+
+def _process_in_background(profile_id):
+    close_old_connections()
+    try:
+        process_profile_photos(profile_id)
+    except Exception:
+        logger.exception('Ошибка обработки фото профиля %s', profile_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_processing(profile_id):
+    """
+    Запускает обработку фото профиля после коммита текущей транзакции:
+    в пуле потоков (PHOTO_PROCESSING['ASYNC']) или синхронно.
+    """
+    global _executor
+    if not photo_option('ASYNC', True):
+        transaction.on_commit(lambda: process_profile_photos(profile_id))
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=photo_option('WORKERS', 2), thread_name_prefix='photo-processing')
+    transaction.on_commit(lambda: _executor.submit(_process_in_background, profile_id))
+
+
+def profile_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not set(PHOTO_FIELDS) & set(update_fields)):
+        return
+    if pending_fields(instance):
+        schedule_processing(instance.pk)
+
+
+def profile_deleted(sender, instance, **kwargs):
+    # Оригиналы удаляет models.delete_profile_photo
+    for entry in (instance.photo_variants or {}).values():
+        delete_variant_files(entry)
+
+
+post_save.connect(profile_saved, sender=UserProfile)
+post_delete.connect(profile_deleted, sender=UserProfile)
@@ -0,0 +1,136 @@
+# dating_app/photos.py
+#
+# Работа с изображениями фото профиля (Pillow): проверка загрузки и построение
+# уменьшенных копий thumb/card/full в WebP и JPEG. Сама обработка вне запроса —
+# в photo_processing.py; модуль не зависит от моделей (validate_photo — валидатор полей модели).
+
+import io
+import math
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+
+# Поля UserProfile с фото
+PHOTO_FIELDS = ('photo_gallery', 'main_photo')
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+DEFAULT_SIZES = {'thumb': 160, 'card': 640, 'full': 1600} # Наибольшая сторона, px
+DEFAULT_FORMATS = ('webp', 'jpeg')
+DEFAULT_QUALITY = {'webp': 80, 'jpeg': 82}
+
+# Ошибки Pillow при чтении повреждённого или неподдерживаемого файла
+IMAGE_ERRORS = (OSError, ValueError, SyntaxError, Image.DecompressionBombError)
+
+_ENCODERS = {
+    'webp': ('WEBP', {'method': 4}),
+    'jpeg': ('JPEG', {'optimize': True, 'progressive': True}),
+}
+
+
+def photo_option(name, default):
+    return getattr(settings, 'PHOTO_PROCESSING', {}).get(name, default)
+
+
+def validate_photo(file):
+    """
+    Валидатор загрузки: размер файла, формат (JPEG, PNG, WebP) и число пикселей.
+    Читается только заголовок изображения, поэтому проверка дешёвая.
+    """
+    if getattr(file, '_committed', False): # Уже сохранённый файл проверен при загрузке
+        return
+    limit = photo_option('MAX_UPLOAD_MB', 15)
+    if file.size > limit * 1024 * 1024:
+        raise ValidationError(f'Размер фото превышает {limit} МБ.', code='photo_too_large')
+
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            image_format, (width, height) = image.format, image.size
+    except IMAGE_ERRORS as error:
+        raise ValidationError('Файл не является изображением.', code='invalid_photo') from error
+    finally:
+        file.seek(0)
+
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError('Поддерживаются фото в форматах JPEG, PNG и WebP.', code='photo_format')
+    if width * height > photo_option('MAX_PIXELS', 40_000_000):
+        raise ValidationError(f'Слишком большое изображение: {width}×{height}.', code='photo_too_many_pixels')
+
+
+def _to_rgb(image):
+    # Прозрачность (PNG, WebP) заливаем белым: у JPEG альфа-канала нет
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB') if image.mode != 'RGB' else image
+
+
+def render_variants(source, sizes=None, formats=None):
+    """
+    Уменьшенные копии изображения: {размер: {'width', 'height', 'data': {формат: байты}}}.
+    Копии строятся от большей к меньшей, каждая из предыдущей; JPEG декодируется
+    сразу в уменьшенном виде (draft), поэтому многомегапиксельный оригинал целиком не распаковывается.
+    Меньшие оригиналы не увеличиваются.
+    """
+    sizes = sizes or photo_option('SIZES', DEFAULT_SIZES)
+    formats = formats or photo_option('FORMATS', DEFAULT_FORMATS)
+    quality = photo_option('QUALITY', DEFAULT_QUALITY)
+    with Image.open(source) as original:
+        # Запрашиваем размер не меньше самой большой копии с теми же пропорциями: квадратная
+        # рамка у вытянутого снимка не дала бы уменьшить при декодировании ни одну сторону
+        scale = min(1, max(sizes.values()) / max(original.size))
+        original.draft('RGB', (math.ceil(original.width * scale), math.ceil(original.height * scale)))
+        image = _to_rgb(ImageOps.exif_transpose(original))
+
+    variants = {}
+    for name, side in sorted(sizes.items(), key=lambda item: -item[1]):
+        if max(image.size) > side:
+            image = image.copy()
+            image.thumbnail((side, side), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        data = {}
+        for image_format in formats:
+            pillow_format, options = _ENCODERS[image_format]
+            output = io.BytesIO()
+            image.save(output, pillow_format, quality=quality.get(image_format, 80), **options)
+            data[image_format] = output.getvalue()
+        variants[name] = {'width': image.width, 'height': image.height, 'data': data}
+    return variants
+
+
+def _url(name, request):
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def photo_variant_urls(variants, request=None):
+    """
+    URL копий для ответа API: {поле: {размер: {'width', 'height', формат: URL}}}.
+    None у поля — копий нет (фото не загружено, ещё обрабатывается или не прочиталось).
+    """
+    urls = {}
+    for field in PHOTO_FIELDS:
+        entry = (variants or {}).get(field)
+        sizes = entry['sizes'] if entry else None
+        urls[field] = {
+            size: {'width': variant['width'], 'height': variant['height'],
+                   **{image_format: _url(name, request) for image_format, name in variant['files'].items()}}
+            for size, variant in sizes.items()
+        } if sizes else None
+    return urls
+
+
+def absolute_variant_urls(urls, request):
+    """
+    Делает абсолютными URL из photo_variant_urls(..., request=None) — для записей кэша профилей.
+    """
+    return {
+        field: {
+            size: {key: request.build_absolute_uri(value) if isinstance(value, str) else value
+                   for key, value in variant.items()}
+            for size, variant in sizes.items()
+        } if sizes else None
+        for field, sizes in urls.items()
+    }
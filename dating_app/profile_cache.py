@@ -0,0 +1,176 @@
+# dating_app/profile_cache.py
+
+import time
+from datetime import date
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from .models import Interest, UserProfile
+from .fast_serializers import age_on, profile_values, serialize_profile_rows
+from .pagination import ordering_fields
+from .photos import absolute_variant_urls
+from .serializers import UserSerializer
+
+User = get_user_model()
+
+# Общее поколение кэша: меняется, когда устаревают сразу все записи (переименование увлечения и т.п.)
+GENERATION_KEY = 'profile-cache-generation'
+
+
+def _timeout():
+    return getattr(settings, 'PROFILE_CACHE_TIMEOUT', 60 * 60)
+
+
+def _version_key(profile_id):
+    return f'profile-version:{profile_id}'
+
+
+def _new_version():
+    # Версия вместо потерянного (истёкшего) счётчика не должна совпасть ни с одной из прежних
+    return time.time_ns()
+
+
+def _version_timeout():
+    # Счётчик живёт дольше записей, которые он адресует; истечение безопасно — заводится новая
+    # версия. Без срока каждый запрос несуществующего /api/profiles/<n>/ оставлял бы вечный ключ
+    return 2 * _timeout()
+
+
+def _versions(profile_ids):
+    """
+    Текущие версии профилей и общее поколение одним get_many.
+    Отсутствующие (вытесненные, истёкшие) счётчики заводятся заново с новым значением.
+    """
+    keys = [GENERATION_KEY] + [_version_key(profile_id) for profile_id in profile_ids]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, _new_version(), None if key == GENERATION_KEY else _version_timeout())
+        found.update(cache.get_many(missing))
+    return found[GENERATION_KEY], {profile_id: found[_version_key(profile_id)] for profile_id in profile_ids}
+
+
+def _present(entry, request, today):
+    """
+    Копия записи кэша для ответа: возраст на сегодня и абсолютные URL фото, как у сериализатора.
+    """
+    item = dict(entry)
+    item['age'] = age_on(date.fromisoformat(entry['birth_date']), today)
+    if request is not None:
+        for name in ('photo_gallery', 'main_photo'):
+            if item[name]:
+                item[name] = request.build_absolute_uri(item[name])
+        item['photo_variants'] = absolute_variant_urls(item['photo_variants'], request)
+    return item
+
+
+def get_cached_profiles(profile_ids, request=None):
+    """
+    Сериализованные профили {id: словарь в формате UserProfileSerializer} для profile_ids.
+    Записи кэша адресуются id и версией профиля, поэтому все ключи читаются одним get_many,
+    а из БД (profile_values + один запрос увлечений) загружаются только промахи.
+    Несуществующие профили в результат не попадают.
+    """
+    profile_ids = list(dict.fromkeys(profile_ids))
+    if not profile_ids:
+        return {}
+    generation, versions = _versions(profile_ids)
+    # v2 — формат записи с photo_variants; записи прежнего формата просто не читаются
+    entry_keys = {profile_id: f'profile:v2:{profile_id}:{generation}:{versions[profile_id]}' for profile_id in profile_ids}
+    entries = cache.get_many(list(entry_keys.values()))
+
+    missing = [profile_id for profile_id, key in entry_keys.items() if key not in entries]
+    if missing:
+        # В кэше хранится представление без request (относительные URL) и без distance_km
+        rows = serialize_profile_rows(list(profile_values(UserProfile.objects.filter(pk__in=missing).order_by())))
+        fresh = {entry_keys[row['id']]: row for row in rows}
+        cache.set_many(fresh, _timeout())
+        entries.update(fresh)
+
+    today = date.today()
+    return {
+        profile_id: _present(entries[key], request, today)
+        for profile_id, key in entry_keys.items() if key in entries
+    }
+
+
+def profile_stamp(profile_id):
+    """
+    Метка версии записи профиля (поколение и версия) — валидатор для условного GET без запросов к БД.
+    """
+    generation, versions = _versions([profile_id])
+    return f'{generation}.{versions[profile_id]}'
+
+
+def profile_keys(queryset):
+    """
+    Узкая выборка для страницы списка: id, поля сортировки (для курсора) и аннотации
+    (distance_km и т.п.); сами профили затем берутся из кэша.
+    """
+    names = [name for name, _ in ordering_fields(queryset) if name != 'pk']
+    return queryset.prefetch_related(None).values('id', *names, *queryset.query.annotation_select)
+
+
+def bump_profiles(profile_ids):
+    """
+    Инвалидирует записи профилей (после коммита текущей транзакции).
+    """
+    keys = [_version_key(profile_id) for profile_id in profile_ids]
+    if not keys:
+        return
+
+    def bump():
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError: # Счётчика нет — заводим новый
+                cache.set(key, _new_version(), _version_timeout())
+
+    transaction.on_commit(bump)
+
+
+def bump_generation():
+    """
+    Инвалидирует весь кэш профилей (после коммита текущей транзакции).
+    """
+    transaction.on_commit(lambda: cache.set(GENERATION_KEY, _new_version(), None))
+
+
+def profile_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_profiles([instance.pk])
+
+
+def profile_interests_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        bump_profiles([instance.pk])
+    elif pk_set:
+        bump_profiles(pk_set)
+    else: # Очистка со стороны увлечения — затронутые профили уже не узнать
+        bump_generation()
+
+
+def user_changed(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    # Профиль включает только поля UserSerializer; обновление last_login и т.п. кэш не трогает
+    if raw or created or (update_fields is not None and not set(update_fields) & set(UserSerializer.Meta.fields)):
+        return
+    bump_profiles(UserProfile.objects.filter(user=instance).values_list('id', flat=True))
+
+
+def interest_changed(sender, instance, created=False, raw=False, **kwargs):
+    # Новое увлечение ещё не входит ни в один профиль
+    if not raw and not created:
+        bump_generation()
+
+
+post_save.connect(profile_changed, sender=UserProfile)
+post_delete.connect(profile_changed, sender=UserProfile)
+m2m_changed.connect(profile_interests_changed, sender=UserProfile.interests.through)
+post_save.connect(user_changed, sender=User)
+post_save.connect(interest_changed, sender=Interest)
+post_delete.connect(interest_changed, sender=Interest)
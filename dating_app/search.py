@@ -0,0 +1,88 @@
+# dating_app/search.py
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.db.models.signals import post_save
+from .models import UserProfile, Interest
+from .interest_sync import connect_interest_refresh
+
+
+def _search_config():
+    return getattr(settings, 'PROFILE_SEARCH_CONFIG', 'russian')
+
+
+def refresh_search_index(queryset):
+    """
+    Пересчитывает search_vector и search_document для профилей из queryset одним UPDATE.
+    Названия увлечений собираются подзапросом, поэтому функция работает и с историческими
+    моделями из миграций.
+    """
+    model = queryset.model
+    through = model.interests.through
+    interest_names = Subquery(
+        through.objects
+        .filter(userprofile_id=OuterRef('pk'))
+        .order_by()
+        .values('userprofile_id')
+        .annotate(names=StringAgg('interest__name', ' '))
+        .values('names')
+    )
+    interests = Coalesce(interest_names, Value(''), output_field=TextField())
+    config = _search_config()
+    return queryset.order_by().update(
+        search_vector=(
+            SearchVector('first_name', 'last_name', 'patronymic', weight='A', config=config)
+            + SearchVector('city', weight='B', config=config)
+            + SearchVector(interests, weight='C', config=config)
+        ),
+        search_document=Concat(
+            'first_name', Value(' '), 'last_name', Value(' '), Coalesce('patronymic', Value('')),
+            Value(' '), 'city', Value(' '), interests,
+            output_field=TextField(),
+        ),
+    )
+
+
+def search_profiles(queryset, query):
+    """
+    Ищет профили по имени, фамилии, отчеству, городу и увлечениям.
+    Полнотекстовое совпадение (GIN по search_vector) объединяется с нечётким поиском
+    по триграммам (GIN по search_document), результат упорядочен по релевантности.
+    Поиск идёт по денормализованным полям, поэтому строки не дублируются.
+    """
+    search_query = SearchQuery(query, search_type='websearch', config=_search_config())
+    return (
+        queryset
+        .filter(Q(search_vector=search_query) | Q(search_document__trigram_word_similar=query))
+        # real (float4) -> double precision: иначе значение из курсора пагинации (double)
+        # не равно значению строки, и следующая страница повторяет предыдущую
+        .annotate(search_rank=Cast(
+            SearchRank(F('search_vector'), search_query) + TrigramWordSimilarity(query, 'search_document'), FloatField(),
+        ))
+        .order_by('-search_rank', 'pk')
+    )
+
+
+# --- Инкрементальное обновление индекса ---
+# Поля профиля, из которых строится поисковый документ
+SEARCH_FIELDS = {'first_name', 'last_name', 'patronymic', 'city'}
+
+
+def profile_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not SEARCH_FIELDS & set(update_fields)):
+        return
+    refresh_search_index(UserProfile.objects.filter(pk=instance.pk))
+
+
+def interest_saved(sender, instance, created, raw=False, **kwargs):
+    # Переименование увлечения меняет документы всех профилей с ним
+    if not created and not raw:
+        refresh_search_index(UserProfile.objects.filter(interests=instance))
+
+
+post_save.connect(profile_saved, sender=UserProfile)
+post_save.connect(interest_saved, sender=Interest)
+connect_interest_refresh('search', refresh_search_index)
@@ -0,0 +1,256 @@
+# dating_app/seen.py
+
+import struct
+from array import array
+from bisect import bisect_left
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import BinaryField, F, Func, Value
+from django.db.models.functions import Now
+from .models import LikeDislike, SeenIndex
+
+# Контейнер-массив переводится в битовую карту, когда в нём больше ARRAY_LIMIT значений
+ARRAY_LIMIT = 4096
+BITMAP_BYTES = 8192  # 2**16 бит
+_ARRAY, _BITMAP = 0, 1
+_HEADER = struct.Struct('<I')
+_CONTAINER_HEADER = struct.Struct('<IBI')
+
+
+class SeenSet:
+    """
+    Компактное множество id пользователей (упрощённый roaring bitmap).
+    Id делятся на старшие и младшие 16 бит: для каждого старшего значения хранится
+    либо отсортированный массив младших (разреженные данные), либо битовая карта на 8 КБ.
+    """
+
+    def __init__(self, values=()):
+        self._containers = {}
+        self.segments = 1 # Из скольких дописанных друг к другу частей собрано (см. from_bytes)
+        self.update(values)
+
+    def add(self, value):
+        """
+        Добавляет id. Возвращает True, если значения ещё не было.
+        """
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            self._containers[high] = array('H', [low])
+            return True
+        if isinstance(container, bytearray):
+            byte, bit = low >> 3, 1 << (low & 7)
+            if container[byte] & bit:
+                return False
+            container[byte] |= bit
+            return True
+        position = bisect_left(container, low)
+        if position < len(container) and container[position] == low:
+            return False
+        container.insert(position, low)
+        if len(container) > ARRAY_LIMIT:
+            self._containers[high] = self._to_bitmap(container)
+        return True
+
+    def update(self, values):
+        """
+        Добавляет несколько id. Возвращает количество новых значений.
+        """
+        return sum(1 for value in values if self.add(value))
+
+    def __contains__(self, value):
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, bytearray):
+            return bool(container[low >> 3] & (1 << (low & 7)))
+        position = bisect_left(container, low)
+        return position < len(container) and container[position] == low
+
+    def __len__(self):
+        return sum(
+            sum(bin(byte).count('1') for byte in container) if isinstance(container, bytearray) else len(container)
+            for container in self._containers.values()
+        )
+
+    def __iter__(self):
+        for high in sorted(self._containers):
+            for low in self._lows(self._containers[high]):
+                yield (high << 16) | low
+
+    @staticmethod
+    def _lows(container):
+        if isinstance(container, bytearray):
+            return (byte_index * 8 + bit for byte_index, byte in enumerate(container) if byte
+                    for bit in range(8) if byte & (1 << bit))
+        return container
+
+    @staticmethod
+    def _to_bitmap(container):
+        bitmap = bytearray(BITMAP_BYTES)
+        for low in container:
+            bitmap[low >> 3] |= 1 << (low & 7)
+        return bitmap
+
+    def to_bytes(self):
+        """
+        Сериализует множество для хранения в кэше и в SeenIndex.
+        Результаты to_bytes можно склеивать: from_bytes объединит части.
+        """
+        parts = [_HEADER.pack(len(self._containers))]
+        for high in sorted(self._containers):
+            container = self._containers[high]
+            if isinstance(container, bytearray):
+                parts.append(_CONTAINER_HEADER.pack(high, _BITMAP, len(container)))
+                parts.append(bytes(container))
+            else:
+                payload = container.tobytes()
+                parts.append(_CONTAINER_HEADER.pack(high, _ARRAY, len(payload)))
+                parts.append(payload)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Восстанавливает множество из результата to_bytes() или склейки нескольких таких результатов.
+        """
+        seen = cls()
+        data = bytes(data)
+        offset, seen.segments = 0, 0
+        while offset < len(data):
+            (count,), offset = _HEADER.unpack_from(data, offset), offset + _HEADER.size
+            seen.segments += 1
+            for _ in range(count):
+                high, kind, length = _CONTAINER_HEADER.unpack_from(data, offset)
+                offset += _CONTAINER_HEADER.size
+                payload = data[offset:offset + length]
+                offset += length
+                if kind == _BITMAP:
+                    container = bytearray(payload)
+                else:
+                    container = array('H')
+                    container.frombytes(payload)
+                if high in seen._containers: # Контейнер из дописанной части — сливаем поэлементно
+                    seen.update((high << 16) | low for low in cls._lows(container))
+                else:
+                    seen._containers[high] = container
+        return seen
+
+
+def _cache_key(user_id):
+    return f'seen:{user_id}'
+
+
+def _cache_timeout():
+    return getattr(settings, 'SEEN_INDEX_CACHE_TIMEOUT', 60 * 60)
+
+
+def _max_segments():
+    return getattr(settings, 'SEEN_INDEX_MAX_SEGMENTS', 32)
+
+
+def _load_seen(user_id):
+    """
+    Множество пользователя и его сериализованный вид (как он лежит в кэше).
+    Порядок поиска: кэш -> SeenIndex -> пересборка из LikeDislike;
+    пересобранное множество ещё не сохранено — вместо данных возвращается None.
+    """
+    data = cache.get(_cache_key(user_id))
+    if data is not None:
+        return SeenSet.from_bytes(data), data
+    index = SeenIndex.objects.filter(user_id=user_id).only('data').first()
+    if index is None:
+        return build_seen_set(user_id), None
+    data = bytes(index.data)
+    cache.set(_cache_key(user_id), data, _cache_timeout())
+    return SeenSet.from_bytes(data), data
+
+
+def get_seen_set(user_id):
+    """
+    Возвращает множество id пользователей, за которых user_id уже голосовал.
+    """
+    seen, data = _load_seen(user_id)
+    if data is None:
+        save_seen_set(user_id, seen)
+    return seen
+
+
+def build_seen_set(user_id):
+    """
+    Строит множество по таблице LikeDislike.
+    """
+    target_ids = LikeDislike.objects.filter(voter_id=user_id).values_list('target_user_id', flat=True)
+    return SeenSet(target_ids.iterator(chunk_size=10000))
+
+
+def save_seen_set(user_id, seen):
+    """
+    Сохраняет множество в кэш и в таблицу SeenIndex. Возвращает сериализованные данные.
+    """
+    data = seen.to_bytes()
+    cache.set(_cache_key(user_id), data, _cache_timeout())
+    # Один INSERT ... ON CONFLICT вместо SELECT + UPDATE/INSERT
+    SeenIndex.objects.bulk_create(
+        [SeenIndex(user_id=user_id, data=data)],
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['data', 'updated_at'],
+    )
+    return data
+
+
+def forget_seen_sets(user_ids):
+    """
+    Удаляет множества пользователей из кэша — следующее чтение возьмёт их из SeenIndex.
+    """
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+
+def _compact_seen_set(user_id, new_ids):
+    """
+    Перезаписывает множество в SeenIndex одним куском, добавив new_ids. Строка читается
+    под блокировкой, поэтому одновременное дописывание (mark_seen) не теряется.
+    """
+    with transaction.atomic():
+        index = SeenIndex.objects.select_for_update().filter(user_id=user_id).only('data').first()
+        if index is None:
+            return False
+        seen = SeenSet.from_bytes(index.data)
+        seen.update(new_ids)
+        index.data = seen.to_bytes()
+        index.save(update_fields=['data', 'updated_at'])
+    return True
+
+
+def mark_seen(user_id, target_ids):
+    """
+    Инкрементально добавляет target_ids в множество пользователя user_id.
+    В SeenIndex дописывается только часть с новыми id (bytea || часть), а не всё множество;
+    части объединяются при чтении, а когда их набирается SEEN_INDEX_MAX_SEGMENTS, множество
+    перезаписывается целиком. Запись в кэше удаляется, а не собирается заново из прочитанного
+    ранее значения: иначе одновременное дописывание из другого процесса пропало бы из кэша.
+    """
+    seen, data = _load_seen(user_id)
+    new_ids = [target_id for target_id in target_ids if seen.add(target_id)]
+    if not new_ids:
+        return seen
+    if data is None: # Множество только что собрано из LikeDislike и ещё не сохранено
+        save_seen_set(user_id, seen)
+        return seen
+    if seen.segments >= _max_segments():
+        stored = _compact_seen_set(user_id, new_ids)
+    else:
+        delta = SeenSet(new_ids).to_bytes()
+        stored = SeenIndex.objects.filter(user_id=user_id).update(
+            data=Func(F('data'), Value(delta, output_field=BinaryField()), template='%(expressions)s',
+                      arg_joiner=' || ', output_field=BinaryField()),
+            updated_at=Now(),
+        )
+    if not stored: # Строку удалила пересборка — сохраняем целиком
+        save_seen_set(user_id, seen)
+        return seen
+    cache.delete(_cache_key(user_id))
+    return seen
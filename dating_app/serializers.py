@@ -2,7 +2,8 @@
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import UserProfile, Interest, LikeDislike, ViewHistory, LikedUsers, DislikedUsers, LikeHistory, Match
+from .photos import photo_variant_urls
+from .models import UserProfile, Interest, LikeDislike, ViewHistory, ViewHistoryRollup, LikedUsers, DislikedUsers, LikeHistory, Match, Message
 
 User = get_user_model()
 
@@ -21,7 +22,7 @@ class InterestSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = Interest
-        fields = '__all__'
+        fields = ['id', 'name', 'bit'] # updated_at служит только для условных GET и в ответ не входит
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """
@@ -31,15 +32,17 @@ class UserProfileSerializer(serializers.ModelSerializer):
     age = serializers.SerializerMethodField() # Поле для возраста
     full_name = serializers.SerializerMethodField() # Поле для полного имени
     interests = InterestSerializer(many=True, read_only=True) # Вложенный вывод увлечений
+    distance_km = serializers.SerializerMethodField() # Расстояние при поиске поблизости
+    photo_variants = serializers.SerializerMethodField() # URL уменьшенных копий фото (см. photos.py)
 
     class Meta:
         model = UserProfile
         fields = [
             'id', 'user', 'first_name', 'last_name', 'patronymic', 'age', 'full_name',
             'gender', 'birth_date', 'city', 'interests', 'status', 'photo_gallery', 'main_photo',
-            'likes_count', 'privacy_setting'
+            'photo_variants', 'likes_count', 'privacy_setting', 'latitude', 'longitude', 'distance_km'
         ]
-        read_only_fields = ['id', 'user', 'age', 'full_name', 'interests', 'likes_count']
+        read_only_fields = ['id', 'user', 'age', 'full_name', 'interests', 'photo_variants', 'likes_count', 'distance_km']
 
     def get_age(self, obj):
         return obj.get_age()
@@ -47,6 +50,13 @@ class UserProfileSerializer(serializers.ModelSerializer):
     def get_full_name(self, obj):
         return obj.get_full_name()
 
+    def get_photo_variants(self, obj):
+        return photo_variant_urls(obj.photo_variants, self.context.get('request'))
+
+    def get_distance_km(self, obj):
+        distance = getattr(obj, 'distance_km', None)
+        return round(distance, 2) if distance is not None else None
+
 class LikeDislikeSerializer(serializers.ModelSerializer):
     """
     Сериализатор для модели LikeDislike.
@@ -65,6 +75,17 @@ class ViewHistorySerializer(serializers.ModelSerializer):
         fields = ['id', 'viewer', 'viewed_profile', 'timestamp']
         read_only_fields = ['id', 'viewer', 'timestamp'] # viewer заполняется автоматически
 
+class ViewHistoryRollupSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для свёрнутой истории просмотров (ViewHistoryRollup).
+    """
+    timestamp = serializers.DateTimeField(source='last_seen', read_only=True) # Совместимость с ViewHistorySerializer
+
+    class Meta:
+        model = ViewHistoryRollup
+        fields = ['id', 'viewer', 'viewed_profile', 'view_count', 'first_seen', 'last_seen', 'timestamp']
+        read_only_fields = fields
+
 class LikedUsersSerializer(serializers.ModelSerializer):
     """
     Сериализатор для модели LikedUsers.
@@ -99,4 +120,13 @@ class MatchSerializer(serializers.ModelSerializer):
     class Meta:
         model = Match
         fields = ['id', 'user1', 'user2', 'timestamp']
-        read_only_fields = ['id', 'timestamp'] # user1 и user2 заполняются при создании
\ No newline at end of file
+        read_only_fields = ['id', 'timestamp'] # user1 и user2 заполняются при создании
+
+class MessageSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для модели Message (история чата).
+    """
+    class Meta:
+        model = Message
+        fields = ['id', 'chat', 'sender', 'content', 'timestamp']
+        read_only_fields = fields # Сообщения создаются через WebSocket (ChatConsumer)
@@ -0,0 +1,197 @@
+# dating_app/sql_profiler.py
+#
+# Профилирование SQL по запросам (включается настройкой SQL_PROFILER['ENABLED']):
+# число запросов, время в БД и «формы» повторяющихся запросов — признак N+1.
+# HTTP (WSGI и ASGI) — SQLProfilerMiddleware, WebSocket — SQLProfilerConsumerMiddleware
+# вокруг маршрутов Channels (см. myproject/asgi.py).
+#
+# Запросы учитываются обёрткой соединения (execute_wrapper), а текущий профиль берётся из
+# ContextVar — поэтому учитываются и запросы из database_sync_to_async в другом потоке.
+
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_active = ContextVar('sql_profile', default=None)
+
+_CURSOR_NAME = re.compile(r'"_django_curs_\w+"')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _option(name, default):
+    return getattr(settings, 'SQL_PROFILER', {}).get(name, default)
+
+
+class RepeatedQueryError(Exception):
+    """
+    Форма запроса повторилась больше SQL_PROFILER['RAISE_ON_REPEAT'] раз за один запрос (N+1).
+    """
+
+
+def fingerprint(sql):
+    """
+    Форма запроса без значений: литералы и списки IN (%s, ...) схлопываются,
+    поэтому одинаковые запросы с разными параметрами совпадают.
+    """
+    sql = _CURSOR_NAME.sub('"_django_curs"', sql)
+    sql = _LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryProfile:
+    """
+    Счётчики одного запроса (или одного сообщения WebSocket).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[fingerprint(sql)] += 1
+
+    def repeated(self, threshold):
+        """
+        [(форма, сколько раз)] для форм, повторившихся больше threshold раз, частые первыми.
+        """
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+def _record(execute, sql, params, many, context):
+    profile = _active.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record(sql, time.perf_counter() - started)
+
+
+def _install(sender=None, connection=None, **kwargs):
+    # В начало списка: connection.execute_wrapper() снимает последнюю обёртку, и наша
+    # (добавленная при подключении внутри такого блока) не должна её подменить
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record)
+
+
+def enable():
+    """
+    Подключает учёт запросов ко всем соединениям: уже открытым в этом потоке и новым.
+    """
+    connection_created.connect(_install, dispatch_uid='dating_app.sql_profiler')
+    for connection in connections.all(initialized_only=True):
+        _install(connection=connection)
+
+
+def finish(profile, **context):
+    """
+    Пишет структурированную строку лога по профилю и возвращает отчёт.
+    Если задан RAISE_ON_REPEAT (в тестах), повтор формы сверх него — RepeatedQueryError.
+    """
+    repeated = profile.repeated(_option('REPEAT_THRESHOLD', 3))
+    report = {
+        **context,
+        'queries': profile.count,
+        'db_ms': round(profile.duration * 1000, 2),
+        'repeated': [{'count': count, 'sql': shape} for shape, count in repeated],
+    }
+    logger.log(logging.WARNING if repeated else logging.INFO, 'sql_profile %s', json.dumps(report, ensure_ascii=False))
+
+    limit = _option('RAISE_ON_REPEAT', None)
+    if limit is not None and repeated and repeated[0][1] > limit:
+        shape, count = repeated[0]
+        raise RepeatedQueryError(f'Запрос повторился {count} раз (допустимо {limit}): {shape}')
+    return report
+
+
+@contextmanager
+def profile_queries(**context):
+    """
+    Профилирует запросы внутри блока; по выходе — как finish(). Удобно и в тестах.
+    """
+    enable()
+    profile = QueryProfile()
+    token = _active.set(profile)
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+    finish(profile, **context)
+
+
+class SQLProfilerMiddleware:
+    """
+    Профиль SQL на каждый HTTP-запрос: заголовки X-SQL-Queries, X-SQL-Time (мс)
+    и X-SQL-Repeated (наибольшее число повторов одной формы) плюс строка лога.
+    Синхронный: под ASGI Django выполняет его в том же потоке, что и представление.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        enable()
+
+    def __call__(self, request):
+        profile = QueryProfile()
+        token = _active.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _active.reset(token)
+        report = finish(profile, method=request.method, path=request.path, status=response.status_code)
+        response['X-SQL-Queries'] = str(report['queries'])
+        response['X-SQL-Time'] = str(report['db_ms'])
+        response['X-SQL-Repeated'] = str(max(profile.shapes.values(), default=0))
+        return response
+
+
+class SQLProfilerConsumerMiddleware:
+    """
+    ASGI-middleware для Channels: отдельный отчёт на подключение и на каждое входящее
+    сообщение WebSocket (запросы относятся к последнему полученному событию).
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        enable()
+
+    async def __call__(self, scope, receive, send):
+        profile = QueryProfile()
+        # Задаётся до запуска потребителя: его задачи и потоки БД наследуют контекст
+        token = _active.set(profile)
+        current = {'event': None}
+
+        def report():
+            if profile.count:
+                finish(profile, path=scope.get('path'), event=current['event'])
+            profile.reset()
+
+        async def profiled_receive():
+            message = await receive()
+            report()
+            current['event'] = message['type']
+            return message
+
+        try:
+            return await self.inner(scope, profiled_receive, send)
+        finally:
+            _active.reset(token)
+            report()
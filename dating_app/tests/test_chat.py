@@ -0,0 +1,146 @@
+# dating_app/tests/test_chat.py
+
+import json
+from unittest import mock
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from django.db import DatabaseError
+from django.test import TransactionTestCase, override_settings
+from django.contrib.auth import get_user_model
+from ..consumers import ChatConsumer
+from ..models import Match, Chat, Message
+from ..routing import websocket_urlpatterns
+
+User = get_user_model()
+
+
+class Client(ApplicationCommunicator):
+    """
+    Минимальный WebSocket-клиент поверх asgiref (channels.testing требует daphne).
+    """
+
+    def __init__(self, user, path, application=None):
+        scope = {'type': 'websocket', 'path': path, 'headers': [], 'query_string': b'', 'subprotocols': [], 'user': user}
+        super().__init__(application or URLRouter(websocket_urlpatterns), scope)
+
+    async def connect(self):
+        await self.send_input({'type': 'websocket.connect'})
+        return (await self.receive_output())['type'] == 'websocket.accept'
+
+    async def send_json_to(self, data):
+        await self.send_input({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def receive_json_from(self):
+        return json.loads((await self.receive_output())['text'])
+
+    async def disconnect(self):
+        await self.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await self.wait()
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    CHAT_MESSAGE_BATCH={'SIZE': 2, 'DELAY': 60},
+)
+class ChatConsumerTestCase(TransactionTestCase):
+    # Потребитель обращается к БД из отдельного потока, поэтому нужны реальные коммиты
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', email='user1@example.com', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', email='user2@example.com', password='testpass123')
+        self.stranger = User.objects.create_user(username='user3', email='user3@example.com', password='testpass123')
+        Match.objects.create(user1=self.user1, user2=self.user2)
+
+    async def connect(self, user, other_user):
+        client = Client(user, f'/ws/chat/{other_user.id}/')
+        return client, await client.connect()
+
+    def test_messages_broadcast_and_saved_in_batches(self):
+        """
+        Тест: Сообщения рассылаются сразу, а сохраняются пачками в один чат пары.
+        """
+        async def scenario():
+            sender, connected = await self.connect(self.user1, self.user2)
+            self.assertTrue(connected)
+            receiver, connected = await self.connect(self.user2, self.user1)
+            self.assertTrue(connected)
+
+            await sender.send_json_to({'message': 'Привет'})
+            event = await receiver.receive_json_from()
+            self.assertEqual((event['message'], event['sender_id']), ('Привет', self.user1.id))
+            self.assertEqual(await Message.objects.acount(), 0) # Ещё в пачке
+
+            await sender.send_json_to({'message': 'Как дела?'})
+            await receiver.receive_json_from()
+            self.assertEqual(await Message.objects.acount(), 2) # Пачка заполнена
+
+            await receiver.send_json_to({'message': 'Хорошо'})
+            await sender.receive_json_from()
+            await sender.disconnect()
+            await receiver.disconnect()
+
+        async_to_sync(scenario)()
+        self.assertEqual(Chat.objects.count(), 1)
+        chat = Chat.objects.get()
+        self.assertEqual(set(chat.participants.values_list('id', flat=True)), {self.user1.id, self.user2.id})
+        self.assertEqual(list(chat.messages.values_list('content', flat=True)), ['Привет', 'Как дела?', 'Хорошо'])
+
+    def test_connection_without_match_is_rejected(self):
+        """
+        Тест: Без матча соединение закрывается, чат не создаётся.
+        """
+        async def scenario():
+            communicator, connected = await self.connect(self.user1, self.stranger)
+            self.assertFalse(connected)
+
+        async_to_sync(scenario)()
+        self.assertFalse(Chat.objects.exists())
+
+    def test_failed_batch_is_retried(self):
+        """
+        Тест: Пачка, которую не удалось сохранить, остаётся в очереди и сохраняется следующей попыткой.
+        """
+        failures = []
+
+        async def flaky_save(consumer, messages):
+            if not failures:
+                failures.append(len(messages))
+                raise DatabaseError('нет соединения')
+            await database_sync_to_async(Message.objects.bulk_create)(messages)
+
+        async def scenario():
+            sender, _ = await self.connect(self.user1, self.user2)
+            for text in ['Раз', 'Два', 'Три']:
+                await sender.send_json_to({'message': text})
+                await sender.receive_json_from() # Своё сообщение из группы
+            await sender.disconnect()
+
+        with mock.patch.object(ChatConsumer, 'save_messages', flaky_save):
+            async_to_sync(scenario)()
+        self.assertEqual(failures, [2])
+        self.assertEqual(list(Message.objects.order_by('timestamp').values_list('content', flat=True)), ['Раз', 'Два', 'Три'])
+
+    @override_settings(CHAT_MESSAGE_BATCH={'SIZE': 2, 'DELAY': 60, 'RETRIES': 1})
+    def test_sender_told_about_unsaved_messages(self):
+        """
+        Тест: Когда повторы исчерпаны, отправитель получает список несохранённых сообщений.
+        """
+        async def failing_save(consumer, messages):
+            raise DatabaseError('нет соединения')
+
+        async def scenario():
+            sender, _ = await self.connect(self.user1, self.user2)
+            events = []
+            for text in ['Раз', 'Два', 'Три']:
+                await sender.send_json_to({'message': text})
+                events.append(await sender.receive_json_from())
+            events.append(await sender.receive_json_from())
+            await sender.disconnect()
+            return events
+
+        with mock.patch.object(ChatConsumer, 'save_messages', failing_save):
+            events = async_to_sync(scenario)()
+        error = next(event for event in events if 'error' in event)
+        self.assertEqual([item['message'] for item in error['unsaved']], ['Раз', 'Два', 'Три'])
+        self.assertFalse(Message.objects.exists())
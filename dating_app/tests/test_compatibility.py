@@ -0,0 +1,102 @@
+# dating_app/tests/test_compatibility.py
+
+from datetime import date
+from django.test import TestCase, SimpleTestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..compatibility import CandidateArrays, popcount, score_candidates
+from ..models import UserProfile, Interest
+
+User = get_user_model()
+
+
+class ScoreCandidatesTestCase(SimpleTestCase):
+    def test_components_order_candidates(self):
+        """
+        Тест: Ровесник из того же города с общими увлечениями оценивается выше остальных.
+        """
+        viewer = UserProfile(birth_date=date(1995, 1, 1), city='Москва', interest_mask=0b111)
+        candidates = CandidateArrays([
+            (1, date(1995, 3, 1), 'Москва', 0b011, 'searching'),
+            (2, date(1975, 3, 1), 'Москва', 0b011, 'searching'),
+            (3, date(1995, 3, 1), 'Казань', 0b011, 'searching'),
+            (4, date(1995, 3, 1), 'Москва', 0, 'searching'),
+            (5, date(1995, 3, 1), 'Москва', 0b011, 'taken'),
+        ])
+        scores = score_candidates(viewer, candidates)
+        self.assertEqual(scores.argmax(), 0)
+        self.assertTrue(all(scores[0] > score for score in scores[1:]))
+
+    def test_popcount(self):
+        """
+        Тест: Подсчёт битов работает и для старших битов маски.
+        """
+        masks = CandidateArrays([(1, date(2000, 1, 1), '', (1 << 62) | 1, '')]).masks
+        self.assertEqual(int(popcount(masks)[0]), 2)
+
+
+class CompatibilityOrderingTestCase(TestCase):
+    def setUp(self):
+        music = Interest.objects.create(name='Музыка')
+        sport = Interest.objects.create(name='Спорт')
+        self.profiles = {}
+        for username, birth_date, city, interests in [
+            ('viewer', '1995-01-01', 'Москва', [music, sport]),
+            ('best', '1995-06-01', 'Москва', [music, sport]),
+            ('good', '1996-01-01', 'Москва', [music]),
+            ('far', '1960-01-01', 'Казань', []),
+        ]:
+            user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+            profile = UserProfile.objects.create(
+                user=user, first_name=username, last_name='Иванова', gender='F',
+                birth_date=birth_date, city=city
+            )
+            profile.interests.set(interests)
+            self.profiles[username] = profile
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.profiles['viewer'].user)
+
+    def test_profiles_ordering_compatibility(self):
+        """
+        Тест: ?ordering=compatibility сортирует список по совместимости и сохраняет пагинацию.
+        """
+        url = reverse('dating_app:userprofile-list')
+        response = self.client.get(url, {'ordering': 'compatibility'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['first_name'] for item in response.data['results']], ['best', 'good', 'far'])
+        response = self.client.get(url, {'ordering': 'compatibility', 'limit': 1})
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['first_name'] for item in response.data['results']], ['good'])
+
+    def test_compatibility_pages_use_one_ranking(self):
+        """
+        Тест: Страницы ?ordering=compatibility листают один сохранённый список — изменение профиля
+        посреди листания не сдвигает курсор; новая первая страница ранжирует заново.
+        """
+        music, sport = Interest.objects.all()
+        url = reverse('dating_app:userprofile-list')
+        response = self.client.get(url, {'ordering': 'compatibility', 'limit': 1})
+        self.assertEqual([item['first_name'] for item in response.data['results']], ['best'])
+
+        far = self.profiles['far']
+        far.birth_date, far.city = '1995-03-01', 'Москва'
+        far.save()
+        far.interests.set([music, sport])
+
+        names = []
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            names += [item['first_name'] for item in response.data['results']]
+        self.assertEqual(names, ['good', 'far'])
+
+        response = self.client.get(url, {'ordering': 'compatibility'})
+        self.assertEqual([item['first_name'] for item in response.data['results']], ['far', 'best', 'good'])
+
+    def test_random_profile_compatibility(self):
+        """
+        Тест: Случайный профиль с ?ordering=compatibility — лучший из выборки.
+        """
+        response = self.client.get(reverse('dating_app:get_random_profile'), {'ordering': 'compatibility'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['first_name'], 'best')
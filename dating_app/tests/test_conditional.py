@@ -0,0 +1,79 @@
+# dating_app/tests/test_conditional.py
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import UserProfile, Interest, Match
+
+User = get_user_model()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user1', email='user1@example.com', password='testpass123')
+        self.other = User.objects.create_user(username='user2', email='user2@example.com', password='testpass123')
+        self.interest = Interest.objects.create(name='Книги')
+        self.profile = UserProfile.objects.create(
+            user=self.other, first_name='Анна', last_name='Петрова', gender='F', birth_date='1992-05-15', city='Москва'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def revalidate(self, url, queries, **headers):
+        """
+        Первый запрос отдаёт ETag, повторный с If-None-Match — 304 за queries запросов к БД.
+        """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(queries):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        return response
+
+    def test_interests(self):
+        """
+        Тест: Список увлечений отдаёт 304 за один агрегирующий запрос, переименование меняет ETag.
+        """
+        url = reverse('dating_app:interest-list')
+        etag = self.revalidate(url, 1)['ETag']
+        self.interest.name = 'Чтение'
+        self.interest.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['name'], 'Чтение')
+
+        detail = self.revalidate(reverse('dating_app:interest-detail', args=[self.interest.pk]), 1)
+        self.assertIn('Last-Modified', detail)
+
+    def test_profile_detail(self):
+        """
+        Тест: Профиль перепроверяется по версии в кэше без запросов к БД; изменение даёт 200.
+        """
+        url = reverse('dating_app:userprofile-detail', args=[self.profile.pk])
+        etag = self.revalidate(url, 0)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.city = 'Казань'
+            self.profile.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['city'], 'Казань')
+
+    def test_matches(self):
+        """
+        Тест: Список матчей отдаёт 304, пока не появился новый матч; матч — по If-Modified-Since.
+        """
+        match = Match.objects.create(user1=self.user, user2=self.other)
+        url = reverse('dating_app:match-list')
+        etag = self.revalidate(url, 1)['ETag']
+        third = User.objects.create_user(username='user3', email='user3@example.com', password='testpass123')
+        Match.objects.create(user1=self.user, user2=third)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        detail_url = reverse('dating_app:match-detail', args=[match.pk])
+        last_modified = self.client.get(detail_url)['Last-Modified']
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
@@ -0,0 +1,223 @@
+# dating_app/tests/test_discovery.py
+
+import re
+from datetime import date, timedelta
+from unittest import mock, skipUnless
+from django.db import connection
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from ..models import UserProfile, LikeDislike, ViewHistory
+from .. import deck
+from ..deck import fill_deck, take_from_deck
+from ..discovery import birth_date_bounds, candidate_queryset, filter_by_age
+
+User = get_user_model()
+
+@override_settings(VIEW_HISTORY_BUFFER={'ENABLED': False})
+class RandomProfileTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', email='viewer@example.com', password='testpass123')
+        UserProfile.objects.create(
+            user=self.user, first_name='Иван', last_name='Иванов', gender='M',
+            birth_date='1990-01-01', city='Москва'
+        )
+        self.candidates = []
+        for i in range(5):
+            user = User.objects.create_user(username=f'cand{i}', email=f'cand{i}@example.com', password='testpass123')
+            self.candidates.append(UserProfile.objects.create(
+                user=user, first_name=f'Имя{i}', last_name='Петрова', gender='F' if i % 2 == 0 else 'M',
+                birth_date='1992-05-15', city='Москва'
+            ))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('dating_app:get_random_profile')
+
+    def test_random_profile_respects_filters(self):
+        """
+        Тест: Случайный профиль соответствует фильтрам и не совпадает с профилем пользователя.
+        """
+        for _ in range(10):
+            response = self.client.get(self.url, {'gender': 'F'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['gender'], 'F')
+            self.assertNotEqual(response.data['user']['id'], self.user.id)
+        self.assertEqual(ViewHistory.objects.filter(viewer=self.user).count(), 10)
+
+    def test_random_profile_excludes_voted(self):
+        """
+        Тест: Профили, за которые пользователь уже голосовал, не показываются.
+        """
+        for profile in self.candidates[1:]:
+            LikeDislike.objects.create(voter=self.user, target_user=profile.user, vote=LikeDislike.DISLIKE)
+        for _ in range(5):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['id'], self.candidates[0].id)
+
+    def test_random_profile_loaded_once(self):
+        """
+        Тест: Выбранный профиль загружается целиком одним запросом — выборка отдаёт только pk.
+        """
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        full_loads = [q['sql'] for q in queries.captured_queries if '"dating_app_userprofile"."first_name"' in q['sql']]
+        self.assertEqual(len(full_loads), 1, full_loads)
+
+    def test_random_profile_not_found(self):
+        """
+        Тест: Если подходящих профилей нет, возвращается 404.
+        """
+        response = self.client.get(self.url, {'city': 'Омск'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(
+    DISCOVERY_DECK={'SIZE': 4, 'LOW_WATERMARK': 2, 'ASYNC_REFILL': False},
+    VIEW_HISTORY_BUFFER={'ENABLED': False},
+)
+class DeckTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='viewer', email='viewer@example.com', password='testpass123')
+        self.candidates = []
+        for i in range(6):
+            user = User.objects.create_user(username=f'cand{i}', email=f'cand{i}@example.com', password='testpass123')
+            self.candidates.append(UserProfile.objects.create(
+                user=user, first_name=f'Имя{i}', last_name='Петрова', gender='F',
+                birth_date='1992-05-15', city='Москва'
+            ))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('dating_app:get_deck')
+
+    def test_deck_returns_unique_candidates(self):
+        """
+        Тест: Колода выдаёт разные профили без повторов между запросами.
+        """
+        first = self.client.get(self.url, {'count': 3})
+        second = self.client.get(self.url, {'count': 3})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        ids = [profile['id'] for profile in first.data + second.data]
+        self.assertEqual(len(ids), 6)
+        self.assertEqual(len(set(ids)), 6)
+        self.assertEqual(ViewHistory.objects.filter(viewer=self.user).count(), 6)
+
+    @override_settings(DISCOVERY_DECK={'SIZE': 4, 'LOW_WATERMARK': 0})
+    def test_refill_does_not_resurrect_taken_cards(self):
+        """
+        Тест: Пополнение, начатое до выдачи карточек, не возвращает их в очередь и не теряет выданные.
+        """
+        taken = take_from_deck(self.user, {}, 2)
+        sample = deck.sample_unseen_candidates
+        concurrent = []
+
+        def sample_during_take(*args, **kwargs):
+            if not concurrent: # Пока пополнение выбирает кандидатов, другой запрос забирает карточки
+                concurrent.append(take_from_deck(self.user, {}, 2))
+            return sample(*args, **kwargs)
+
+        with mock.patch.object(deck, 'sample_unseen_candidates', sample_during_take):
+            fill_deck(self.user, {})
+        taken += concurrent[0] + take_from_deck(self.user, {}, 6)
+        self.assertEqual(sorted(taken), sorted(profile.pk for profile in self.candidates))
+
+    def test_deck_skips_voted_candidates(self):
+        """
+        Тест: Кандидаты, за которых пользователь проголосовал после наполнения колоды, не выдаются.
+        """
+        self.client.get(self.url, {'count': 1})
+        for profile in self.candidates:
+            url = reverse('dating_app:like_dislike', kwargs={'user_id': profile.user.id})
+            self.client.post(url, {'vote': -1}, format='json')
+        response = self.client.get(self.url, {'count': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+
+class AgeBoundsTestCase(SimpleTestCase):
+    def test_bounds_match_get_age_on_birthday(self):
+        """
+        Тест: Границы дат рождения совпадают с UserProfile.get_age в день рождения и накануне.
+        """
+        today = date(2024, 5, 10)
+        born_after, born_on_or_before = birth_date_bounds(min_age=18, max_age=30, today=today)
+        self.assertEqual(born_on_or_before, date(2006, 5, 10)) # Сегодня исполнилось 18
+        self.assertEqual(born_after, date(1993, 5, 10)) # Сегодня исполнилось 31 — уже не подходит
+
+    def test_bounds_on_leap_day(self):
+        """
+        Тест: 29 февраля корректно переносится на невисокосный год.
+        """
+        born_after, born_on_or_before = birth_date_bounds(min_age=18, max_age=18, today=date(2024, 2, 29))
+        self.assertEqual(born_on_or_before, date(2006, 2, 28))
+        self.assertEqual(born_after, date(2005, 2, 28))
+
+    def test_filter_by_age_matches_get_age(self):
+        """
+        Тест: Фильтр по возрасту отбирает ровно те профили, у которых get_age в диапазоне.
+        """
+        today = date.today()
+        profiles = []
+        for i, days in enumerate([-1, 0, 1]):
+            user = User(id=i + 1, username=f'age{i}')
+            profiles.append(UserProfile(user=user, birth_date=birth_date_bounds(min_age=25, today=today)[1] + timedelta(days=days)))
+        born_after, born_on_or_before = birth_date_bounds(min_age=25, max_age=25)
+        for profile in profiles:
+            inside = born_after < profile.birth_date <= born_on_or_before
+            self.assertEqual(inside, profile.get_age() == 25)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'План запроса проверяется только на PostgreSQL')
+class DiscoveryQueryPlanTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', email='viewer@example.com', password='testpass123')
+        with connection.cursor() as cursor:
+            # На маленькой тестовой таблице планировщик всегда выбрал бы seq scan;
+            # запрещаем его, чтобы проверить, что для фильтров есть подходящий индекс
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, *index_names):
+        """
+        Таблицу профилей читает один из index_names (а не первичный ключ или другой индекс).
+        """
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan on dating_app_userprofile', plan)
+        used = {
+            index_scan or bitmap_scan for index_scan, bitmap_scan in re.findall(
+                r'Index (?:Only )?Scan(?: Backward)? using (\w+) on dating_app_userprofile|Bitmap Index Scan on (\w+)', plan,
+            )
+        }
+        self.assertTrue(used & set(index_names), f'Ожидался один из {index_names}, план:\n{plan}')
+
+    def test_random_profile_filters_use_index(self):
+        """
+        Тест: Выборка окна кандидатов по фильтрам случайного профиля идёт по индексу.
+        """
+        for params, index_name in [
+            ({'gender': 'F'}, 'profile_gender_random_idx'),
+            ({'city': 'Москва'}, 'profile_city_random_idx'),
+            ({'gender': 'F', 'city': 'Москва', 'min_age': '20', 'max_age': '30'}, 'profile_gender_city_random_idx'),
+        ]:
+            queryset = candidate_queryset(self.user, params, exclude_voted=False)
+            self.assertUsesIndex(queryset.order_by('random_key').filter(random_key__gte=0.5)[:20], index_name)
+
+    def test_profile_list_filters_use_index(self):
+        """
+        Тест: Фильтры списка профилей (пол, город, статус, возраст) используют индекс.
+        """
+        queryset = filter_by_age(
+            UserProfile.objects.filter(gender='F', city='Москва', status='searching'), '20', '30'
+        )
+        # На пустой таблице стоимость равна, поэтому подходит любой из индексов по полу и фильтрам
+        self.assertUsesIndex(
+            queryset.order_by(),
+            'profile_filters_birth_idx', 'profile_gender_birth_idx', 'profile_searching_random_idx',
+            'profile_gender_city_random_idx',
+        )
@@ -0,0 +1,48 @@
+# dating_app/tests/test_fast_serializers.py
+
+from django.db.models import FloatField, Value
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from ..models import UserProfile, Interest
+from ..serializers import UserProfileSerializer
+from ..fast_serializers import profile_values, serialize_profile_rows
+from ..renderers import ORJSONRenderer
+
+User = get_user_model()
+
+
+class FastProfileSerializerTestCase(TestCase):
+    def setUp(self):
+        interests = [Interest.objects.create(name=name) for name in ['Книги', 'Музыка', 'Походы']]
+        for i, (patronymic, photo, location) in enumerate([
+            ('Ивановна', 'profile_photos/user_1/фото.jpg', (55.75, 37.61)),
+            (None, None, (None, None)),
+        ]):
+            user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='testpass123')
+            profile = UserProfile.objects.create(
+                user=user, first_name=f'Имя{i}', last_name='Петрова', patronymic=patronymic, gender='F',
+                birth_date='1992-05-15', city='Москва', main_photo=photo, likes_count=i,
+                latitude=location[0], longitude=location[1],
+            )
+            profile.interests.set(interests[i:])
+        self.request = APIRequestFactory().get('/api/profiles/')
+        self.queryset = UserProfile.objects.select_related('user').prefetch_related('interests').order_by('id')
+
+    def test_rows_match_serializer(self):
+        """
+        Тест: Быстрый путь отдаёт то же, что UserProfileSerializer, включая URL фото и distance_km.
+        """
+        queryset = self.queryset.annotate(distance_km=Value(1.23456, output_field=FloatField()))
+        expected = UserProfileSerializer(queryset, many=True, context={'request': self.request}).data
+        with self.assertNumQueries(2): # Профили и все их увлечения
+            data = serialize_profile_rows(list(profile_values(queryset)), self.request)
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+
+    def test_orjson_renderer_matches_json_renderer(self):
+        """
+        Тест: ORJSONRenderer выдаёт те же байты, что и стандартный JSONRenderer.
+        """
+        data = {'results': UserProfileSerializer(self.queryset, many=True).data, 'text': 'строка\u2028', 'next': None}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
@@ -0,0 +1,108 @@
+# dating_app/tests/test_geo.py
+
+from django.test import TestCase, SimpleTestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..geo import GRID_COLUMNS, cell_ranges, grid_cell
+from ..models import LikeDislike, UserProfile
+
+User = get_user_model()
+
+# Москва, Химки (~20 км), Подольск (~40 км), Санкт-Петербург (~630 км)
+POINTS = {
+    'moscow': (55.7558, 37.6173),
+    'khimki': (55.8970, 37.4297),
+    'podolsk': (55.4312, 37.5458),
+    'spb': (59.9343, 30.3351),
+}
+
+
+class GridTestCase(SimpleTestCase):
+    def test_circle_cells_cover_point(self):
+        """
+        Тест: Ячейка точки на границе круга попадает в покрывающие диапазоны.
+        """
+        ranges = cell_ranges(*POINTS['moscow'], 25)
+        cell = grid_cell(*POINTS['khimki'])
+        self.assertTrue(any(start <= cell <= stop for start, stop in ranges))
+
+    def test_date_line_wraps(self):
+        """
+        Тест: Круг у линии перемены дат покрывает ячейки с обеих сторон.
+        """
+        ranges = cell_ranges(0.0, 179.99, 50)
+        west = grid_cell(0.0, -179.9)
+        east = grid_cell(0.0, 179.9)
+        self.assertTrue(any(start <= west <= stop for start, stop in ranges))
+        self.assertTrue(any(start <= east <= stop for start, stop in ranges))
+        self.assertTrue(all(stop - start < GRID_COLUMNS for start, stop in ranges))
+
+
+class NearbySearchTestCase(TestCase):
+    def setUp(self):
+        self.profiles = {}
+        for username, (latitude, longitude) in POINTS.items():
+            user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+            self.profiles[username] = UserProfile.objects.create(
+                user=user, first_name=username, last_name='Иванова', gender='F',
+                birth_date='1995-01-01', city='Москва', latitude=latitude, longitude=longitude
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.profiles['moscow'].user)
+
+    def search(self, **params):
+        response = self.client.get(reverse('dating_app:userprofile-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_radius_from_own_profile(self):
+        """
+        Тест: ?radius= ищет вокруг координат своего профиля и сортирует по расстоянию.
+        """
+        results = self.search(radius=50)
+        self.assertEqual([item['first_name'] for item in results], ['khimki', 'podolsk'])
+        self.assertAlmostEqual(results[0]['distance_km'], 19.9, delta=1)
+
+    def test_non_finite_values_ignored(self):
+        """
+        Тест: ?radius=nan и бесконечные координаты игнорируются, а не приводят к ошибке сервера.
+        """
+        self.assertEqual(len(self.search(radius='nan')), len(POINTS) - 1)
+        self.assertEqual(len(self.search(radius='50', lat='inf', lon='30')), 2) # Точка из своего профиля
+        for name in ('get_random_profile', 'get_deck'):
+            self.assertEqual(self.client.get(reverse(f'dating_app:{name}'), {'radius': 'nan'}).status_code, 200)
+
+    def test_nearest_from_point(self):
+        """
+        Тест: ?nearest=N возвращает N ближайших к заданной точке профилей.
+        """
+        results = self.search(nearest=1, lat=59.9, lon=30.3)
+        self.assertEqual([item['first_name'] for item in results], ['spb'])
+
+    def test_geo_cell_follows_coordinates(self):
+        """
+        Тест: Ячейка сетки пересчитывается при сохранении координат.
+        """
+        profile = self.profiles['spb']
+        profile.latitude, profile.longitude = POINTS['moscow']
+        profile.save(update_fields=['latitude', 'longitude'])
+        profile.refresh_from_db()
+        self.assertEqual(profile.geo_cell, grid_cell(*POINTS['moscow']))
+
+    def test_random_profile_radius(self):
+        """
+        Тест: Случайный профиль учитывает радиус.
+        """
+        response = self.client.get(reverse('dating_app:get_random_profile'), {'radius': 30})
+        self.assertEqual(response.data['first_name'], 'khimki')
+
+    def test_random_profile_nearest_skips_voted(self):
+        """
+        Тест: После голосов за ближайших ?nearest=N отдаёт следующих по расстоянию, а не 404.
+        """
+        viewer = self.profiles['moscow'].user
+        LikeDislike.objects.create(voter=viewer, target_user=self.profiles['khimki'].user, vote=LikeDislike.LIKE)
+        response = self.client.get(reverse('dating_app:get_random_profile'), {'nearest': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['first_name'], 'podolsk')
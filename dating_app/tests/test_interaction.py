@@ -1,11 +1,17 @@
 # dating_app/tests.py (или dating_app/tests/test_interaction.py)
 
-from django.test import TestCase, Client
+import threading
+from io import StringIO
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, Client
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import UserProfile, LikeDislike
+from ..models import UserProfile, LikeDislike, Match
+from ..seen import get_seen_set
+from ..votes import apply_votes
 
 User = get_user_model()
 
@@ -74,7 +80,7 @@ class InteractionTestCase(TestCase):
         response2 = self.client.post(url2, data2, format='json')
 
         # Проверяем, что матч создан
-        from .models import Match
+        from ..models import Match
         self.assertEqual(response2.status_code, status.HTTP_200_OK)
         self.assertEqual(Match.objects.count(), 1)
         match = Match.objects.first()
@@ -93,4 +99,124 @@ class InteractionTestCase(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(LikeDislike.objects.count(), 0)
-        self.assertIn('не можете оценить', response.data['error'])
\ No newline at end of file
+        self.assertIn('не можете оценить', response.data['error'])
+
+    def test_likes_count_follows_votes(self):
+        """
+        Тест: Счётчик лайков профиля меняется вместе с голосом.
+        """
+        url = reverse('dating_app:like_dislike', kwargs={'user_id': self.user2.id})
+        self.client.post(url, {'vote': 1}, format='json')
+        self.profile2.refresh_from_db()
+        self.assertEqual(self.profile2.likes_count, 1)
+
+        self.client.post(url, {'vote': 1}, format='json')
+        self.client.post(url, {'vote': -1}, format='json')
+        self.profile2.refresh_from_db()
+        self.assertEqual(self.profile2.likes_count, 0)
+
+    def test_recount_likes_command(self):
+        """
+        Тест: Команда recount_likes восстанавливает счётчики по LikeDislike.
+        """
+        LikeDislike.objects.create(voter=self.user1, target_user=self.user2, vote=LikeDislike.LIKE)
+        UserProfile.objects.filter(pk=self.profile1.pk).update(likes_count=7)
+        call_command('recount_likes', stdout=StringIO())
+        self.profile1.refresh_from_db()
+        self.profile2.refresh_from_db()
+        self.assertEqual((self.profile1.likes_count, self.profile2.likes_count), (0, 1))
+
+class BatchVoteTestCase(TestCase):
+    def setUp(self):
+        self.voter = User.objects.create_user(username='voter', email='voter@example.com', password='testpass123')
+        self.others = [
+            User.objects.create_user(username=f'other{i}', email=f'other{i}@example.com', password='testpass123')
+            for i in range(4)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.voter)
+        self.url = reverse('dating_app:like_dislike_batch')
+
+    def test_batch_votes_and_matches(self):
+        """
+        Тест: Пачка голосов применяется целиком, взаимные лайки создают матчи.
+        """
+        from ..models import Match
+        LikeDislike.objects.create(voter=self.others[0], target_user=self.voter, vote=LikeDislike.LIKE)
+        LikeDislike.objects.create(voter=self.others[1], target_user=self.voter, vote=LikeDislike.LIKE)
+        votes = [
+            {'user_id': self.others[0].id, 'vote': 1},
+            {'user_id': self.others[1].id, 'vote': -1},
+            {'user_id': self.others[2].id, 'vote': 1},
+            {'user_id': self.voter.id, 'vote': 1},
+            {'user_id': 10 ** 9, 'vote': 1},
+        ]
+        get_seen_set(self.voter.id) # Прогреваем кэш множества оценённых
+        with self.assertNumQueries(11):
+            response = self.client.post(self.url, {'votes': votes}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['ok', 'ok', 'ok', 'error', 'error'])
+        self.assertEqual([result['match_created'] for result in response.data['results']], [True, False, False, False, False])
+        self.assertEqual(response.data['matches_created'], 1)
+        self.assertEqual(LikeDislike.objects.filter(voter=self.voter).count(), 3)
+        self.assertEqual(Match.objects.count(), 1)
+
+    def test_batch_repeat_is_unchanged(self):
+        """
+        Тест: Повторная отправка тех же голосов ничего не меняет, при дублях учитывается последний голос.
+        """
+        votes = [
+            {'user_id': self.others[0].id, 'vote': 1},
+            {'user_id': self.others[0].id, 'vote': -1},
+        ]
+        response = self.client.post(self.url, {'votes': votes}, format='json')
+        self.assertEqual([result['status'] for result in response.data['results']], ['superseded', 'ok'])
+        self.assertEqual(LikeDislike.objects.get(voter=self.voter).vote, LikeDislike.DISLIKE)
+
+        response = self.client.post(self.url, {'votes': votes[1:]}, format='json')
+        self.assertEqual(response.data['results'][0]['status'], 'unchanged')
+
+    def test_batch_rejects_invalid_payload(self):
+        """
+        Тест: Некорректное тело запроса отклоняется.
+        """
+        response = self.client.post(self.url, {'votes': 'nope'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConcurrentMutualLikeTestCase(TransactionTestCase):
+    def test_concurrent_mutual_likes_create_match(self):
+        """
+        Тест: Встречные лайки в параллельных транзакциях всё равно создают матч.
+        """
+        user1 = User.objects.create_user(username='user1', email='user1@example.com', password='testpass123')
+        user2 = User.objects.create_user(username='user2', email='user2@example.com', password='testpass123')
+        voted, release = threading.Event(), threading.Event()
+
+        def first_vote():
+            try:
+                with transaction.atomic():
+                    apply_votes(user1, [(user2.id, LikeDislike.LIKE)])
+                    voted.set()
+                    release.wait(5) # Коммит — только после встречного голоса
+            finally:
+                connection.close()
+
+        def second_vote():
+            try:
+                apply_votes(user2, [(user1.id, LikeDislike.LIKE)])
+            finally:
+                connection.close()
+
+        first = threading.Thread(target=first_vote)
+        first.start()
+        self.assertTrue(voted.wait(5))
+        second = threading.Thread(target=second_vote)
+        second.start()
+        second.join(0.5) # Встречная транзакция ждёт блокировку пары
+        release.set()
+        first.join(5)
+        second.join(5)
+        self.assertTrue(Match.objects.filter(user1=user1, user2=user2).exists())
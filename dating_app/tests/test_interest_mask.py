@@ -0,0 +1,87 @@
+# dating_app/tests/test_interest_mask.py
+
+from unittest import skipUnless
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import UserProfile, Interest, INTEREST_MASK_BITS
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Маска собирается агрегатом bit_or PostgreSQL')
+class InterestMaskTestCase(TestCase):
+    def setUp(self):
+        self.music = Interest.objects.create(name='Музыка')
+        self.sport = Interest.objects.create(name='Спорт')
+        self.travel = Interest.objects.create(name='Путешествия')
+        self.profiles = {}
+        for username, interests in [
+            ('viewer', [self.music, self.sport]),
+            ('anna', [self.music]),
+            ('maria', [self.music, self.sport, self.travel]),
+            ('olga', [self.travel]),
+        ]:
+            user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+            profile = UserProfile.objects.create(
+                user=user, first_name=username, last_name='Иванова', gender='F',
+                birth_date='1995-01-01', city='Москва'
+            )
+            profile.interests.set(interests)
+            self.profiles[username] = profile
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.profiles['viewer'].user)
+
+    def mask_of(self, username):
+        return UserProfile.objects.get(pk=self.profiles[username].pk).interest_mask
+
+    def search(self, **params):
+        response = self.client.get(reverse('dating_app:userprofile-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['first_name'] for item in response.data['results'])
+
+    def test_mask_follows_m2m_changes(self):
+        """
+        Тест: Маска обновляется при добавлении, удалении и очистке увлечений с обеих сторон связи.
+        """
+        self.assertEqual(self.mask_of('anna'), 1 << self.music.bit)
+        self.profiles['anna'].interests.add(self.travel)
+        self.assertEqual(self.mask_of('anna'), (1 << self.music.bit) | (1 << self.travel.bit))
+        self.travel.userprofile_set.clear()
+        self.assertEqual(self.mask_of('anna'), 1 << self.music.bit)
+        self.assertEqual(self.mask_of('olga'), 0)
+        self.music.delete()
+        self.assertEqual(self.mask_of('anna'), 0)
+
+    def test_high_bit_fits_bigint(self):
+        """
+        Тест: Последний доступный бит помещается в bigint, а лишние увлечения остаются без бита.
+        """
+        Interest.objects.bulk_create(
+            [Interest(name=f'Увлечение {bit}', bit=bit) for bit in range(3, INTEREST_MASK_BITS - 1)]
+        )
+        last = Interest.objects.create(name='Последнее')
+        overflow = Interest.objects.create(name='Без бита')
+        self.assertEqual(last.bit, INTEREST_MASK_BITS - 1)
+        self.assertIsNone(overflow.bit)
+        self.profiles['olga'].interests.add(last, overflow)
+        self.assertEqual(self.mask_of('olga'), (1 << self.travel.bit) | (1 << last.bit))
+        self.assertEqual(self.search(interests_all=f'{last.id},{overflow.id}'), ['olga'])
+        self.assertEqual(self.search(interests_any=f'{overflow.id},{self.sport.id}'), ['maria', 'olga'])
+
+    def test_any_all_filters(self):
+        """
+        Тест: interests_any и interests_all фильтруют по маске.
+        """
+        self.assertEqual(self.search(interests_any=f'{self.sport.id},{self.travel.id}'), ['maria', 'olga'])
+        self.assertEqual(self.search(interests_all=f'{self.music.id},{self.sport.id}'), ['maria'])
+        self.assertEqual(self.search(interests_all=f'{self.music.id},999999'), [])
+
+    def test_min_shared_filter(self):
+        """
+        Тест: min_shared оставляет профили с заданным числом общих увлечений.
+        """
+        self.assertEqual(self.search(min_shared=1), ['anna', 'maria'])
+        self.assertEqual(self.search(min_shared=2), ['maria'])
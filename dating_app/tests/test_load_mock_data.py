@@ -0,0 +1,43 @@
+# dating_app/tests/test_load_mock_data.py
+
+from io import StringIO
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from ..models import UserProfile, LikeDislike, LikedUsers, DislikedUsers, Match, Chat, ViewHistoryRollup, SeenIndex
+
+User = get_user_model()
+
+
+class LoadMockDataTestCase(TestCase):
+    def test_generated_data_is_consistent(self):
+        """
+        Тест: Генератор создаёт пользователей с профилями и согласованные голоса, матчи, чаты и просмотры.
+        """
+        call_command('load_mock_data', users=60, chunk_size=25, votes=10, reciprocity=0.5, views=5, messages=3,
+                     seed=7, stdout=StringIO())
+
+        self.assertEqual(UserProfile.objects.count(), 60)
+        user = User.objects.get(username='user0000')
+        self.assertTrue(user.check_password('defaultpass123'))
+        self.assertFalse(UserProfile.objects.filter(search_document='').exists())
+        self.assertFalse(UserProfile.objects.filter(interest_mask=0).exists())
+
+        likes = LikeDislike.objects.filter(vote=LikeDislike.LIKE)
+        self.assertTrue(likes.exists())
+        self.assertEqual(LikedUsers.objects.count(), likes.count())
+        self.assertEqual(DislikedUsers.objects.count(), LikeDislike.objects.filter(vote=LikeDislike.DISLIKE).count())
+        received = dict(likes.values('target_user').annotate(total=Count('id')).values_list('target_user', 'total'))
+        for user_id, likes_count in UserProfile.objects.values_list('user_id', 'likes_count'):
+            self.assertEqual(likes_count, received.get(user_id, 0))
+
+        self.assertTrue(Match.objects.exists())
+        for match in Match.objects.all():
+            self.assertTrue(likes.filter(voter=match.user1, target_user=match.user2).exists())
+            self.assertTrue(likes.filter(voter=match.user2, target_user=match.user1).exists())
+        self.assertEqual(Chat.objects.count(), Match.objects.count())
+        self.assertFalse(Chat.objects.annotate(n=Count('participants')).exclude(n=2).exists())
+
+        self.assertTrue(ViewHistoryRollup.objects.exists())
+        self.assertEqual(SeenIndex.objects.count(), LikeDislike.objects.values('voter').distinct().count())
@@ -0,0 +1,85 @@
+# dating_app/tests/test_match_cache.py
+
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from ..models import Match, Chat, LikeDislike
+from ..match_cache import get_match_chat_id
+from ..votes import apply_votes
+
+User = get_user_model()
+
+
+class MatchCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user1 = User.objects.create_user(username='user1', email='user1@example.com', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', email='user2@example.com', password='testpass123')
+        self.stranger = User.objects.create_user(username='user3', email='user3@example.com', password='testpass123')
+
+    def test_cached_lookup_needs_no_queries(self):
+        """
+        Тест: Повторная проверка пары (в любом порядке) обходится без запросов к БД.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            Match.objects.create(user1=self.user1, user2=self.user2)
+        chat_id = get_match_chat_id(self.user1.id, self.user2.id)
+        self.assertEqual(Chat.objects.get().id, chat_id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_match_chat_id(self.user2.id, self.user1.id), chat_id)
+
+    def test_missing_match_is_cached(self):
+        """
+        Тест: Отсутствие матча тоже кэшируется, а новый матч сразу виден.
+        """
+        self.assertIsNone(get_match_chat_id(self.user1.id, self.stranger.id))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_match_chat_id(self.stranger.id, self.user1.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_votes(self.user1, [(self.stranger.id, LikeDislike.LIKE)])
+            apply_votes(self.stranger, [(self.user1.id, LikeDislike.LIKE)])
+        self.assertIsNotNone(get_match_chat_id(self.user1.id, self.stranger.id))
+
+    def test_missing_match_expires_quickly(self):
+        """
+        Тест: Устаревший ответ «матча нет» (матч создан без прогрева кэша) живёт недолго.
+        """
+        self.assertIsNone(get_match_chat_id(self.user1.id, self.stranger.id))
+        Match.objects.create(user1=self.user1, user2=self.stranger) # on_commit-прогрев в TestCase не выполняется
+        self.assertIsNone(get_match_chat_id(self.user1.id, self.stranger.id))
+        with mock.patch('time.time', return_value=time.time() + 120): # Больше MATCH_CACHE_NEGATIVE_TIMEOUT
+            self.assertIsNotNone(get_match_chat_id(self.user1.id, self.stranger.id))
+
+    def test_shared_legacy_chat_is_not_reused(self):
+        """
+        Тест: Общий чат с третьим участником не считается чатом пары — создаётся отдельный.
+        """
+        legacy = Chat.objects.create()
+        legacy.participants.add(self.user1, self.user2, self.stranger)
+        Match.objects.create(user1=self.user1, user2=self.user2)
+        chat_id = get_match_chat_id(self.user1.id, self.user2.id)
+        self.assertNotEqual(chat_id, legacy.id)
+        self.assertEqual(set(Chat.objects.get(id=chat_id).participants.values_list('id', flat=True)), {self.user1.id, self.user2.id})
+
+    def test_deleted_match_is_forgotten(self):
+        """
+        Тест: После удаления матча пара снова отклоняется.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            match = Match.objects.create(user1=self.user1, user2=self.user2)
+        self.assertIsNotNone(get_match_chat_id(self.user1.id, self.user2.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            match.delete()
+        self.assertIsNone(get_match_chat_id(self.user1.id, self.user2.id))
+
+    def test_pair_is_stored_in_canonical_order(self):
+        """
+        Тест: Матч с user1 > user2 (зеркальный дубль) отклоняется базой.
+        """
+        Match.objects.create(user1=self.user1, user2=self.user2)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Match.objects.create(user1=self.user2, user2=self.user1)
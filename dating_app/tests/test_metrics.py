@@ -0,0 +1,83 @@
+# dating_app/tests/test_metrics.py
+
+import tempfile
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..metrics import Counter, Histogram, Registry, merge_snapshots, render_text, stop_writer
+
+User = get_user_model()
+
+
+class MetricsRegistryTestCase(TestCase):
+    def test_snapshots_merge_across_processes(self):
+        """
+        Тест: Снимки разных процессов складываются, гистограмма выводится накопительными корзинами.
+        """
+        snapshots = []
+        for votes, latencies in [(2, [0.002]), (3, [0.02, 20])]:
+            registry = Registry() # Отдельный процесс
+            counter = Counter('votes_total', 'Голоса', ['vote'], registry=registry)
+            histogram = Histogram('latency_seconds', 'Время', buckets=(0.01, 0.1), registry=registry)
+            counter.inc(votes, vote='like')
+            for latency in latencies:
+                histogram.observe(latency)
+            snapshots.append(registry.snapshot())
+
+        text = render_text(merge_snapshots(snapshots))
+        self.assertIn('votes_total{vote="like"} 5', text)
+        self.assertIn('latency_seconds_bucket{le="0.01"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 2', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count 3', text)
+
+
+class MetricsEndpointTestCase(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', email='user1@example.com', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', email='user2@example.com', password='testpass123')
+        self.addCleanup(stop_writer) # До удаления временного каталога снимков
+
+    def scrape(self, **headers):
+        return self.client.get(reverse('dating_app:metrics'), **headers)
+
+    def test_hot_paths_are_counted(self):
+        """
+        Тест: Голоса, матчи и время обработки запросов видны в /metrics (в т.ч. через каталог снимков).
+        """
+        def value(text, prefix):
+            line = next((line for line in text.splitlines() if line.startswith(prefix)), f'{prefix} 0')
+            return float(line.rsplit(' ', 1)[1])
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS={'DIR': directory}, DEBUG=True):
+            before = self.scrape().content.decode()
+            for voter, target in [(self.user1, self.user2), (self.user2, self.user1)]:
+                client = APIClient()
+                client.force_authenticate(user=voter)
+                client.post(reverse('dating_app:like_dislike', kwargs={'user_id': target.id}), {'vote': 1}, format='json')
+            after = self.scrape().content.decode()
+            stop_writer() # Каталог сейчас удалится
+
+        self.assertEqual(value(after, 'dating_votes_total{vote="like"}') - value(before, 'dating_votes_total{vote="like"}'), 2)
+        self.assertEqual(value(after, 'dating_matches_created_total') - value(before, 'dating_matches_created_total'), 1)
+        self.assertIn('dating_http_request_duration_seconds_count{view="dating_app:like_dislike",method="POST",status="200"}', after)
+
+    @override_settings(METRICS={'TOKEN': None})
+    def test_closed_without_token_outside_debug(self):
+        """
+        Тест: Без токена /metrics открыт только при DEBUG.
+        """
+        self.assertEqual(self.scrape().status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.scrape().status_code, 200)
+
+    @override_settings(METRICS={'TOKEN': 'secret'})
+    def test_token(self):
+        """
+        Тест: С заданным токеном /metrics доступен только с ним.
+        """
+        self.assertEqual(self.scrape().status_code, 403)
+        response = self.scrape(HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
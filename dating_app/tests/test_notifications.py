@@ -0,0 +1,54 @@
+# dating_app/tests/test_notifications.py
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from django.test import TransactionTestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from ..models import LikeDislike
+from ..votes import apply_votes
+from .test_chat import Client
+
+User = get_user_model()
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class NotificationConsumerTestCase(TransactionTestCase):
+    # Уведомления публикуются после коммита, поэтому нужны реальные транзакции
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', email='user1@example.com', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', email='user2@example.com', password='testpass123')
+
+    def test_like_and_match_events(self):
+        """
+        Тест: Получатель лайка узнаёт о нём, а о взаимном лайке — обе стороны.
+        """
+        vote = database_sync_to_async(apply_votes)
+
+        async def scenario():
+            client1, client2 = Client(self.user1, '/ws/notifications/'), Client(self.user2, '/ws/notifications/')
+            self.assertTrue(await client1.connect())
+            self.assertTrue(await client2.connect())
+
+            await vote(self.user1, [(self.user2.id, LikeDislike.LIKE)])
+            self.assertEqual(await client2.receive_json_from(), {'event': 'like', 'user_id': self.user1.id})
+            self.assertTrue(await client1.receive_nothing())
+
+            await vote(self.user2, [(self.user1.id, LikeDislike.LIKE)])
+            self.assertEqual(await client1.receive_json_from(), {'event': 'match', 'user_id': self.user2.id})
+            self.assertEqual(await client2.receive_json_from(), {'event': 'match', 'user_id': self.user1.id})
+            self.assertTrue(await client1.receive_nothing())
+
+            await client1.disconnect()
+            await client2.disconnect()
+
+        async_to_sync(scenario)()
+
+    def test_anonymous_is_rejected(self):
+        """
+        Тест: Анонимный пользователь не может подписаться на уведомления.
+        """
+        async def scenario():
+            self.assertFalse(await Client(AnonymousUser(), '/ws/notifications/').connect())
+
+        async_to_sync(scenario)()
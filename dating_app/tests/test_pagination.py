@@ -0,0 +1,94 @@
+# dating_app/tests/test_pagination.py
+
+from datetime import timedelta
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from ..models import UserProfile, Chat, Message
+
+User = get_user_model()
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user', email='user@example.com', password='testpass123')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def collect(self, url, params):
+        """
+        Проходит все страницы по ссылкам next и возвращает результаты и число запросов.
+        """
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('count', response.data)
+        pages = [response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            pages.append(response.data['results'])
+        return [item for page in pages for item in page], len(pages)
+
+    def test_profiles_ordering_with_ties(self):
+        """
+        Тест: Курсор по (likes_count, id) проходит все профили без пропусков и повторов при равных ключах.
+        """
+        for i in range(7):
+            user = User.objects.create_user(username=f'cand{i}', email=f'cand{i}@example.com', password='testpass123')
+            UserProfile.objects.create(
+                user=user, first_name=f'Имя{i}', last_name='Петрова', gender='F',
+                birth_date='1992-05-15', city='Москва', likes_count=i % 3
+            )
+        expected = list(UserProfile.objects.order_by('-likes_count', '-id').values_list('id', flat=True))
+        results, pages = self.collect(reverse('dating_app:userprofile-list'), {'ordering': '-likes_count', 'limit': 2})
+        self.assertEqual([item['id'] for item in results], expected)
+        self.assertEqual(pages, 4)
+
+    def test_chat_messages_newest_first(self):
+        """
+        Тест: История чата отдаётся участникам от новых сообщений к старым; постраничный обход полон.
+        """
+        chat = Chat.objects.create()
+        chat.participants.add(self.user, self.other)
+        now = timezone.now()
+        Message.objects.bulk_create([
+            Message(chat=chat, sender=self.other, content=f'сообщение {i}', timestamp=now - timedelta(minutes=i // 2))
+            for i in range(5)
+        ])
+        url = reverse('dating_app:chat_messages', args=[chat.id])
+        results, pages = self.collect(url, {'limit': 2})
+        expected = list(Message.objects.order_by('-timestamp', '-id').values_list('content', flat=True))
+        self.assertEqual([item['content'] for item in results], expected)
+        self.assertEqual(pages, 3)
+
+        stranger = User.objects.create_user(username='stranger', email='stranger@example.com', password='testpass123')
+        self.client.force_authenticate(user=stranger)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_sub_millisecond_timestamps_at_page_boundary(self):
+        """
+        Тест: Сообщения с отметками в пределах одной миллисекунды не теряются на границе страниц.
+        """
+        chat = Chat.objects.create()
+        chat.participants.add(self.user, self.other)
+        now = timezone.now().replace(microsecond=500000)
+        Message.objects.bulk_create([
+            Message(chat=chat, sender=self.other, content=f'сообщение {i}', timestamp=now + timedelta(microseconds=37 * i))
+            for i in range(20)
+        ])
+        results, pages = self.collect(reverse('dating_app:chat_messages', args=[chat.id]), {'limit': 3})
+        expected = list(Message.objects.order_by('-timestamp', '-id').values_list('content', flat=True))
+        self.assertEqual([item['content'] for item in results], expected)
+        self.assertEqual(pages, 7)
+
+    def test_invalid_cursor(self):
+        """
+        Тест: Испорченный курсор даёт 404, а не ошибку сервера.
+        """
+        chat = Chat.objects.create()
+        chat.participants.add(self.user)
+        url = reverse('dating_app:chat_messages', args=[chat.id])
+        for cursor in ['???', 'WyJ4Il0', 'WyJub3QtYS1kYXRlIiwxXQ']:
+            self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 404)
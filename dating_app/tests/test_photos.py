@@ -0,0 +1,110 @@
+# dating_app/tests/test_photos.py
+
+import io
+import os
+import shutil
+import tempfile
+from PIL import Image
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import UserProfile
+from ..photos import validate_photo
+
+User = get_user_model()
+
+
+def _upload(name='photo.jpg', size=(2000, 1000), image_format='JPEG', mode='RGB'):
+    output = io.BytesIO()
+    Image.new(mode, size, (200, 80, 40, 128)[:len(mode)]).save(output, image_format)
+    return SimpleUploadedFile(name, output.getvalue(), content_type=f'image/{image_format.lower()}')
+
+
+@override_settings(PHOTO_PROCESSING={'ASYNC': False, 'MAX_PIXELS': 4_000_000})
+class PhotoProcessingTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.owner = User.objects.create_user(username='user1', email='user1@example.com', password='testpass123')
+        self.viewer = User.objects.create_user(username='user2', email='user2@example.com', password='testpass123')
+
+    def test_validate_photo(self):
+        """
+        Тест: Загрузка проверяется по содержимому: не изображение, GIF и слишком много пикселей — отказ.
+        """
+        validate_photo(_upload(name='photo.png', image_format='PNG', mode='RGBA'))
+        for upload in [
+            SimpleUploadedFile('photo.jpg', b'not an image'),
+            _upload(name='photo.gif', image_format='GIF', mode='L'),
+            _upload(size=(2500, 2000)),
+        ]:
+            with self.subTest(name=upload.name), self.assertRaises(ValidationError):
+                validate_photo(upload)
+
+    def test_variants_built_after_commit_and_replaced(self):
+        """
+        Тест: После сохранения фото строятся копии thumb/card/full в WebP и JPEG, их URL есть в профиле;
+        при замене фото копии прежнего удаляются.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = UserProfile.objects.create(
+                user=self.owner, first_name='Анна', last_name='Петрова', gender='F', birth_date='1992-05-15',
+                city='Москва', main_photo=_upload(),
+            )
+        profile.refresh_from_db()
+        sizes = profile.photo_variants['main_photo']['sizes']
+        self.assertEqual(
+            {size: (variant['width'], variant['height']) for size, variant in sizes.items()},
+            {'thumb': (160, 80), 'card': (640, 320), 'full': (1600, 800)},
+        )
+        with Image.open(os.path.join(self.media_root, sizes['thumb']['files']['webp'])) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ('WEBP', (160, 80)))
+
+        client = APIClient()
+        client.force_authenticate(user=self.viewer)
+        data = client.get(reverse('dating_app:userprofile-detail', kwargs={'pk': profile.pk})).json()
+        self.assertIsNone(data['photo_variants']['photo_gallery'])
+        self.assertEqual(
+            data['photo_variants']['main_photo']['card']['webp'],
+            f"http://testserver/media/{sizes['card']['files']['webp']}",
+        )
+
+        old_files = [name for variant in sizes.values() for name in variant['files'].values()]
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.main_photo = _upload(name='new.png', size=(300, 200), image_format='PNG', mode='RGBA')
+            profile.save()
+        profile.refresh_from_db()
+        self.assertEqual(profile.photo_variants['main_photo']['sizes']['full']['width'], 300) # Не увеличивается
+        self.assertFalse(any(os.path.exists(os.path.join(self.media_root, name)) for name in old_files))
+
+    def test_upload_via_api(self):
+        """
+        Тест: Владелец загружает фото через PATCH; слишком большое изображение — 400, профиль не меняется.
+        """
+        profile = UserProfile.objects.create(
+            user=self.owner, first_name='Анна', last_name='Петрова', gender='F', birth_date='1992-05-15', city='Москва',
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.owner)
+        response = client.patch(
+            reverse('dating_app:userprofile-detail', kwargs={'pk': profile.pk}),
+            {'main_photo': _upload(size=(2500, 2000))}, format='multipart',
+        )
+        self.assertEqual(response.status_code, 400)
+        profile.refresh_from_db()
+        self.assertFalse(profile.main_photo)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(
+                reverse('dating_app:userprofile-detail', kwargs={'pk': profile.pk}),
+                {'main_photo': _upload()}, format='multipart',
+            )
+        self.assertEqual(response.status_code, 200)
+        profile.refresh_from_db()
+        self.assertEqual(set(profile.photo_variants['main_photo']['sizes']), {'thumb', 'card', 'full'})
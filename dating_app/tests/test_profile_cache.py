@@ -0,0 +1,97 @@
+# dating_app/tests/test_profile_cache.py
+
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import UserProfile, Interest, LikeDislike
+from ..serializers import UserProfileSerializer
+from ..votes import apply_votes
+
+User = get_user_model()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ProfileCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='testpass123')
+        self.interest = Interest.objects.create(name='Книги')
+        self.profiles = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'cand{i}', email=f'cand{i}@example.com', password='testpass123')
+            profile = UserProfile.objects.create(
+                user=user, first_name=f'Имя{i}', last_name='Петрова', gender='F',
+                birth_date='1992-05-15', city='Москва'
+            )
+            profile.interests.add(self.interest)
+            self.profiles.append(profile)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.viewer)
+
+    def detail(self, profile):
+        response = self.client.get(reverse('dating_app:userprofile-detail', args=[profile.pk]))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_retrieve_is_read_through(self):
+        """
+        Тест: Повторный запрос профиля не обращается к БД и совпадает с ответом сериализатора.
+        """
+        data = self.detail(self.profiles[0])
+        self.assertEqual(data, UserProfileSerializer(UserProfile.objects.get(pk=self.profiles[0].pk)).data)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.detail(self.profiles[0]), data)
+
+    def test_changes_bump_version(self):
+        """
+        Тест: Сохранение, изменение увлечений, лайк и удаление сбрасывают запись профиля.
+        """
+        profile = self.profiles[0]
+        self.detail(profile)
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.city = 'Казань'
+            profile.save()
+        self.assertEqual(self.detail(profile)['city'], 'Казань')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.interests.add(Interest.objects.create(name='Музыка'))
+        self.assertEqual([item['name'] for item in self.detail(profile)['interests']], ['Книги', 'Музыка'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_votes(self.viewer, [(profile.user_id, LikeDislike.LIKE)])
+        self.assertEqual(self.detail(profile)['likes_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.interest.name = 'Чтение'
+            self.interest.save()
+        self.assertEqual([item['name'] for item in self.detail(profile)['interests']], ['Чтение', 'Музыка'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.delete()
+        response = self.client.get(reverse('dating_app:userprofile-detail', args=[profile.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_version_keys_expire(self):
+        """
+        Тест: Запрос несуществующего профиля не оставляет в кэше вечный счётчик версии.
+        """
+        response = self.client.get(reverse('dating_app:userprofile-detail', args=[10 ** 9]))
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNotNone(cache.get(f'profile-version:{10 ** 9}'))
+        later = time.time() + 3 * 60 * 60 # Больше двух PROFILE_CACHE_TIMEOUT
+        with mock.patch('time.time', return_value=later):
+            self.assertIsNone(cache.get(f'profile-version:{10 ** 9}'))
+
+    def test_list_page_from_cache(self):
+        """
+        Тест: Страница списка собирается из кэша: после прогрева — только запрос id страницы.
+        """
+        url = reverse('dating_app:userprofile-list')
+        first = self.client.get(url).data['results']
+        self.assertEqual([item['id'] for item in first], [profile.pk for profile in self.profiles])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).data['results'], first)
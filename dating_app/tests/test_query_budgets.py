@@ -0,0 +1,33 @@
+# dating_app/tests/test_query_budgets.py
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from ..models import UserProfile
+from ..endpoint_bench import ENDPOINTS, api_client, measure_endpoint, seed_viewer_activity
+
+User = get_user_model()
+
+
+class QueryBudgetTestCase(TestCase):
+    def setUp(self):
+        users = []
+        for i in range(30):
+            user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='testpass123')
+            UserProfile.objects.create(
+                user=user, first_name=f'Имя{i}', last_name='Петрова', gender='F' if i % 2 else 'M',
+                birth_date='1992-05-15', city='Москва'
+            )
+            users.append(user)
+        self.viewer = users[0]
+        self.context = {'targets': seed_viewer_activity(self.viewer, [user.id for user in users[1:]], 10)}
+        self.client = api_client(self.viewer)
+
+    def test_endpoints_within_budget(self):
+        """
+        Тест: Каждый эндпоинт из endpoint_bench.ENDPOINTS укладывается в свой бюджет SQL-запросов.
+        """
+        for endpoint in ENDPOINTS:
+            with self.subTest(endpoint=endpoint.name):
+                result = measure_endpoint(self.client, endpoint, self.context, repeat=2)
+                self.assertLess(result['status'], 400)
+                self.assertLessEqual(result['queries'], endpoint.budget)
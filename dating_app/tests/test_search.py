@@ -0,0 +1,90 @@
+# dating_app/tests/test_search.py
+
+from unittest import skipUnless
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import UserProfile, Interest
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Поиск использует возможности PostgreSQL')
+class ProfileSearchTestCase(TestCase):
+    def setUp(self):
+        self.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='testpass123')
+        self.reading = Interest.objects.create(name='Чтение')
+        self.hiking = Interest.objects.create(name='Походы')
+        self.profiles = {}
+        for username, first_name, city in [
+            ('anna', 'Анна', 'Москва'),
+            ('maria', 'Мария', 'Казань'),
+            ('olga', 'Ольга', 'Анапа'),
+        ]:
+            user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+            self.profiles[username] = UserProfile.objects.create(
+                user=user, first_name=first_name, last_name='Иванова', gender='F',
+                birth_date='1995-01-01', city=city
+            )
+        self.profiles['maria'].interests.add(self.reading, self.hiking)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.viewer)
+
+    def search(self, query):
+        response = self.client.get(reverse('dating_app:userprofile-list'), {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [item['first_name'] for item in response.data['results']]
+
+    def test_search_paginates_by_rank(self):
+        """
+        Тест: Курсор по релевантности проходит все найденные профили без повторов (несколько страниц).
+        """
+        for i in range(7):
+            user = User.objects.create_user(username=f'ann{i}', email=f'ann{i}@example.com', password='testpass123')
+            UserProfile.objects.create(
+                user=user, first_name='Анна' if i % 2 else 'Анастасия', last_name=f'Смирнова{i}', gender='F',
+                birth_date='1995-01-01', city='Тула'
+            )
+        response = self.client.get(reverse('dating_app:userprofile-list'), {'search': 'Ан', 'limit': 3})
+        ids = [item['id'] for item in response.data['results']]
+        pages = 1
+        while response.data['next'] and pages < 10:
+            response = self.client.get(response.data['next'])
+            ids += [item['id'] for item in response.data['results']]
+            pages += 1
+        self.assertGreater(pages, 2)
+        self.assertEqual(len(ids), len(set(ids)))
+        first_page = self.client.get(reverse('dating_app:userprofile-list'), {'search': 'Ан', 'limit': 100})
+        self.assertEqual(ids, [item['id'] for item in first_page.data['results']])
+
+    def test_name_match_ranks_first(self):
+        """
+        Тест: Совпадение по имени выше совпадения по городу.
+        """
+        self.assertEqual(self.search('Анна')[0], 'Анна')
+
+    def test_interest_match_without_duplicates(self):
+        """
+        Тест: Поиск по увлечениям возвращает профиль один раз, даже если увлечений несколько.
+        """
+        self.assertEqual(self.search('чтение походы'), ['Мария'])
+
+    def test_typo_tolerant_match(self):
+        """
+        Тест: Опечатка в запросе находится через триграммы.
+        """
+        self.assertIn('Мария', self.search('Казанб'))
+
+    def test_index_follows_interest_changes(self):
+        """
+        Тест: Поисковый документ обновляется при добавлении и переименовании увлечения.
+        """
+        cooking = Interest.objects.create(name='Кулинария')
+        self.profiles['olga'].interests.add(cooking)
+        self.assertEqual(self.search('кулинария'), ['Ольга'])
+        cooking.name = 'Выпечка'
+        cooking.save()
+        self.assertEqual(self.search('выпечка'), ['Ольга'])
+        self.assertEqual(self.search('кулинария'), [])
@@ -0,0 +1,120 @@
+# dating_app/tests/test_seen.py
+
+from io import StringIO
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import UserProfile, LikeDislike, SeenIndex
+from ..seen import SeenSet, ARRAY_LIMIT, _cache_key, get_seen_set, mark_seen
+
+User = get_user_model()
+
+class SeenSetTestCase(SimpleTestCase):
+    def test_add_and_contains(self):
+        """
+        Тест: Множество хранит id из разных контейнеров и не дублирует значения.
+        """
+        seen = SeenSet([1, 70000, 5])
+        self.assertTrue(seen.add(2 ** 33))
+        self.assertFalse(seen.add(5))
+        self.assertIn(70000, seen)
+        self.assertNotIn(70001, seen)
+        self.assertEqual(list(seen), [1, 5, 70000, 2 ** 33])
+
+    def test_bitmap_container_roundtrip(self):
+        """
+        Тест: Плотный контейнер превращается в битовую карту и переживает сериализацию.
+        """
+        values = range(0, (ARRAY_LIMIT + 10) * 3, 3)
+        seen = SeenSet(values)
+        restored = SeenSet.from_bytes(seen.to_bytes())
+        self.assertEqual(len(restored), len(values))
+        self.assertEqual(list(restored), list(values))
+        self.assertNotIn(1, restored)
+
+    def test_concatenated_parts_merge(self):
+        """
+        Тест: Склейка нескольких результатов to_bytes читается как объединение множеств.
+        """
+        dense = range(0, (ARRAY_LIMIT + 10) * 3, 3)
+        parts = [SeenSet(dense), SeenSet([1, 70000]), SeenSet([4, 70000, 2 ** 33])]
+        restored = SeenSet.from_bytes(b''.join(part.to_bytes() for part in parts))
+        self.assertEqual(restored.segments, 3)
+        self.assertEqual(list(restored), sorted({*dense, 1, 4, 70000, 2 ** 33}))
+
+
+class SeenIndexTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user1 = User.objects.create_user(username='user1', email='user1@example.com', password='testpass123')
+        self.user2 = User.objects.create_user(username='user2', email='user2@example.com', password='testpass123')
+        UserProfile.objects.create(
+            user=self.user2, first_name='Мария', last_name='Петрова', gender='F',
+            birth_date='1992-05-15', city='Санкт-Петербург'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user1)
+
+    def test_vote_updates_seen_index(self):
+        """
+        Тест: Голос добавляет пользователя в множество оценённых и сохраняет его в БД.
+        """
+        url = reverse('dating_app:like_dislike', kwargs={'user_id': self.user2.id})
+        self.client.post(url, {'vote': 1}, format='json')
+        self.assertIn(self.user2.id, get_seen_set(self.user1.id))
+        cache.clear()
+        self.assertIn(self.user2.id, SeenSet.from_bytes(SeenIndex.objects.get(user=self.user1).data))
+
+    def test_rebuild_command(self):
+        """
+        Тест: Команда rebuild_seen_index собирает множества из LikeDislike.
+        """
+        LikeDislike.objects.create(voter=self.user1, target_user=self.user2, vote=LikeDislike.DISLIKE)
+        call_command('rebuild_seen_index', stdout=StringIO())
+        cache.clear()
+        self.assertEqual(list(get_seen_set(self.user1.id)), [self.user2.id])
+        self.assertEqual(SeenIndex.objects.count(), 1)
+
+    def test_rebuild_command_resets_cache(self):
+        """
+        Тест: После пересборки в кэше не остаётся множество, собранное до неё.
+        """
+        mark_seen(self.user1.id, [self.user2.id]) # Голоса в LikeDislike нет
+        call_command('rebuild_seen_index', stdout=StringIO())
+        self.assertEqual(list(get_seen_set(self.user1.id)), [])
+
+    @override_settings(SEEN_INDEX_MAX_SEGMENTS=3)
+    def test_mark_seen_appends_new_ids(self):
+        """
+        Тест: mark_seen дописывает в SeenIndex только новые id; набрав SEEN_INDEX_MAX_SEGMENTS частей,
+        множество перезаписывается одним куском.
+        """
+        user_ids = [self.user2.id, 70000, 70001]
+        mark_seen(self.user1.id, user_ids[:1])
+        full = bytes(SeenIndex.objects.get(user=self.user1).data)
+        mark_seen(self.user1.id, user_ids[:2]) # Уже известный id не дописывается
+        data = bytes(SeenIndex.objects.get(user=self.user1).data)
+        self.assertEqual(data, full + SeenSet([70000]).to_bytes())
+        cache.clear()
+        self.assertEqual(list(get_seen_set(self.user1.id)), sorted(user_ids[:2]))
+
+        mark_seen(self.user1.id, user_ids[2:])
+        mark_seen(self.user1.id, [70002])
+        seen = SeenSet.from_bytes(SeenIndex.objects.get(user=self.user1).data)
+        self.assertEqual(seen.segments, 1)
+        self.assertEqual(list(seen), sorted(user_ids + [70002]))
+        self.assertEqual(list(get_seen_set(self.user1.id)), list(seen))
+
+    def test_concurrent_marks_are_not_lost(self):
+        """
+        Тест: Процесс, прочитавший множество до чужого дописывания, не затирает его в кэше.
+        """
+        mark_seen(self.user1.id, [self.user2.id])
+        stale = cache.get(_cache_key(self.user1.id))
+        mark_seen(self.user1.id, [70000])
+        cache.set(_cache_key(self.user1.id), stale) # Второй процесс успел прочитать кэш до дописывания
+        mark_seen(self.user1.id, [70001])
+        self.assertEqual(list(get_seen_set(self.user1.id)), sorted([self.user2.id, 70000, 70001]))
@@ -0,0 +1,88 @@
+# dating_app/tests/test_sql_profiler.py
+
+import json
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import Chat, Interest, Match
+from ..routing import websocket_urlpatterns
+from ..sql_profiler import RepeatedQueryError, SQLProfilerConsumerMiddleware, fingerprint, profile_queries
+from .test_chat import Client
+
+User = get_user_model()
+
+
+def _reports(logs):
+    return [json.loads(line.split('sql_profile ', 1)[1]) for line in logs.output]
+
+
+class SQLProfilerTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', email='user1@example.com', password='testpass123')
+
+    def test_fingerprint(self):
+        """
+        Тест: Форма запроса не зависит от литералов и длины списка IN.
+        """
+        self.assertEqual(
+            fingerprint('SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s) AND "a"."name" = \'x\' LIMIT 21'),
+            fingerprint('SELECT "a"."id"  FROM "a"\nWHERE "a"."id" IN (%s) AND "a"."name" = \'y\' LIMIT 1'),
+        )
+
+    @override_settings(MIDDLEWARE=settings.MIDDLEWARE + ['dating_app.sql_profiler.SQLProfilerMiddleware'])
+    def test_middleware_headers_and_log(self):
+        """
+        Тест: Middleware отдаёт число запросов в заголовках и пишет строку лога.
+        """
+        Interest.objects.create(name='Книги')
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        with self.assertLogs('dating_app.sql_profiler', 'INFO') as logs:
+            response = client.get(reverse('dating_app:interest-list'))
+        self.assertEqual(response.status_code, 200)
+        report, = _reports(logs)
+        self.assertEqual(report['path'], '/api/interests/')
+        self.assertEqual(response['X-SQL-Queries'], str(report['queries']))
+        self.assertGreater(report['queries'], 0)
+
+    @override_settings(SQL_PROFILER={'REPEAT_THRESHOLD': 1, 'RAISE_ON_REPEAT': 2})
+    def test_repeated_statement_raises(self):
+        """
+        Тест: N+1 (Chat.__str__ для каждого чата) обнаруживается и в тестовом режиме приводит к ошибке.
+        """
+        for _ in range(3):
+            Chat.objects.create().participants.add(self.user)
+        with self.assertLogs('dating_app.sql_profiler', 'WARNING'), self.assertRaises(RepeatedQueryError):
+            with profile_queries(label='chats'):
+                [str(chat) for chat in Chat.objects.all()]
+
+        with self.assertLogs('dating_app.sql_profiler', 'INFO'):
+            with profile_queries(label='chats'):
+                [str(chat) for chat in Chat.objects.prefetch_related('participants')]
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class SQLProfilerConsumerTestCase(TransactionTestCase):
+    def test_consumer_messages_are_profiled(self):
+        """
+        Тест: Запросы потребителя WebSocket (в потоке database_sync_to_async) попадают в отчёт.
+        """
+        user1 = User.objects.create_user(username='user1', email='user1@example.com', password='testpass123')
+        user2 = User.objects.create_user(username='user2', email='user2@example.com', password='testpass123')
+        Match.objects.create(user1=user1, user2=user2)
+        application = SQLProfilerConsumerMiddleware(URLRouter(websocket_urlpatterns))
+
+        async def scenario():
+            client = Client(user1, f'/ws/chat/{user2.id}/', application)
+            self.assertTrue(await client.connect())
+            await client.disconnect()
+
+        with self.assertLogs('dating_app.sql_profiler', 'INFO') as logs:
+            async_to_sync(scenario)()
+        report = _reports(logs)[0]
+        self.assertEqual((report['path'], report['event']), (f'/ws/chat/{user2.id}/', 'websocket.connect'))
+        self.assertGreater(report['queries'], 0)
@@ -0,0 +1,68 @@
+# dating_app/tests/test_view_buffer.py
+
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import UserProfile, ViewHistory
+from ..view_buffer import WriteBehindBuffer
+
+User = get_user_model()
+
+
+class WriteBehindBufferTestCase(TestCase):
+    def setUp(self):
+        self.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='testpass123')
+        user = User.objects.create_user(username='cand', email='cand@example.com', password='testpass123')
+        self.profile = UserProfile.objects.create(
+            user=user, first_name='Мария', last_name='Петрова', gender='F',
+            birth_date='1992-05-15', city='Москва'
+        )
+        self.buffer = WriteBehindBuffer(ViewHistory, batch_size=2, flush_interval=None, max_pending=3)
+
+    def view(self):
+        return ViewHistory(viewer_id=self.viewer.id, viewed_profile_id=self.profile.pk)
+
+    def test_flush_writes_in_batches(self):
+        """
+        Тест: Накопленные просмотры записываются при сбросе, переполнение учитывается в dropped.
+        """
+        self.assertEqual(self.buffer.add([self.view() for _ in range(4)]), 3)
+        self.assertEqual(ViewHistory.objects.count(), 0)
+        self.assertEqual(self.buffer.flush(), 3)
+        self.assertEqual(ViewHistory.objects.count(), 3)
+        self.assertEqual(self.buffer.stats(), {'pending': 0, 'written': 3, 'dropped': 1, 'failed': 0})
+
+    def test_failed_batch_is_counted(self):
+        """
+        Тест: Ошибочные объекты (нет профиля, профиль удалён) не мешают остальным объектам пачки
+        и учитываются в failed.
+        """
+        user = User.objects.create_user(username='gone', email='gone@example.com', password='testpass123')
+        deleted_id = UserProfile.objects.create(
+            user=user, first_name='Анна', last_name='Петрова', gender='F', birth_date='1992-05-15', city='Москва'
+        ).pk
+        UserProfile.objects.filter(pk=deleted_id).delete()
+        self.buffer.max_pending = 4
+        self.buffer.add([
+            ViewHistory(viewer_id=self.viewer.id, viewed_profile_id=None), self.view(),
+            ViewHistory(viewer_id=self.viewer.id, viewed_profile_id=deleted_id), self.view(),
+        ])
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self.buffer.stats()['failed'], 2)
+        self.assertEqual(ViewHistory.objects.count(), 2)
+
+    def test_random_profile_enqueues_view(self):
+        """
+        Тест: Случайный профиль не пишет просмотр в запросе, а ставит его в буфер после коммита.
+        """
+        client = APIClient()
+        client.force_authenticate(user=self.viewer)
+        with mock.patch('dating_app.view_buffer.get_view_buffer', return_value=self.buffer):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.get(reverse('dating_app:get_random_profile'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ViewHistory.objects.count(), 0)
+        self.buffer.stop()
+        self.assertEqual(ViewHistory.objects.get().viewed_profile, self.profile)
@@ -0,0 +1,87 @@
+# dating_app/tests/test_view_history.py
+
+from datetime import timedelta
+from io import StringIO
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from ..models import UserProfile, ViewHistory, ViewHistoryRollup
+
+User = get_user_model()
+
+
+class ViewHistoryCompactionTestCase(TestCase):
+    def setUp(self):
+        self.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='testpass123')
+        self.profiles = []
+        for i in range(2):
+            user = User.objects.create_user(username=f'cand{i}', email=f'cand{i}@example.com', password='testpass123')
+            self.profiles.append(UserProfile.objects.create(
+                user=user, first_name=f'Имя{i}', last_name='Петрова', gender='F',
+                birth_date='1992-05-15', city='Москва'
+            ))
+        self.now = timezone.now()
+
+    def add_views(self, profile, *hours_ago):
+        ViewHistory.objects.bulk_create([
+            ViewHistory(viewer=self.viewer, viewed_profile=profile, timestamp=self.now - timedelta(hours=hours))
+            for hours in hours_ago
+        ])
+
+    def compact(self, **options):
+        call_command('compact_view_history', chunk_size=2, stdout=StringIO(), **options)
+
+    def test_compaction_folds_and_accumulates(self):
+        """
+        Тест: Сырые просмотры сворачиваются в одну запись на пару и суммируются между запусками.
+        """
+        self.add_views(self.profiles[0], 5, 3, 1)
+        self.add_views(self.profiles[1], 2)
+        self.compact()
+        self.assertEqual(ViewHistory.objects.count(), 0)
+        rollup = ViewHistoryRollup.objects.get(viewed_profile=self.profiles[0])
+        self.assertEqual(rollup.view_count, 3)
+        self.assertEqual(rollup.first_seen, self.now - timedelta(hours=5))
+        self.assertEqual(rollup.last_seen, self.now - timedelta(hours=1))
+
+        self.add_views(self.profiles[0], 0.5)
+        self.compact()
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.view_count, 4)
+        self.assertEqual(rollup.last_seen, self.now - timedelta(hours=0.5))
+
+    def test_recent_views_are_left_raw(self):
+        """
+        Тест: Совсем свежие просмотры не трогаются до следующего запуска.
+        """
+        ViewHistory.objects.create(viewer=self.viewer, viewed_profile=self.profiles[0])
+        self.compact()
+        self.assertEqual(ViewHistory.objects.count(), 1)
+        self.assertFalse(ViewHistoryRollup.objects.exists())
+
+    def test_retention_purges_old_pairs(self):
+        """
+        Тест: Пары без просмотров дольше срока хранения удаляются.
+        """
+        self.add_views(self.profiles[0], 24 * 40)
+        self.add_views(self.profiles[1], 1)
+        self.compact(retention_days=30)
+        self.assertEqual(list(ViewHistoryRollup.objects.values_list('viewed_profile', flat=True)), [self.profiles[1].pk])
+
+    def test_viewset_serves_rollup(self):
+        """
+        Тест: История просмотров отдаётся в свёрнутом виде, последние просмотры первыми.
+        """
+        self.add_views(self.profiles[0], 5, 4)
+        self.add_views(self.profiles[1], 2)
+        self.compact()
+        client = APIClient()
+        client.force_authenticate(user=self.viewer)
+        response = client.get(reverse('dating_app:viewhistory-list'))
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([item['viewed_profile'] for item in results], [self.profiles[1].pk, self.profiles[0].pk])
+        self.assertEqual(results[1]['view_count'], 2)
@@ -29,6 +29,14 @@ urlpatterns = [
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     # Маршрут для лайка/дизлайка
     path('api/like-dislike/<int:user_id>/', views.like_dislike, name='like_dislike'),
+    # Маршрут для пакетной отправки голосов
+    path('api/like-dislike/batch/', views.like_dislike_batch, name='like_dislike_batch'),
     # Маршрут для получения случайного профиля
     path('api/random-profile/', views.get_random_profile, name='get_random_profile'),
+    # Маршрут для получения колоды кандидатов
+    path('api/deck/', views.get_deck, name='get_deck'),
+    # История сообщений чата (курсорная пагинация)
+    path('api/chats/<int:chat_id>/messages/', views.ChatMessageListView.as_view(), name='chat_messages'),
+    # Метрики для Prometheus
+    path('metrics', views.metrics, name='metrics'),
 ]
\ No newline at end of file
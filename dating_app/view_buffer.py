@@ -0,0 +1,171 @@
+# dating_app/view_buffer.py
+
+import atexit
+import logging
+import threading
+from collections import deque
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from .models import ViewHistory
+
+logger = logging.getLogger(__name__)
+
+
+def _buffer_option(name, default):
+    return getattr(settings, 'VIEW_HISTORY_BUFFER', {}).get(name, default)
+
+
+class WriteBehindBuffer:
+    """
+    Буфер отложенной записи: объекты копятся в памяти и сохраняются пачками через
+    bulk_create — при накоплении batch_size штук или раз в flush_interval секунд
+    в фоновом потоке. При переполнении (max_pending) новые объекты отбрасываются.
+    Если пачка не записалась (например, просмотр профиля, удалённого после постановки
+    в очередь), её объекты записываются по одному, и в failed попадают только ошибочные.
+    Счётчики written, dropped и failed доступны через stats().
+    """
+
+    def __init__(self, model, batch_size=500, flush_interval=2.0, max_pending=10000):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._lock = threading.Lock() # Защищает очередь и счётчики
+        self._flush_lock = threading.Lock() # Одновременно выполняется только один сброс
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._written = self._dropped = self._failed = 0
+
+    def add(self, objects):
+        """
+        Ставит объекты в очередь на запись. Возвращает количество принятых объектов.
+        """
+        with self._lock:
+            accepted = max(0, min(len(objects), self.max_pending - len(self._pending)))
+            self._pending.extend(objects[:accepted])
+            self._dropped += len(objects) - accepted
+            full = len(self._pending) >= self.batch_size
+        if accepted < len(objects):
+            logger.warning('Буфер %s переполнен, отброшено объектов: %d', self.model.__name__, len(objects) - accepted)
+        if full:
+            self._wakeup.set()
+        return accepted
+
+    def flush(self):
+        """
+        Записывает всё накопленное пачками по batch_size. Возвращает количество записанных объектов.
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                if not batch:
+                    break
+                try:
+                    self._insert(batch)
+                    saved = len(batch)
+                except Exception:
+                    logger.warning('Не удалось записать пачку %s (%d объектов), пишем по одному',
+                                   self.model.__name__, len(batch), exc_info=True)
+                    saved = self._insert_one_by_one(batch)
+                written += saved
+                with self._lock:
+                    self._written += saved
+                    self._failed += len(batch) - saved
+        return written
+
+    def _insert(self, objects):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                # Внешние ключи Django проверяются при коммите; проверяем сразу, чтобы ошибка
+                # относилась к этой вставке (и внутри внешней транзакции тоже)
+                cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            self.model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def _insert_one_by_one(self, batch):
+        saved = 0
+        for obj in batch:
+            try:
+                self._insert([obj])
+            except Exception:
+                logger.exception('Не удалось записать %s: %r', self.model.__name__, obj.__dict__)
+                continue
+            saved += 1
+        return saved
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'written': self._written,
+                'dropped': self._dropped,
+                'failed': self._failed,
+            }
+
+    def start(self):
+        """
+        Запускает фоновый поток сброса (один раз) и регистрирует финальный сброс при остановке процесса.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=f'{self.model.__name__}-write-behind', daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout=10):
+        """
+        Останавливает фоновый поток и записывает остаток очереди.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+        close_old_connections()
+
+
+_view_buffer = None
+_view_buffer_lock = threading.Lock()
+
+
+def get_view_buffer():
+    """
+    Буфер просмотров процесса; создаётся и запускается при первом обращении.
+    """
+    global _view_buffer
+    with _view_buffer_lock:
+        if _view_buffer is None:
+            _view_buffer = WriteBehindBuffer(
+                ViewHistory,
+                batch_size=_buffer_option('BATCH_SIZE', 500),
+                flush_interval=_buffer_option('FLUSH_INTERVAL', 2.0),
+                max_pending=_buffer_option('MAX_PENDING', 10000),
+            )
+            _view_buffer.start()
+    return _view_buffer
+
+
+def record_views(viewer, profile_ids):
+    """
+    Записывает просмотры профилей с id profile_ids пользователем viewer.
+    При включённом VIEW_HISTORY_BUFFER['ENABLED'] запись откладывается в буфер
+    (после коммита текущей транзакции) и не входит во время ответа, иначе выполняется сразу.
+    """
+    views = [ViewHistory(viewer_id=viewer.id, viewed_profile_id=profile_id) for profile_id in profile_ids]
+    if not views:
+        return
+    if not _buffer_option('ENABLED', True):
+        ViewHistory.objects.bulk_create(views)
+        return
+    transaction.on_commit(lambda: get_view_buffer().add(views))
@@ -1,18 +1,39 @@
 # dating_app/views.py
 
-from rest_framework import viewsets, generics, status, filters
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework import viewsets, generics, status, filters, permissions
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.contrib.auth import get_user_model
 from django.db.models import Q, Count # Для сложных фильтров
-from .models import UserProfile, Interest, LikeDislike, ViewHistory, LikedUsers, DislikedUsers, LikeHistory, Match
+from .models import UserProfile, Interest, LikeDislike, ViewHistory, ViewHistoryRollup, LikedUsers, DislikedUsers, LikeHistory, Match, Chat, Message
 from .serializers import (
     UserSerializer, UserProfileSerializer, InterestSerializer, LikeDislikeSerializer,
-    ViewHistorySerializer, LikedUsersSerializer, DislikedUsersSerializer, LikeHistorySerializer, MatchSerializer
+    ViewHistorySerializer, ViewHistoryRollupSerializer, LikedUsersSerializer, DislikedUsersSerializer, LikeHistorySerializer, MatchSerializer,
+    MessageSerializer
 )
 from .permissions import IsOwnerOrReadOnly # Предполагаем, что вы создали этот класс
+from .discovery import candidate_queryset, filter_by_age, pick_random_unseen_profile
+from .seen import get_seen_set
+from .deck import take_from_deck
+from .votes import apply_votes, VOTE_ERROR, VOTE_UNCHANGED, ERROR_NOT_FOUND
+from .filters import ProfileSearchFilter
+from .interest_mask import filter_by_interests
+from .geo import filter_by_location
+from .compatibility import pick_compatible_profile, cached_ranking
+from .view_buffer import record_views
+from .pagination import KeysetPagination
+from .profile_cache import get_cached_profiles, profile_keys
+from .renderers import ORJSONRenderer
+from .metrics import RANDOM_DRAWS, collect, render_text
+from .conditional import (
+    conditional_get, interest_list_stamp, interest_detail_stamp, profile_detail_stamp, match_list_stamp, match_detail_stamp
+)
 
 User = get_user_model()
 
@@ -31,12 +52,67 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     queryset = UserProfile.objects.select_related('user').prefetch_related('interests').all() # Оптимизация запросов
     serializer_class = UserProfileSerializer
     permission_classes = [IsOwnerOrReadOnly] # Только владелец может изменять/удалять
+    pagination_class = KeysetPagination # ?cursor= из поля next, без COUNT(*) и OFFSET
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
 
     # Добавляем фильтрацию по полу, возрасту, городу, статусу, увлечениям
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ProfileSearchFilter, filters.OrderingFilter]
     filterset_fields = ['gender', 'city', 'status', 'interests__name']
-    search_fields = ['first_name', 'last_name', 'patronymic', 'city', 'interests__name']
-    ordering_fields = ['birth_date', 'likes_count']
+    # ?search= ищет по имени, фамилии, отчеству, городу и увлечениям (см. search.py)
+    ordering_fields = ['birth_date', 'likes_count'] # а также ?ordering=compatibility (см. list)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Из БД читаются только id страницы (и ключи сортировки для курсора), сами профили
+        собираются из кэша сериализованных профилей одним multi-get (см. profile_cache.py).
+        ?ordering=compatibility упорядочивает профили по совместимости с профилем
+        текущего пользователя (см. compatibility.py), остальные варианты — как обычно.
+        """
+        viewer = None
+        if request.query_params.get('ordering') == 'compatibility' and request.user.is_authenticated:
+            viewer = UserProfile.objects.filter(user=request.user).first()
+
+        if viewer is None:
+            queryset = profile_keys(self.filter_queryset(self.get_queryset()))
+            page = self.paginate_queryset(queryset)
+            rows = list(queryset) if page is None else page
+        else:
+            # Первая страница (без курсора) ранжирует заново, следующие листают сохранённый список
+            paginator = self.paginator
+            ranked_ids = cached_ranking(
+                self.filter_queryset(self.get_queryset()), viewer, request.query_params,
+                refresh=paginator.cursor_query_param not in request.query_params,
+                exclude=(paginator.cursor_query_param, paginator.page_size_query_param),
+            )
+            page = self.paginate_queryset(ranked_ids) # Пагинация по списку id, профили грузим только для страницы
+            rows = [{'id': pk} for pk in (ranked_ids if page is None else page)]
+
+        profiles = get_cached_profiles([row['id'] for row in rows], request)
+        data = []
+        for row in rows:
+            if row['id'] in profiles:
+                item = profiles[row['id']]
+                if row.get('distance_km') is not None: # Расстояние зависит от запроса и в кэш не входит
+                    item['distance_km'] = round(row['distance_km'], 2)
+                data.append(item)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    @conditional_get(profile_detail_stamp) # ETag по версии записи в кэше (см. conditional.py)
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Профиль по id из кэша сериализованных профилей (read-through, см. profile_cache.py).
+        """
+        try:
+            profile_id = int(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except ValueError:
+            raise NotFound()
+        data = get_cached_profiles([profile_id], request).get(profile_id)
+        # Как и get_queryset, собственный профиль в выдачу не попадает
+        if data is None or data['user']['id'] == request.user.id:
+            raise NotFound()
+        return Response(data)
 
     def get_queryset(self):
         """
@@ -44,28 +120,18 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         """
         queryset = super().get_queryset()
         # Фильтрация по возрасту (например, ?min_age=20&max_age=30)
-        min_age = self.request.query_params.get('min_age', None)
-        max_age = self.request.query_params.get('max_age', None)
-        if min_age is not None:
-            try:
-                min_age_int = int(min_age)
-                # Вычисляем дату рождения, соответствующую минимальному возрасту
-                from datetime import date, timedelta
-                birth_date_threshold_min = date.today() - timedelta(days=min_age_int * 365.25) # Приблизительно
-                queryset = queryset.filter(birth_date__lte=birth_date_threshold_min)
-            except ValueError:
-                pass # Игнорируем некорректное значение
-        if max_age is not None:
-            try:
-                max_age_int = int(max_age)
-                # Вычисляем дату рождения, соответствующую максимальному возрасту
-                birth_date_threshold_max = date.today() - timedelta(days=max_age_int * 365.25) # Приблизительно
-                queryset = queryset.filter(birth_date__gte=birth_date_threshold_max)
-            except ValueError:
-                pass # Игнорируем некорректное значение
-
-        # Исключаем текущего пользователя из списка (для поиска)
-        if self.request.user.is_authenticated:
+        queryset = filter_by_age(
+            queryset,
+            self.request.query_params.get('min_age', None),
+            self.request.query_params.get('max_age', None),
+        )
+        # Фильтрация по маске увлечений (?interests_any=1,2&interests_all=3&min_shared=2)
+        queryset = filter_by_interests(queryset, self.request.query_params, self.request.user)
+        # Поиск поблизости (?radius=км, ?nearest=N, точка ?lat=&lon= или координаты своего профиля)
+        queryset = filter_by_location(queryset, self.request.query_params, self.request.user)
+
+        # Исключаем текущего пользователя из списка (для поиска); изменять свой профиль (и загружать фото) он может
+        if self.request.user.is_authenticated and self.request.method in permissions.SAFE_METHODS:
             queryset = queryset.exclude(user=self.request.user)
 
         return queryset
@@ -78,135 +144,133 @@ class InterestViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = InterestSerializer
     permission_classes = [IsAuthenticated] # Только для авторизованных пользователей
 
+    # Условные GET: 304 без сериализации, если увлечения не менялись (см. conditional.py)
+    @conditional_get(interest_list_stamp)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get(interest_detail_stamp)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
 # --- Система взаимодействий ---
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def like_dislike(request, user_id):
     """
     Обработка лайка/дизлайка.
+    Голос записывается атомарно (INSERT ... ON CONFLICT) вместе с обновлением
+    счётчика лайков и проверкой матча — см. votes.apply_votes.
+    О лайке и матче участники узнают через WebSocket ws/notifications/ (см. notifications.py).
     """
-    try:
-        target_user = User.objects.get(id=user_id)
-    except User.DoesNotExist:
-        return Response({'error': 'Пользователь не найден'}, status=status.HTTP_404_NOT_FOUND)
-
-    if request.user == target_user:
-        return Response({'error': 'Вы не можете оценить свой собственный профиль'}, status=status.HTTP_400_BAD_REQUEST)
-
     vote_value = request.data.get('vote') # Ожидаем 1 (лайк) или -1 (дизлайк)
-    if vote_value not in [LikeDislike.LIKE, LikeDislike.DISLIKE]:
-        return Response({'error': 'Некорректное значение голоса. Используйте 1 (лайк) или -1 (дизлайк).'}, status=status.HTTP_400_BAD_REQUEST)
-
-    # Проверяем, есть ли уже голос
-    existing_vote = LikeDislike.objects.filter(voter=request.user, target_user=target_user).first()
-
-    if existing_vote:
-        # Если голос уже был, обновляем его
-        if existing_vote.vote == vote_value:
-            # Если голос не изменился, просто возвращаем сообщение
-            return Response({'message': 'Голос не изменился.'})
-        else:
-            # Если голос изменился (например, с дизлайка на лайк), меняем значение
-            existing_vote.vote = vote_value
-            existing_vote.save()
-    else:
-        # Если голоса не было, создаем новый
-        LikeDislike.objects.create(voter=request.user, target_user=target_user, vote=vote_value)
-
-    # Проверяем, есть ли взаимный лайк (матч)
-    mutual_like = LikeDislike.objects.filter(
-        voter=target_user,
-        target_user=request.user,
-        vote=LikeDislike.LIKE
-    ).exists()
-
-    if vote_value == LikeDislike.LIKE and mutual_like:
-        # Создаем матч
-        match, created = Match.objects.get_or_create(
-            user1=min(request.user, target_user, key=lambda u: u.id),
-            user2=max(request.user, target_user, key=lambda u: u.id)
-        )
-        if created:
-            # Здесь можно отправить уведомление о матче (через WebSocket или email)
-            return Response({'message': 'Взаимный лайк! Вы можете обменяться контактами!', 'match_created': True})
+    result, = apply_votes(request.user, [(user_id, vote_value)])
+
+    if result['status'] == VOTE_ERROR:
+        error_status = status.HTTP_404_NOT_FOUND if result['error'] == ERROR_NOT_FOUND else status.HTTP_400_BAD_REQUEST
+        return Response({'error': result['error']}, status=error_status)
+    if result['status'] == VOTE_UNCHANGED:
+        # Если голос не изменился, просто возвращаем сообщение
+        return Response({'message': 'Голос не изменился.'})
+    if result['match_created']:
+        # Уведомление о матче обоим пользователям уже отправлено (после коммита, см. notifications.py)
+        return Response({'message': 'Взаимный лайк! Вы можете обменяться контактами!', 'match_created': True})
 
     return Response({'message': 'Голос учтен.'})
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def like_dislike_batch(request):
+    """
+    Пакетная обработка лайков/дизлайков (например, накопленных клиентом офлайн).
+    Ожидает {"votes": [{"user_id": 5, "vote": 1}, ...]} и возвращает результат по каждому голосу.
+    """
+    votes = request.data.get('votes')
+    if not isinstance(votes, list) or not all(isinstance(item, dict) for item in votes):
+        return Response({'error': 'Ожидается список голосов в поле votes.'}, status=status.HTTP_400_BAD_REQUEST)
+    max_batch_size = settings.VOTE_BATCH_MAX_SIZE
+    if len(votes) > max_batch_size:
+        return Response({'error': f'Не более {max_batch_size} голосов за один запрос.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = apply_votes(request.user, [(item.get('user_id'), item.get('vote')) for item in votes])
+    return Response({
+        'results': results,
+        'matches_created': sum(1 for result in results if result['match_created']),
+    })
+
 # --- Дополнительные функции профиля ---
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer, BrowsableAPIRenderer])
 def get_random_profile(request):
     """
     Возвращает случайный профиль, соответствующий фильтрам (пол, возраст, город, статус).
+    Случайный выбор выполняется в БД по индексу random_key, без загрузки всех кандидатов,
+    а уже оценённые пользователи отсеиваются по множеству из seen.get_seen_set.
+    С ?ordering=compatibility возвращается самый совместимый профиль из случайной выборки.
     """
-    # Получаем параметры фильтрации из запроса
-    gender_filter = request.query_params.get('gender', None)
-    city_filter = request.query_params.get('city', None)
-    status_filter = request.query_params.get('status', None)
-    min_age_filter = request.query_params.get('min_age', None)
-    max_age_filter = request.query_params.get('max_age', None)
-
-    # Начинаем с queryset всех профилей, кроме текущего пользователя
-    queryset = UserProfile.objects.select_related('user').exclude(user=request.user)
-
-    # Применяем фильтры
-    if gender_filter:
-        queryset = queryset.filter(gender=gender_filter)
-    if city_filter:
-        queryset = queryset.filter(city=city_filter)
-    if status_filter:
-        queryset = queryset.filter(status=status_filter)
-
-    # Фильтрация по возрасту (аналогично в UserProfileViewSet)
-    if min_age_filter:
-        try:
-            min_age_int = int(min_age_filter)
-            from datetime import date, timedelta
-            birth_date_threshold_min = date.today() - timedelta(days=min_age_int * 365.25)
-            queryset = queryset.filter(birth_date__lte=birth_date_threshold_min)
-        except ValueError:
-            pass
-    if max_age_filter:
-        try:
-            max_age_int = int(max_age_filter)
-            from datetime import date, timedelta
-            birth_date_threshold_max = date.today() - timedelta(days=max_age_int * 365.25)
-            queryset = queryset.filter(birth_date__gte=birth_date_threshold_max)
-        except ValueError:
-            pass
-
-    # Исключаем пользователей, которых текущий пользователь уже лайкнул или дизлайкнул
-    voted_users_ids = LikeDislike.objects.filter(voter=request.user).values_list('target_user_id', flat=True)
-    queryset = queryset.exclude(user_id__in=voted_users_ids)
+    # Кандидаты: все профили, кроме текущего пользователя
+    queryset = candidate_queryset(request.user, request.query_params, exclude_voted=False)
 
     # Исключаем пользователей, чьи профили приватные (или требуют особого разрешения)
     # (Предположим, что приватность проверяется в другом месте или через permission_classes)
     # queryset = queryset.filter(privacy_setting='public') # Пример простой фильтрации
 
-    # Получаем случайный профиль
-    import random
-    profiles_list = list(queryset)
-    if profiles_list:
-        random_profile = random.choice(profiles_list)
-
+    # Получаем случайный профиль; ?ordering=compatibility — лучший из случайной выборки
+    viewer = None
+    if request.query_params.get('ordering') == 'compatibility':
+        viewer = UserProfile.objects.filter(user=request.user).first()
+    if viewer is not None:
+        random_pk = pick_compatible_profile(queryset, request.user, get_seen_set(request.user.id), viewer)
+    else:
+        random_pk = pick_random_unseen_profile(queryset, request.user, get_seen_set(request.user.id))
+    RANDOM_DRAWS.inc(result='empty' if random_pk is None else 'found')
+    if random_pk is not None:
         # Записываем в историю просмотров
-        ViewHistory.objects.create(viewer=request.user, viewed_profile=random_profile)
+        record_views(request.user, [random_pk])
 
-        serializer = UserProfileSerializer(random_profile)
-        return Response(serializer.data)
+        return Response(get_cached_profiles([random_pk])[random_pk])
     else:
         return Response({'message': 'Подходящих профилей не найдено.'}, status=status.HTTP_404_NOT_FOUND)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer, BrowsableAPIRenderer])
+def get_deck(request):
+    """
+    Возвращает следующие N профилей-кандидатов (?count=N) из заранее подготовленной колоды.
+    Поддерживает те же фильтры, что и /api/random-profile/ (пол, возраст, город, статус).
+    """
+    max_count = settings.DISCOVERY_DECK.get('MAX_COUNT', 50)
+    try:
+        count = int(request.query_params.get('count', 10))
+    except ValueError:
+        return Response({'error': 'Параметр count должен быть числом.'}, status=status.HTTP_400_BAD_REQUEST)
+    count = max(1, min(count, max_count))
+
+    profile_ids = take_from_deck(request.user, request.query_params, count)
+    profiles = get_cached_profiles(profile_ids)
+    # Сохраняем порядок колоды; профиль мог быть удалён после попадания в очередь
+    deck = [profiles[pk] for pk in profile_ids if pk in profiles]
+
+    # Записываем в историю просмотров все выданные карточки одним запросом
+    record_views(request.user, [item['id'] for item in deck])
+
+    return Response(deck)
+
 # --- (Опционально) Представления для истории и списков ---
 class ViewHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint для просмотра истории просмотров профилей.
+    Отдаёт свёрнутую историю (одна запись на профиль, последние просмотры первыми),
+    которую наполняет команда compact_view_history.
     """
-    serializer_class = ViewHistorySerializer
+    serializer_class = ViewHistoryRollupSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return ViewHistory.objects.filter(viewer=self.request.user).select_related('viewed_profile__user')
+        return ViewHistoryRollup.objects.filter(viewer=self.request.user).order_by('-last_seen', '-id')
 
 class LikedUsersViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -214,9 +278,10 @@ class LikedUsersViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = LikedUsersSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return LikedUsers.objects.filter(user=self.request.user).select_related('liked_user')
+        return LikedUsers.objects.filter(user=self.request.user).select_related('liked_user').order_by('-timestamp', '-id')
 
 class DislikedUsersViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -224,9 +289,10 @@ class DislikedUsersViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = DislikedUsersSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return DislikedUsers.objects.filter(user=self.request.user).select_related('disliked_user')
+        return DislikedUsers.objects.filter(user=self.request.user).select_related('disliked_user').order_by('-timestamp', '-id')
 
 class LikeHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -234,9 +300,10 @@ class LikeHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = LikeHistorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return LikeHistory.objects.filter(user=self.request.user).select_related('target_user')
+        return LikeHistory.objects.filter(user=self.request.user).select_related('target_user').order_by('-timestamp', '-id')
 
 class MatchViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -244,7 +311,47 @@ class MatchViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = MatchSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    # Условные GET: 304 без сериализации, если матчей не прибавилось (см. conditional.py)
+    @conditional_get(match_list_stamp)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get(match_detail_stamp)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def get_queryset(self):
         # Возвращаем только матчи, в которых участвует текущий пользователь
-        return Match.objects.filter(Q(user1=self.request.user) | Q(user2=self.request.user)).select_related('user1', 'user2')
\ No newline at end of file
+        return Match.objects.filter(Q(user1=self.request.user) | Q(user2=self.request.user)).select_related('user1', 'user2').order_by('-timestamp', '-id')
+
+class ChatMessageListView(generics.ListAPIView):
+    """
+    API endpoint для истории сообщений чата (только для участников), новые первыми.
+    """
+    serializer_class = MessageSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False): # Генерация схемы drf_spectacular
+            return Message.objects.none()
+        chat_id = self.kwargs['chat_id']
+        if not Chat.objects.filter(id=chat_id, participants=self.request.user).exists():
+            raise NotFound('Чат не найден.')
+        return Message.objects.filter(chat_id=chat_id).order_by('-timestamp', '-id')
+
+# --- Метрики ---
+def metrics(request):
+    """
+    Метрики всех рабочих процессов в текстовом формате Prometheus (см. metrics.py).
+    Если задан METRICS['TOKEN'], нужен заголовок Authorization: Bearer <токен>;
+    без токена эндпоинт открыт только при DEBUG.
+    """
+    token = settings.METRICS.get('TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponseForbidden()
+    if not token and not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(render_text(collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
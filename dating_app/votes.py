@@ -0,0 +1,163 @@
+# dating_app/votes.py
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Now
+from .models import UserProfile, LikeDislike, Match
+from .seen import mark_seen
+from .match_cache import remember_matches
+from .notifications import publish_vote_events
+from .profile_cache import bump_profiles
+from .metrics import MATCHES, VOTES
+
+User = get_user_model()
+
+VOTE_OK = 'ok'
+VOTE_UNCHANGED = 'unchanged'
+VOTE_SUPERSEDED = 'superseded'
+VOTE_ERROR = 'error'
+
+ERROR_INVALID_USER = 'Некорректный id пользователя.'
+ERROR_SELF_VOTE = 'Вы не можете оценить свой собственный профиль'
+ERROR_INVALID_VOTE = 'Некорректное значение голоса. Используйте 1 (лайк) или -1 (дизлайк).'
+ERROR_NOT_FOUND = 'Пользователь не найден'
+
+
+def _match_pair(user_id1, user_id2):
+    # В матче user1 — пользователь с меньшим id (см. Match.pair)
+    return Match.pair(user_id1, user_id2)
+
+
+def _lock_pairs(pairs):
+    """
+    Транзакционные advisory-блокировки пар (user1_id, user2_id), в порядке ключей.
+    Встречные лайки A→B и B→A иначе проверяют взаимность одновременно и не видят
+    незакоммиченный голос друг друга — матч не создаётся ни одной из транзакций.
+    """
+    keys = sorted(f'match:{user1_id}:{user2_id}' for user1_id, user2_id in pairs)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_advisory_xact_lock(hashtextextended(key, 0)) FROM (SELECT unnest(%s::text[]) AS key ORDER BY 1) AS pairs',
+            [keys],
+        )
+
+
+def apply_votes(voter, votes):
+    """
+    Применяет пачку голосов voter атомарно и за постоянное число запросов к БД.
+    votes — список пар (user_id, vote). Возвращает список результатов в том же порядке:
+    {'user_id', 'status', 'match_created'} (+ 'error' для ошибок). Если один пользователь
+    встречается несколько раз, учитывается последний голос, а предыдущие получают статус superseded.
+    """
+    results = []
+    latest = {}
+    for user_id, vote_value in votes:
+        result = {'user_id': user_id, 'status': VOTE_OK, 'match_created': False}
+        results.append(result)
+        if not isinstance(user_id, int) or isinstance(user_id, bool):
+            result.update(status=VOTE_ERROR, error=ERROR_INVALID_USER)
+        elif user_id == voter.id:
+            result.update(status=VOTE_ERROR, error=ERROR_SELF_VOTE)
+        elif vote_value not in [LikeDislike.LIKE, LikeDislike.DISLIKE]:
+            result.update(status=VOTE_ERROR, error=ERROR_INVALID_VOTE)
+        else:
+            if user_id in latest:
+                latest[user_id][1]['status'] = VOTE_SUPERSEDED
+            latest[user_id] = (vote_value, result)
+    if not latest:
+        return results
+
+    with transaction.atomic():
+        # Блокируем строку голосующего: параллельные голоса одного пользователя выполняются
+        # по очереди, поэтому предыдущие значения и дельты счётчиков ниже согласованы.
+        # FOR NO KEY UPDATE не конфликтует с проверками внешних ключей других транзакций
+        list(User.objects.select_for_update(no_key=True).filter(pk=voter.pk).values_list('pk', flat=True))
+        # Существующие цели, предыдущие голоса за них и id их профилей (для сброса кэша профилей) — одним запросом
+        previous = LikeDislike.objects.filter(voter=voter, target_user=OuterRef('pk')).values('vote')[:1]
+        targets = (
+            User.objects.filter(id__in=latest).annotate(previous_vote=Subquery(previous))
+            .values_list('id', 'previous_vote', 'profile__id')
+        )
+        existing_users = set()
+        previous_votes = {}
+        profile_ids = {}
+        for user_id, previous_vote, profile_id in targets:
+            existing_users.add(user_id)
+            profile_ids[user_id] = profile_id
+            if previous_vote is not None:
+                previous_votes[user_id] = previous_vote
+
+        changed = {}
+        for user_id, (vote_value, result) in latest.items():
+            if user_id not in existing_users:
+                result.update(status=VOTE_ERROR, error=ERROR_NOT_FOUND)
+            elif previous_votes.get(user_id) == vote_value:
+                result['status'] = VOTE_UNCHANGED
+            else:
+                changed[user_id] = vote_value
+        if not changed:
+            return results
+
+        # Один INSERT ... ON CONFLICT на всю пачку
+        LikeDislike.objects.bulk_create(
+            [LikeDislike(voter=voter, target_user_id=user_id, vote=vote_value) for user_id, vote_value in changed.items()],
+            update_conflicts=True,
+            unique_fields=['voter', 'target_user'],
+            update_fields=['vote'],
+        )
+
+        # Счётчики полученных лайков: +1 за новый лайк, -1 за лайк, сменённый на дизлайк
+        gained = [user_id for user_id, vote_value in changed.items() if vote_value == LikeDislike.LIKE]
+        VOTES.inc(len(gained), vote='like')
+        VOTES.inc(len(changed) - len(gained), vote='dislike')
+        lost = [user_id for user_id, vote_value in changed.items()
+                if vote_value == LikeDislike.DISLIKE and previous_votes.get(user_id) == LikeDislike.LIKE]
+        if gained:
+            UserProfile.objects.filter(user_id__in=gained).update(likes_count=F('likes_count') + 1, updated_at=Now())
+        if lost:
+            UserProfile.objects.filter(user_id__in=lost, likes_count__gt=0).update(likes_count=F('likes_count') - 1, updated_at=Now())
+        if gained or lost:
+            # update() не отправляет post_save — сбрасываем кэш профилей с изменившимся счётчиком
+            bump_profiles([profile_ids[user_id] for user_id in gained + lost if profile_ids[user_id] is not None])
+
+        # Блокировка пар до проверки: встречная транзакция дождётся нашего коммита и увидит лайк
+        if gained:
+            _lock_pairs([_match_pair(voter.id, user_id) for user_id in gained])
+
+        # Все взаимные лайки пачки — одним запросом
+        mutual = set(LikeDislike.objects.filter(
+            voter_id__in=gained, target_user=voter, vote=LikeDislike.LIKE
+        ).values_list('voter_id', flat=True)) if gained else set()
+
+        matched = []
+        if mutual:
+            existing_matches = {
+                _match_pair(user1_id, user2_id) for user1_id, user2_id in Match.objects.filter(
+                    Q(user1=voter, user2_id__in=mutual) | Q(user2=voter, user1_id__in=mutual)
+                ).values_list('user1_id', 'user2_id')
+            }
+            new_pairs = [
+                _match_pair(voter.id, user_id) for user_id in mutual
+                if _match_pair(voter.id, user_id) not in existing_matches
+            ]
+            Match.objects.bulk_create(
+                [Match(user1_id=user1_id, user2_id=user2_id) for user1_id, user2_id in new_pairs],
+                ignore_conflicts=True,
+            )
+            matched = [user2_id if user1_id == voter.id else user1_id for user1_id, user2_id in new_pairs]
+            MATCHES.inc(len(new_pairs))
+            for user_id in matched:
+                latest[user_id][1]['match_created'] = True
+            # bulk_create не отправляет post_save — прогреваем кэш матчей явно
+            remember_matches(new_pairs)
+
+        # Уведомления о лайках и матчах уходят в channel layer после коммита
+        publish_vote_events(voter, gained, matched)
+
+    # Новые цели добавляем в множество оценённых (для исключения из поиска)
+    new_targets = [user_id for user_id in changed if user_id not in previous_votes]
+    if new_targets:
+        mark_seen(voter.id, new_targets)
+
+    return results
@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+    # Тесты по умолчанию идут с кэшем и channel layer в памяти (см. myproject/settings_test.py)
+    default_settings = 'myproject.settings_test' if sys.argv[1:2] == ['test'] else 'myproject.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', default_settings)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -5,17 +5,26 @@ from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 from django.core.asgi import get_asgi_application
-import dating_app.routing
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
 
+# Приложение Django создаётся до импорта маршрутов: потребители импортируют модели
+django_asgi_app = get_asgi_application()
+
+from django.conf import settings # noqa: E402
+import dating_app.routing # noqa: E402
+from dating_app.sql_profiler import SQLProfilerConsumerMiddleware # noqa: E402
+
+websocket_router = URLRouter(
+    dating_app.routing.websocket_urlpatterns
+)
+if settings.SQL_PROFILER['ENABLED']:
+    # Отчёт по SQL на каждое сообщение WebSocket (см. dating_app/sql_profiler.py)
+    websocket_router = SQLProfilerConsumerMiddleware(websocket_router)
+
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AllowedHostsOriginValidator(
-        AuthMiddlewareStack(
-            URLRouter(
-                dating_app.routing.websocket_urlpatterns
-            )
-        )
+        AuthMiddlewareStack(websocket_router)
     ),
-})
\ No newline at end of file
+})
@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres', # Полнотекстовый и триграммный поиск
     # Сторонние приложения
     'rest_framework',
     'rest_framework_simplejwt',
@@ -34,15 +35,33 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware', # Должен быть первым
+    'dating_app.metrics.MetricsMiddleware', # Время обработки запросов (dating_app/metrics.py)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMessagingMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Профилирование SQL по запросам и поиск N+1 (dating_app/sql_profiler.py), по умолчанию выключено
+SQL_PROFILER = {
+    'ENABLED': os.environ.get('SQL_PROFILER', 'False').lower() == 'true',
+    'REPEAT_THRESHOLD': 3, # Формы запросов, повторившиеся больше стольких раз, попадают в отчёт
+    'RAISE_ON_REPEAT': None, # Для тестов: RepeatedQueryError, если форма повторилась больше N раз
+}
+if SQL_PROFILER['ENABLED']:
+    MIDDLEWARE.append('dating_app.sql_profiler.SQLProfilerMiddleware')
+
+# Метрики процесса и /metrics (dating_app/metrics.py)
+METRICS = {
+    'DIR': os.environ.get('METRICS_DIR') or None, # Общий каталог снимков для нескольких рабочих процессов
+    'FLUSH_INTERVAL': 5, # Как часто процесс сохраняет свой снимок, секунды
+    # Если задан — /metrics требует Bearer-токен; без токена /metrics доступен только при DEBUG
+    'TOKEN': os.environ.get('METRICS_TOKEN') or None,
+}
+
 ROOT_URLCONF = 'myproject.urls'
 
 TEMPLATES = [
@@ -142,12 +161,26 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:8000",
 ]
 
+# Redis: общий кэш и channel layer (сервис redis в docker-compose.yml)
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379')
+
+# Общий кэш всех процессов: версии кэша профилей, множества оценённых, матчи и колоды
+# сбрасываются и веб-процессами, и командами manage.py (recount_likes, rebuild_seen_index),
+# поэтому кэш в памяти процесса (LocMemCache по умолчанию) здесь не подходит
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'{REDIS_URL}/1',
+        'KEY_PREFIX': 'dating',
+    },
+}
+
 # Channels for WebSocket
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
         'CONFIG': {
-            "hosts": [('redis', 6379)], # Имя сервиса в docker-compose.yml
+            "hosts": [f'{REDIS_URL}/0'],
         },
     },
 }
@@ -158,4 +191,77 @@ SPECTACULAR_SETTINGS = {
     'DESCRIPTION': 'API для веб-платформы знакомств.',
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
-}
\ No newline at end of file
+}
+# Индекс оценённых пользователей (dating_app/seen.py): время жизни записи в кэше, сек
+SEEN_INDEX_CACHE_TIMEOUT = 60 * 60
+# Сколько дописанных частей (см. seen.mark_seen) копится в записи, прежде чем она перезапишется целиком
+SEEN_INDEX_MAX_SEGMENTS = 32
+
+# Колода кандидатов /api/deck/ (dating_app/deck.py)
+DISCOVERY_DECK = {
+    'SIZE': 100, # Сколько кандидатов держать в очереди
+    'LOW_WATERMARK': 20, # Порог, ниже которого запускается фоновое пополнение
+    'MAX_COUNT': 50, # Максимум карточек за один запрос
+    'TIMEOUT': 15 * 60, # Время жизни очереди в кэше, сек
+    'ASYNC_REFILL': True, # Пополнять в пуле потоков (False — синхронно после коммита)
+    'WORKERS': 2,
+    'LOCK_TIMEOUT': 5, # Срок жизни блокировки колоды на чтение-изменение-запись, сек
+}
+
+# Максимальное количество голосов в одном запросе /api/like-dislike/batch/
+VOTE_BATCH_MAX_SIZE = 500
+
+# Конфигурация полнотекстового поиска PostgreSQL для профилей (dating_app/search.py)
+PROFILE_SEARCH_CONFIG = 'russian'
+
+# Оценка совместимости (dating_app/compatibility.py): ?ordering=compatibility
+COMPATIBILITY = {
+    'WEIGHTS': {'age': 0.3, 'city': 0.2, 'interests': 0.4, 'status': 0.1},
+    'MAX_CANDIDATES': 100000, # Сколько кандидатов ранжировать в /api/profiles/
+    'RANKING_TIMEOUT': 600, # Сколько секунд хранить ранжированный список для листания страниц
+    'SAMPLE_SIZE': 100, # Размер случайной выборки для /api/random-profile/
+}
+
+# Поиск поблизости (dating_app/geo.py): ?radius=км, ?nearest=N
+GEO_SEARCH = {
+    'MAX_RADIUS_KM': 500, # Больший радиус обрезается
+    'NEAREST_START_KM': 5, # Начальный радиус поиска ближайших, дальше удваивается
+    'MAX_NEAREST': 500,
+}
+
+# Отложенная запись истории просмотров (dating_app/view_buffer.py)
+VIEW_HISTORY_BUFFER = {
+    'ENABLED': True, # False — писать просмотры сразу в запросе
+    'BATCH_SIZE': 500, # Сброс при накоплении стольких просмотров
+    'FLUSH_INTERVAL': 2.0, # ...или раз в столько секунд
+    'MAX_PENDING': 10000, # Сверх этого просмотры отбрасываются (счётчик dropped)
+}
+
+# Срок хранения свёрнутой истории просмотров, дней (compact_view_history); 0 — хранить всегда
+VIEW_HISTORY_RETENTION_DAYS = 180
+
+# Пакетное сохранение сообщений чата (dating_app/consumers.py)
+CHAT_MESSAGE_BATCH = {
+    'SIZE': 20, # Сохранить, как только накопится столько сообщений
+    'DELAY': 0.5, # ...или через столько секунд после первого несохранённого
+    'RETRIES': 3, # Сколько раз повторить неудачное сохранение, прежде чем сообщить отправителю
+}
+
+# Время жизни записей кэша матчей и чатов пар (dating_app/match_cache.py), сек
+MATCH_CACHE_TIMEOUT = 24 * 60 * 60
+# ...и ответа «матча нет», сек: он может устареть из-за гонки с созданием матча
+MATCH_CACHE_NEGATIVE_TIMEOUT = 60
+
+# Время жизни сериализованных профилей в кэше (dating_app/profile_cache.py), сек
+PROFILE_CACHE_TIMEOUT = 60 * 60
+
+# Проверка загружаемых фото и их уменьшенные копии (dating_app/photos.py, photo_processing.py)
+PHOTO_PROCESSING = {
+    'MAX_UPLOAD_MB': 15,
+    'MAX_PIXELS': 40_000_000, # Больше — отказ при загрузке (защита от «бомб» распаковки)
+    'SIZES': {'thumb': 160, 'card': 640, 'full': 1600}, # Наибольшая сторона копии, px
+    'FORMATS': ['webp', 'jpeg'],
+    'QUALITY': {'webp': 80, 'jpeg': 82},
+    'ASYNC': True, # Обрабатывать в пуле потоков (False — синхронно после коммита)
+    'WORKERS': 2,
+}
@@ -0,0 +1,20 @@
+# myproject/settings_test.py
+#
+# Настройки для тестов (manage.py test выбирает их по умолчанию, см. manage.py).
+# Кэш и channel layer — в памяти процесса: тестам не нужен Redis, а ключи вида
+# seen:1 или match:1:2 (id в тестовой БД каждый раз начинаются заново) не попадают
+# в общий кэш разработки и не переживают прогон.
+
+from .settings import *  # noqa: F401,F403
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}